@@ -2,11 +2,15 @@
 
 import json
 import logging
+from collections.abc import Mapping
 from dataclasses import dataclass
+from datetime import timedelta
+from functools import partial
 from pathlib import Path
+from typing import Any
 
-from dawarich_api import DawarichAPI
 from homeassistant import config_entries
+from homeassistant.components import webhook
 from homeassistant.const import (
     CONF_API_KEY,
     CONF_HOST,
@@ -14,31 +18,82 @@ from homeassistant.const import (
     CONF_PORT,
     CONF_SSL,
     CONF_VERIFY_SSL,
+    CONF_WEBHOOK_ID,
     MAJOR_VERSION,
     Platform,
 )
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 
-from .const import CONF_DEVICE, DOMAIN
-from .coordinator import DawarichStatsCoordinator, DawarichVersionCoordinator
+from .api import DawarichClient
+from .const import (
+    CONF_DEVICE,
+    CONF_POINTS_UPDATE_INTERVAL,
+    CONF_PUSH_UPDATES,
+    CONF_UPDATE_INTERVAL,
+    CONF_UPLOAD_BATCH_SIZE,
+    CONF_UPLOAD_CONCURRENCY,
+    DEFAULT_PUSH_UPDATES,
+    DEFAULT_UPLOAD_BATCH_SIZE,
+    DEFAULT_UPLOAD_CONCURRENCY,
+    DOMAIN,
+    POINTS_UPDATE_INTERVAL,
+    PUSH_FALLBACK_UPDATE_INTERVAL,
+    STORAGE_VERSION,
+    UPDATE_INTERVAL,
+)
+from .coordinator import (
+    DawarichPointsCoordinator,
+    DawarichStatsCoordinator,
+    points_storage_key,
+)
+from .filters import filter_storage_key
 from .helpers import get_api
+from .server import DawarichServer, async_get_server, async_release_server
+from .services import async_setup_services
+from .statistics import DawarichStatisticsImporter
+from .tiles import tiles_storage_key
+from .uploader import upload_options_signal, upload_queue_storage_key
+from .webhook import async_register_webhook
 
 VERSION = json.loads((Path(__file__).parent / "manifest.json").read_text())["version"]
 
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.DEVICE_TRACKER, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 _LOGGER = logging.getLogger(__name__)
 
 type DawarichConfigEntry = config_entries.ConfigEntry[DawarichConfigEntryData]
 
+# Options that are applied to the running coordinators and tracker, any other
+# option change reloads the config entry
+LIVE_OPTIONS = (
+    CONF_UPDATE_INTERVAL,
+    CONF_POINTS_UPDATE_INTERVAL,
+    CONF_UPLOAD_BATCH_SIZE,
+    CONF_UPLOAD_CONCURRENCY,
+)
+
 
 @dataclass
 class DawarichConfigEntryData:
     """Runtime data definitions."""
 
-    api: DawarichAPI
+    api: DawarichClient
     coordinator: DawarichStatsCoordinator
-    version_coordinator: DawarichVersionCoordinator
+    server: DawarichServer
+    points_coordinator: DawarichPointsCoordinator
+    options: dict[str, Any]
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Dawarich services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: DawarichConfigEntry) -> bool:
@@ -51,7 +106,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: DawarichConfigEntry) ->
     use_ssl = entry.data[CONF_SSL]
     verify_ssl = entry.data[CONF_VERIFY_SSL]
 
-    api = get_api(host, api_key, use_ssl, verify_ssl)
+    # All entries of a server share its scheduler, connection pool and
+    # health probes. The server is released last, after the coordinators
+    # of this entry have left its scheduler.
+    server = await async_get_server(hass, entry.entry_id, host, use_ssl, verify_ssl)
+    entry.async_on_unload(partial(async_release_server, hass, server, entry.entry_id))
+    scheduler = server.scheduler
+    api = get_api(
+        host,
+        api_key,
+        use_ssl,
+        verify_ssl,
+        session=server.session,
+        limiter=scheduler.limiter,
+    )
 
     if MAJOR_VERSION < 2025:
         _LOGGER.warning(
@@ -59,20 +127,96 @@ async def async_setup_entry(hass: HomeAssistant, entry: DawarichConfigEntry) ->
             " dawarich-home-assistantyou will need at least Home Assistant Core version 2025.1"
         )
 
-    coordinator = DawarichStatsCoordinator(hass, api, entry.entry_id)
+    push_updates = entry.options.get(CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES)
+    update_interval, points_update_interval = _get_update_intervals(entry.options)
+
+    # Polls and uploads wait while the health probes of the server fail
+    health = server.health_coordinator
+    coordinator = DawarichStatsCoordinator(
+        hass, api, entry.entry_id, scheduler, update_interval, health=health
+    )
     await coordinator.async_config_entry_first_refresh()
-    version_coordinator = DawarichVersionCoordinator(hass, api, entry.entry_id)
-    await version_coordinator.async_config_entry_first_refresh()
+    statistics = DawarichStatisticsImporter(hass, entry.entry_id, entry.data[CONF_NAME])
+    statistics.async_import(coordinator.data, coordinator.breakdown)
+    entry.async_on_unload(
+        coordinator.async_add_listener(
+            lambda: statistics.async_import(coordinator.data, coordinator.breakdown)
+        )
+    )
+    points_coordinator = DawarichPointsCoordinator(
+        hass, api, entry.entry_id, scheduler, points_update_interval, health=health
+    )
+    await points_coordinator.async_config_entry_first_refresh()
+
+    if push_updates:
+        webhook_id = entry.options[CONF_WEBHOOK_ID]
+        async_register_webhook(
+            hass, webhook_id, entry.data[CONF_NAME], coordinator, points_coordinator
+        )
+        entry.async_on_unload(partial(webhook.async_unregister, hass, webhook_id))
 
     entry.runtime_data = DawarichConfigEntryData(
-        api=api, coordinator=coordinator, version_coordinator=version_coordinator
+        api=api,
+        coordinator=coordinator,
+        server=server,
+        points_coordinator=points_coordinator,
+        options=dict(entry.options),
     )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     return True
 
 
+def _get_update_intervals(options: Mapping[str, Any]) -> tuple[timedelta, timedelta]:
+    """Return the polling intervals of the stats and of the points."""
+    # With push updates the coordinators are refreshed by the webhook and
+    # only poll as a fallback
+    if options.get(CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES):
+        return PUSH_FALLBACK_UPDATE_INTERVAL, PUSH_FALLBACK_UPDATE_INTERVAL
+    return (
+        timedelta(
+            seconds=options.get(CONF_UPDATE_INTERVAL, UPDATE_INTERVAL.total_seconds())
+        ),
+        timedelta(
+            seconds=options.get(
+                CONF_POINTS_UPDATE_INTERVAL, POINTS_UPDATE_INTERVAL.total_seconds()
+            )
+        ),
+    )
+
+
+async def _async_update_listener(
+    hass: HomeAssistant, entry: DawarichConfigEntry
+) -> None:
+    """Apply changed options, reloading the entry unless they can be applied live."""
+    runtime_data = entry.runtime_data
+    if entry.options == runtime_data.options:
+        # Data updates from the config flow already reload the entry
+        return
+    changed = {
+        key
+        for key in entry.options.keys() | runtime_data.options.keys()
+        if entry.options.get(key) != runtime_data.options.get(key)
+    }
+    if not changed.issubset(LIVE_OPTIONS):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    _LOGGER.debug("Applying options %s of %s without a reload", changed, entry.title)
+    runtime_data.options = dict(entry.options)
+    update_interval, points_update_interval = _get_update_intervals(entry.options)
+    runtime_data.coordinator.async_set_interval(update_interval)
+    runtime_data.points_coordinator.async_set_interval(points_update_interval)
+    async_dispatcher_send(
+        hass,
+        upload_options_signal(entry.entry_id),
+        entry.options.get(CONF_UPLOAD_BATCH_SIZE, DEFAULT_UPLOAD_BATCH_SIZE),
+        entry.options.get(CONF_UPLOAD_CONCURRENCY, DEFAULT_UPLOAD_CONCURRENCY),
+    )
+
+
 async def async_unload_entry(
     hass: HomeAssistant, entry: config_entries.ConfigEntry
 ) -> bool:
@@ -84,6 +228,19 @@ async def async_unload_entry(
     return unload_ok
 
 
+async def async_remove_entry(
+    hass: HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Remove the data persisted for a config entry."""
+    for key in (
+        points_storage_key(entry.entry_id),
+        filter_storage_key(entry.entry_id),
+        tiles_storage_key(entry.entry_id),
+        upload_queue_storage_key(entry.entry_id),
+    ):
+        await Store(hass, STORAGE_VERSION, key).async_remove()
+
+
 # Migration from 1 to 2
 async def async_migrate_entry(hass: HomeAssistant, entry: config_entries.ConfigEntry):
     """Migrate an old entry."""
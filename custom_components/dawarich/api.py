@@ -0,0 +1,306 @@
+"""Dawarich API client used by the Dawarich integration."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any
+
+import aiohttp
+from dawarich_api import DawarichAPI
+from dawarich_api.response_model import (
+    AddOnePointResponse,
+    DawarichResponse,
+    DawarichVersion,
+    StatsResponse,
+    StatsResponseModel,
+)
+from pydantic import BaseModel
+
+_LOGGER = logging.getLogger(__name__)
+
+API_V1_POINTS = "/api/v1/points"
+API_V1_STATS = "/api/v1/stats"
+API_V1_HEALTH = "/api/v1/health"
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+# The health endpoint answers at once, a slow answer is as bad as none
+HEALTH_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+
+class DawarichPoint(BaseModel):
+    """A point as returned by the Dawarich points API."""
+
+    id: int | None = None
+    latitude: float
+    longitude: float
+    timestamp: int
+    altitude: float | None = None
+    velocity: float | None = None
+    accuracy: float | None = None
+    battery: int | None = None
+    tracker_id: str | None = None
+
+
+class PointsResponse(DawarichResponse[list[DawarichPoint]]):
+    """Dawarich API response on /api/v1/points."""
+
+    total_pages: int = 1
+
+
+def _parse_version(version: str | None) -> DawarichVersion | None:
+    """Parse the version header of the health endpoint."""
+    if version is None:
+        return DawarichVersion(major=0, minor=23, patch=0)
+    try:
+        major, minor, patch = (int(part) for part in version.split("."))
+    except ValueError:
+        _LOGGER.error("Invalid Dawarich version format: %s", version)
+        return None
+    return DawarichVersion(major=major, minor=minor, patch=patch)
+
+
+class HealthResponse(DawarichResponse[DawarichVersion]):
+    """Dawarich API response on /api/v1/health."""
+
+    # Round trip time of the request in seconds, when the server answered
+    latency: float | None = None
+
+
+class DawarichClient(DawarichAPI):
+    """Dawarich API client with the endpoints missing from `dawarich_api`.
+
+    Requests made by this class go through `session` when one is given, so
+    that they share Home Assistant's connection pool, and hold `limiter` while
+    in flight, so that the requests to one host can be capped.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        *,
+        verify_ssl: bool = True,
+        session: aiohttp.ClientSession | None = None,
+        limiter: asyncio.Semaphore | None = None,
+    ) -> None:
+        """Initialize the client."""
+        super().__init__(url=url, api_key=api_key, verify_ssl=verify_ssl)
+        self._session = session
+        self._limiter = limiter
+
+    @asynccontextmanager
+    async def _async_session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Yield the shared session, or a temporary one if there is none."""
+        if self._limiter is not None:
+            await self._limiter.acquire()
+        try:
+            if self._session is not None:
+                yield self._session
+                return
+            async with aiohttp.ClientSession(timeout=REQUEST_TIMEOUT) as session:
+                yield session
+        finally:
+            if self._limiter is not None:
+                self._limiter.release()
+
+    def _auth_headers(self) -> dict[str, str]:
+        """Return the headers for an authenticated request."""
+        return {
+            "Accept": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+
+    def _point_feature(
+        self,
+        longitude: float,
+        latitude: float,
+        name: str,
+        *,
+        timestamp: datetime | str | float | None = None,
+        altitude: float = 0,
+        speed: float = 0,
+        horizontal_accuracy: float = 0,
+        vertical_accuracy: float = 0,
+        battery_level: int = 0,
+    ) -> dict[str, Any]:
+        """Return a point as a GeoJSON feature for the points API."""
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        elif isinstance(timestamp, (float, int)):
+            timestamp = datetime.fromtimestamp(timestamp, UTC)
+        elif timestamp is None:
+            timestamp = datetime.now(UTC)
+
+        return {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+            "properties": {
+                "timestamp": timestamp.astimezone(self.timezone).isoformat(),
+                "altitude": altitude,
+                "speed": speed,
+                "horizontal_accuracy": horizontal_accuracy,
+                "vertical_accuracy": vertical_accuracy,
+                "significant_change": "unknown",
+                "device_id": name,
+                "wifi": "unknown",
+                "battery_state": "unknown",
+                "battery_level": battery_level,
+                "course": 0,
+                "course_accuracy": 0,
+            },
+        }
+
+    async def add_one_point(  # type: ignore[override]
+        self, longitude: float, latitude: float, name: str, **kwargs: Any
+    ) -> AddOnePointResponse:
+        """Send a point to the API."""
+        return await self.add_points(
+            [{"longitude": longitude, "latitude": latitude, **kwargs}], name
+        )
+
+    async def add_points(
+        self, points: list[dict[str, Any]], name: str
+    ) -> AddOnePointResponse:
+        """Send a batch of points to the API in one request.
+
+        Every point holds the keyword arguments of `add_one_point`.
+        """
+        features = [self._point_feature(name=name, **point) for point in points]
+        try:
+            async with (
+                self._async_session() as session,
+                session.post(
+                    f"{self.url}{API_V1_POINTS}",
+                    json={"locations": features},
+                    headers=self._auth_headers(),
+                    ssl=self.verify_ssl,
+                    timeout=REQUEST_TIMEOUT,
+                ) as response,
+            ):
+                return AddOnePointResponse(
+                    response_code=response.status,
+                    error="" if response.ok else response.reason or "",
+                )
+        except (aiohttp.ClientError, TimeoutError) as e:
+            _LOGGER.debug("Failed to add %s points: %s", len(points), e)
+            return AddOnePointResponse(response_code=500, error=str(e))
+
+    async def get_stats(self) -> StatsResponse:
+        """Get the stats from the API."""
+        try:
+            async with (
+                self._async_session() as session,
+                session.get(
+                    f"{self.url}{API_V1_STATS}",
+                    headers=self._auth_headers(),
+                    ssl=self.verify_ssl,
+                    timeout=REQUEST_TIMEOUT,
+                ) as response,
+            ):
+                if not response.ok:
+                    return StatsResponse(
+                        response_code=response.status, error=response.reason or ""
+                    )
+                return StatsResponse(
+                    response_code=response.status,
+                    response=StatsResponseModel.model_validate(await response.json()),
+                )
+        except (aiohttp.ClientError, TimeoutError) as e:
+            _LOGGER.debug("Failed to get stats: %s", e)
+            return StatsResponse(response_code=500, error=str(e))
+
+    async def health(self) -> DawarichVersion | None:
+        """Get the version of Dawarich from the health endpoint."""
+        return (await self.get_health()).response
+
+    async def get_health(self) -> HealthResponse:
+        """Probe the health endpoint and time the round trip.
+
+        The response holds the version of Dawarich, or `None` if it cannot be
+        read. Dawarich versions before 0.24 do not report their version, for
+        those 0.23.0 is returned.
+        """
+        try:
+            async with self._async_session() as session:
+                start = time.perf_counter()
+                async with session.get(
+                    f"{self.url}{API_V1_HEALTH}",
+                    ssl=self.verify_ssl,
+                    timeout=HEALTH_TIMEOUT,
+                ) as response:
+                    if not response.ok:
+                        return HealthResponse(
+                            response_code=response.status, error=response.reason or ""
+                        )
+                    body = await response.json()
+                    version = response.headers.get("X-Dawarich-Version")
+                latency = time.perf_counter() - start
+        except (aiohttp.ClientError, TimeoutError, ValueError) as e:
+            _LOGGER.debug("Failed to get health: %s", e)
+            return HealthResponse(response_code=500, error=str(e))
+
+        # A proxy in front of Dawarich may answer with any JSON document
+        if not isinstance(body, dict):
+            return HealthResponse(
+                response_code=503, error="Dawarich health is not a JSON object"
+            )
+        if (status := body.get("status")) != "ok":
+            return HealthResponse(
+                response_code=503, error=f"Dawarich reports status {status}"
+            )
+        return HealthResponse(
+            response_code=response.status,
+            response=_parse_version(version),
+            latency=latency,
+        )
+
+    async def get_points(
+        self,
+        *,
+        start_at: int | None = None,
+        end_at: int | None = None,
+        page: int = 1,
+        per_page: int = 100,
+        order: str = "desc",
+    ) -> PointsResponse:
+        """Get one page of points, optionally limited to a timestamp range.
+
+        `start_at` and `end_at` are epoch seconds and both are inclusive.
+        """
+        params: dict[str, str | int] = {
+            "page": page,
+            "per_page": per_page,
+            "order": order,
+        }
+        if start_at is not None:
+            params["start_at"] = datetime.fromtimestamp(start_at, UTC).isoformat()
+        if end_at is not None:
+            params["end_at"] = datetime.fromtimestamp(end_at, UTC).isoformat()
+
+        try:
+            async with (
+                self._async_session() as session,
+                session.get(
+                    f"{self.url}{API_V1_POINTS}",
+                    params=params,
+                    headers=self._auth_headers(),
+                    ssl=self.verify_ssl,
+                    timeout=REQUEST_TIMEOUT,
+                ) as response,
+            ):
+                if not response.ok:
+                    return PointsResponse(
+                        response_code=response.status, error=response.reason or ""
+                    )
+                data = await response.json()
+                return PointsResponse(
+                    response_code=response.status,
+                    response=[DawarichPoint.model_validate(point) for point in data],
+                    total_pages=int(response.headers.get("X-Total-Pages", 1)),
+                )
+        except (aiohttp.ClientError, TimeoutError) as e:
+            _LOGGER.debug("Failed to get points: %s", e)
+            return PointsResponse(response_code=500, error=str(e))
@@ -6,6 +6,7 @@ from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.components import webhook
 from homeassistant.const import (
     CONF_API_KEY,
     CONF_HOST,
@@ -13,18 +14,36 @@ from homeassistant.const import (
     CONF_PORT,
     CONF_SSL,
     CONF_VERIFY_SSL,
+    CONF_WEBHOOK_ID,
 )
+from homeassistant.core import callback
 from homeassistant.helpers import selector
 
 from .const import (
     CONF_DEVICE,
+    CONF_POINTS_UPDATE_INTERVAL,
+    CONF_PUSH_UPDATES,
+    CONF_SIMPLIFY_TOLERANCE,
+    CONF_SMOOTHING,
+    CONF_UPDATE_INTERVAL,
+    CONF_UPLOAD_BATCH_SIZE,
+    CONF_UPLOAD_CONCURRENCY,
     DEFAULT_NAME,
     DEFAULT_PORT,
+    DEFAULT_PUSH_UPDATES,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+    DEFAULT_SMOOTHING,
     DEFAULT_SSL,
+    DEFAULT_UPLOAD_BATCH_SIZE,
+    DEFAULT_UPLOAD_CONCURRENCY,
     DEFAULT_VERIFY_SSL,
     DOMAIN,
+    POINTS_UPDATE_INTERVAL,
+    UPDATE_INTERVAL,
 )
 from .helpers import get_api
+from .scheduler import MAX_CONCURRENT_REQUESTS_PER_HOST
+from .webhook import async_get_webhook_url
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,6 +58,14 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._config: dict[str, Any] = {}
         self._reconfigure_entry: config_entries.ConfigEntry | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "DawarichOptionsFlow":
+        """Get the options flow for this handler."""
+        return DawarichOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.ConfigFlowResult:
@@ -302,3 +329,97 @@ class DawarichConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 return {CONF_API_KEY: "invalid api key"}
             case _:
                 return {"base": "connection_error"}
+
+
+def _integer_selector(minimum: int, maximum: int, unit: str | None = None) -> vol.All:
+    """Return a number box for an integer option."""
+    return vol.All(
+        selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=minimum,
+                max=maximum,
+                step=1,
+                unit_of_measurement=unit,
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Coerce(int),
+    )
+
+
+class DawarichOptionsFlow(config_entries.OptionsFlow):
+    """Handle the options of a Dawarich config entry."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the options."""
+        options = self.config_entry.options
+        if user_input is not None:
+            # Keep the webhook id, so that the URL given to Dawarich stays valid
+            webhook_id = options.get(CONF_WEBHOOK_ID)
+            if user_input[CONF_PUSH_UPDATES] and webhook_id is None:
+                webhook_id = webhook.async_generate_id()
+            if webhook_id is not None:
+                user_input[CONF_WEBHOOK_ID] = webhook_id
+            return self.async_create_entry(data=user_input)
+
+        webhook_url = "-"
+        if (webhook_id := options.get(CONF_WEBHOOK_ID)) is not None:
+            webhook_url = async_get_webhook_url(self.hass, webhook_id)
+
+        return self.async_show_form(
+            step_id="init",
+            description_placeholders={"webhook_url": webhook_url},
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SIMPLIFY_TOLERANCE,
+                        default=options.get(
+                            CONF_SIMPLIFY_TOLERANCE, DEFAULT_SIMPLIFY_TOLERANCE
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=100,
+                            step=1,
+                            unit_of_measurement="m",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Required(
+                        CONF_SMOOTHING,
+                        default=options.get(CONF_SMOOTHING, DEFAULT_SMOOTHING),
+                    ): bool,
+                    vol.Required(
+                        CONF_PUSH_UPDATES,
+                        default=options.get(CONF_PUSH_UPDATES, DEFAULT_PUSH_UPDATES),
+                    ): bool,
+                    vol.Required(
+                        CONF_UPDATE_INTERVAL,
+                        default=options.get(
+                            CONF_UPDATE_INTERVAL, int(UPDATE_INTERVAL.total_seconds())
+                        ),
+                    ): _integer_selector(10, 3600, "s"),
+                    vol.Required(
+                        CONF_POINTS_UPDATE_INTERVAL,
+                        default=options.get(
+                            CONF_POINTS_UPDATE_INTERVAL,
+                            int(POINTS_UPDATE_INTERVAL.total_seconds()),
+                        ),
+                    ): _integer_selector(10, 3600, "s"),
+                    vol.Required(
+                        CONF_UPLOAD_BATCH_SIZE,
+                        default=options.get(
+                            CONF_UPLOAD_BATCH_SIZE, DEFAULT_UPLOAD_BATCH_SIZE
+                        ),
+                    ): _integer_selector(1, 1000),
+                    vol.Required(
+                        CONF_UPLOAD_CONCURRENCY,
+                        default=options.get(
+                            CONF_UPLOAD_CONCURRENCY, DEFAULT_UPLOAD_CONCURRENCY
+                        ),
+                    ): _integer_selector(1, MAX_CONCURRENT_REQUESTS_PER_HOST),
+                }
+            ),
+        )
@@ -11,8 +11,53 @@ DEFAULT_NAME = "Dawarich"
 DEFAULT_SSL = False
 DEFAULT_VERIFY_SSL = True
 CONF_DEVICE = "mobile_app"
+CONF_SIMPLIFY_TOLERANCE = "simplify_tolerance"
+DEFAULT_SIMPLIFY_TOLERANCE = 0.0
+CONF_SMOOTHING = "smoothing"
+DEFAULT_SMOOTHING = False
+CONF_PUSH_UPDATES = "push_updates"
+DEFAULT_PUSH_UPDATES = False
+# Options applied to a running config entry without reloading it
+CONF_UPDATE_INTERVAL = "update_interval"
+CONF_POINTS_UPDATE_INTERVAL = "points_update_interval"
+CONF_UPLOAD_BATCH_SIZE = "upload_batch_size"
+DEFAULT_UPLOAD_BATCH_SIZE = 1
+CONF_UPLOAD_CONCURRENCY = "upload_concurrency"
+DEFAULT_UPLOAD_CONCURRENCY = 1
 UPDATE_INTERVAL = timedelta(seconds=60)
-VERSION_UPDATE_INTERVAL = timedelta(hours=1)
+# The health endpoint is cheap, so it is probed more often than the stats
+HEALTH_UPDATE_INTERVAL = timedelta(seconds=30)
+# Number of health probes the availability and latency sensors cover
+HEALTH_WINDOW = 120
+# Failed health probes in a row before the API unavailable issue is raised
+HEALTH_ISSUE_FAILURES = 3
+POINTS_UPDATE_INTERVAL = timedelta(seconds=60)
+# Polling interval of the stats and points when Dawarich pushes updates
+PUSH_FALLBACK_UPDATE_INTERVAL = timedelta(minutes=15)
+
+# Seconds after which a point held back by the track simplifier is sent anyway
+SIMPLIFY_FLUSH_DELAY = 60
+# Seconds between writes of the tracker sensor state while its uploads are busy
+TRACKER_STATE_WRITE_INTERVAL = 5
+
+# Keys of the monthly distance in the yearly stats of Dawarich
+MONTHS = (
+    "january",
+    "february",
+    "march",
+    "april",
+    "may",
+    "june",
+    "july",
+    "august",
+    "september",
+    "october",
+    "november",
+    "december",
+)
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 30
 
 
 class DawarichTrackerStates(Enum):
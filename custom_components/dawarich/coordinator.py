@@ -1,34 +1,201 @@
 """Custom coordinator for Dawarich integration."""
 
 import logging
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from datetime import timedelta
 from typing import Any
 
-from dawarich_api import DawarichAPI
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.issue_registry import (
     IssueSeverity,
     async_create_issue,
     async_delete_issue,
 )
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import UNDEFINED
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN, UPDATE_INTERVAL, VERSION_UPDATE_INTERVAL
+from .api import DawarichClient
+from .const import (
+    DOMAIN,
+    HEALTH_ISSUE_FAILURES,
+    HEALTH_UPDATE_INTERVAL,
+    HEALTH_WINDOW,
+    MONTHS,
+    POINTS_UPDATE_INTERVAL,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    UPDATE_INTERVAL,
+)
+from .profiler import profiled, span
+from .scheduler import DawarichHostScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class DawarichStatsCoordinator(DataUpdateCoordinator):
-    """Custom coordinator."""
+@dataclass(frozen=True, slots=True)
+class DawarichStatsBreakdown:
+    """Index of the yearly stats of Dawarich by year and by (year, month)."""
 
-    def __init__(self, hass: HomeAssistant, api: DawarichAPI, entry_id: str):
-        """Initialize coordinator."""
+    years: dict[int, dict[str, Any]]
+    monthly_distance_km: dict[tuple[int, int], float]
+
+    @classmethod
+    def from_yearly_stats(
+        cls, yearly_stats: list[dict[str, Any]]
+    ) -> "DawarichStatsBreakdown":
+        """Build the index from the yearly stats of a stats payload."""
+        years: dict[int, dict[str, Any]] = {}
+        monthly_distance_km: dict[tuple[int, int], float] = {}
+        for year_stats in sorted(yearly_stats, key=lambda stats: stats["year"]):
+            year = year_stats["year"]
+            years[year] = year_stats
+            for month, month_name in enumerate(MONTHS, start=1):
+                if (
+                    distance := year_stats["monthly_distance_km"].get(month_name)
+                ) is None:
+                    continue
+                monthly_distance_km[year, month] = distance
+        return cls(years=years, monthly_distance_km=monthly_distance_km)
+
+
+class DawarichHostCoordinator[DataT](DataUpdateCoordinator[DataT], ABC):
+    """Coordinator whose refreshes are spread over the polling interval.
+
+    After every refresh the next one is moved to the slot the host scheduler
+    assigned to this coordinator, so that the coordinators of all config
+    entries of a host do not refresh at the same time. Refreshes are skipped
+    while the `health` coordinator of the host reports it unavailable.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: DawarichClient,
+        entry_id: str,
+        scheduler: DawarichHostScheduler,
+        *,
+        name: str,
+        interval: timedelta,
+        shared: bool = False,
+        health: "DawarichHealthCoordinator | None" = None,
+    ):
+        """Initialize coordinator.
+
+        A `shared` coordinator serves several config entries, so it is not
+        tied to the entry being set up and has to be shut down by its owner.
+        """
         super().__init__(
-            hass, _LOGGER, name="Dawarich Sensor", update_interval=UPDATE_INTERVAL
+            hass,
+            _LOGGER,
+            config_entry=None if shared else UNDEFINED,
+            name=name,
+            update_interval=interval,
         )
         self.api = api
+        self.health = health
         self._entry_id = entry_id
+        self._interval = interval
+        self._scheduler = scheduler
+        self._scheduler_key = f"{entry_id}/{name}"
+        self._unregister_scheduler = scheduler.async_register(self._scheduler_key)
+
+    async def async_shutdown(self) -> None:
+        """Cancel any scheduled call and leave the host scheduler."""
+        await super().async_shutdown()
+        self._unregister_scheduler()
+
+    @callback
+    def async_set_interval(self, interval: timedelta) -> None:
+        """Change the polling interval, moving the next refresh to its new slot."""
+        if interval == self._interval:
+            return
+        self._interval = interval
+        self.update_interval = self._scheduler.next_refresh_delay(
+            self._scheduler_key, interval, self.hass.loop.time()
+        )
+        if self._listeners:
+            self._schedule_refresh()
+
+    @profiled("coordinator.update")
+    async def _async_update_data(self) -> DataT:
+        try:
+            if self.health is not None and not self.health.healthy:
+                raise UpdateFailed(f"Dawarich at {self.api.url} is unavailable")
+            return await self._async_fetch()
+        finally:
+            self.update_interval = self._scheduler.next_refresh_delay(
+                self._scheduler_key, self._interval, self.hass.loop.time()
+            )
+
+    @abstractmethod
+    async def _async_fetch(self) -> DataT:
+        """Fetch the data from Dawarich."""
+
+
+class DawarichStatsCoordinator(DawarichHostCoordinator[dict[str, Any]]):
+    """Custom coordinator.
+
+    The API unavailable repair issue of the config entry follows the probes
+    of the `health` coordinator, not the result of the stats requests.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: DawarichClient,
+        entry_id: str,
+        scheduler: DawarichHostScheduler,
+        update_interval: timedelta = UPDATE_INTERVAL,
+        *,
+        health: "DawarichHealthCoordinator | None" = None,
+    ):
+        """Initialize coordinator."""
+        super().__init__(
+            hass,
+            api,
+            entry_id,
+            scheduler,
+            name="Dawarich Sensor",
+            interval=update_interval,
+            health=health,
+        )
         self._api_issue_created = False
+        self.breakdown = DawarichStatsBreakdown(years={}, monthly_distance_km={})
+        self._unsubscribe_health: CALLBACK_TYPE | None = None
+        if health is not None:
+            self._unsubscribe_health = health.async_add_listener(
+                self._async_health_updated
+            )
+            if health.data is not None:
+                self._async_health_updated()
+
+    async def async_shutdown(self) -> None:
+        """Stop following the health of the host."""
+        await super().async_shutdown()
+        if self._unsubscribe_health is not None:
+            self._unsubscribe_health()
+            self._unsubscribe_health = None
+
+    @callback
+    def _async_health_updated(self) -> None:
+        """Raise or clear the API unavailable issue after a health probe.
+
+        A server that answered before gets a few probes to come back, one
+        that never did is reported at once.
+        """
+        health = self.health
+        assert health is not None
+        if health.healthy:
+            self._async_delete_api_issue()
+        elif self.data is None or health.consecutive_failures >= HEALTH_ISSUE_FAILURES:
+            self._async_create_api_issue(
+                health.data["status_code"], health.data["error"]
+            )
 
     @property
     def _api_issue_id(self) -> str:
@@ -64,7 +231,7 @@ class DawarichStatsCoordinator(DataUpdateCoordinator):
             _LOGGER.info("Dawarich API is available again, clearing repair issue.")
             self._api_issue_created = False
 
-    async def _async_update_data(self) -> dict[str, Any]:
+    async def _async_fetch(self) -> dict[str, Any]:
         response = await self.api.get_stats()
         match response.response_code:
             case 200:
@@ -73,9 +240,12 @@ class DawarichStatsCoordinator(DataUpdateCoordinator):
                         "Dawarich API returned no data but returned status 200"
                     )
                     raise UpdateFailed("Dawarich API returned no data")
-                # API is working, clear any existing issue
-                self._async_delete_api_issue()
-                return response.response.model_dump()
+                with span("stats.model_dump"):
+                    data = response.response.model_dump()
+                self.breakdown = DawarichStatsBreakdown.from_yearly_stats(
+                    data["yearly_stats"]
+                )
+                return data
             case 401:
                 _LOGGER.error(
                     "Invalid credentials when trying to fetch stats from Dawarich"
@@ -97,32 +267,166 @@ class DawarichStatsCoordinator(DataUpdateCoordinator):
                     response.response_code,
                     response.error,
                 )
-
-                # Create repair issue for API unavailability (5xx errors, timeouts, etc.)
-                self._async_create_api_issue(response.response_code, response.error)
-
                 raise UpdateFailed(
                     f"Error fetching data from Dawarich (status {response.response_code})"
                 )
 
 
-class DawarichVersionCoordinator(DataUpdateCoordinator):
-    """Custom coordinator for Dawarich version."""
+def _percentile(values: list[float], percent: float) -> float | None:
+    """Return the nearest rank percentile of sorted values, rounded."""
+    if not values:
+        return None
+    return round(values[max(math.ceil(percent / 100 * len(values)) - 1, 0)], 1)
+
 
-    def __init__(self, hass: HomeAssistant, api: DawarichAPI, entry_id: str):
+class DawarichHealthCoordinator(DawarichHostCoordinator[dict[str, Any]]):
+    """Coordinator probing the health endpoint of a Dawarich server.
+
+    Every probe records whether the server answered and how long it took,
+    and the availability and latency percentiles are kept over the last
+    `HEALTH_WINDOW` probes. A probe does not fail when the server is down,
+    that is reported in the data, so the other coordinators and the uploader
+    can wait until it is back. The latest version of Dawarich is kept too.
+
+    The health belongs to the server, so one coordinator is shared by all
+    config entries of a server.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: DawarichClient,
+        scheduler: DawarichHostScheduler,
+    ):
         """Initialize coordinator."""
         super().__init__(
             hass,
-            _LOGGER,
-            name="Dawarich Version",
-            update_interval=VERSION_UPDATE_INTERVAL,
+            api,
+            "server",
+            scheduler,
+            name="Dawarich Health",
+            interval=HEALTH_UPDATE_INTERVAL,
+            shared=True,
         )
-        self.api = api
-        self._entry_id = entry_id
+        # Latency of the recent probes in milliseconds, None for failed ones
+        self._latencies: deque[float | None] = deque(maxlen=HEALTH_WINDOW)
+        self.consecutive_failures = 0
+
+    @property
+    def healthy(self) -> bool:
+        """Return whether the last probe succeeded, or none was made yet."""
+        return self.consecutive_failures == 0
+
+    async def _async_fetch(self) -> dict[str, Any]:
+        response = await self.api.get_health()
+        if response.success and response.latency is not None:
+            if not self.healthy:
+                _LOGGER.info("Dawarich at %s is available again", self.api.url)
+            self.consecutive_failures = 0
+            self._latencies.append(response.latency * 1000)
+        else:
+            if self.healthy:
+                _LOGGER.warning(
+                    "Dawarich at %s is unavailable (status %s) %s",
+                    self.api.url,
+                    response.response_code,
+                    response.error,
+                )
+            self.consecutive_failures += 1
+            self._latencies.append(None)
+
+        latencies = sorted(
+            latency for latency in self._latencies if latency is not None
+        )
+        if response.response is not None:
+            version = response.response.model_dump()
+        else:
+            version = self.data["version"] if self.data is not None else None
+        return {
+            "available": self.healthy,
+            "status_code": response.response_code,
+            "error": response.error,
+            "version": version,
+            "availability": round(100 * len(latencies) / len(self._latencies), 1),
+            "latency_median": _percentile(latencies, 50),
+            "latency_p95": _percentile(latencies, 95),
+        }
+
+
+def points_storage_key(entry_id: str) -> str:
+    """Return the storage key of the points cursor of a config entry."""
+    return f"{DOMAIN}.{entry_id}.last_point"
+
+
+class DawarichPointsCoordinator(DawarichHostCoordinator[dict[str, Any] | None]):
+    """Custom coordinator for the last point stored in Dawarich.
+
+    Only points newer than the last seen timestamp are requested, and only the
+    newest of those, so history is never downloaded again. The cursor and the
+    last point are persisted so that a restart does not start from scratch.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: DawarichClient,
+        entry_id: str,
+        scheduler: DawarichHostScheduler,
+        update_interval: timedelta = POINTS_UPDATE_INTERVAL,
+        *,
+        health: DawarichHealthCoordinator | None = None,
+    ):
+        """Initialize coordinator."""
+        super().__init__(
+            hass,
+            api,
+            entry_id,
+            scheduler,
+            name="Dawarich Points",
+            interval=update_interval,
+            health=health,
+        )
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, points_storage_key(entry_id)
+        )
+        self._cursor: int | None = None
+
+    async def _async_setup(self) -> None:
+        """Restore the cursor and the last point from storage."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        self._cursor = stored.get("cursor")
+        self.data = stored.get("point")
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"cursor": self._cursor, "point": self.data}
 
-    async def _async_update_data(self) -> dict[str, int]:
-        response = await self.api.health()
-        if response is None:
-            _LOGGER.error("Dawarich API returned no data")
-            raise UpdateFailed("Dawarich API returned no data")
-        return response.model_dump()
+    async def _async_fetch(self) -> dict[str, Any] | None:
+        start_at = self._cursor + 1 if self._cursor is not None else None
+        response = await self.api.get_points(start_at=start_at, per_page=1)
+        match response.response_code:
+            case 200:
+                if not response.response:
+                    # Nothing new since the last seen point
+                    return self.data
+                point = response.response[0]
+                self._cursor = point.timestamp
+                data = point.model_dump()
+                self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+                return data
+            case 401:
+                _LOGGER.error(
+                    "Invalid credentials when trying to fetch points from Dawarich"
+                )
+                raise ConfigEntryAuthFailed("Invalid API key")
+            case _:
+                _LOGGER.error(
+                    "Error fetching points from Dawarich (status %s) %s",
+                    response.response_code,
+                    response.error,
+                )
+                raise UpdateFailed(
+                    f"Error fetching points from Dawarich (status {response.response_code})"
+                )
@@ -0,0 +1,121 @@
+"""Show the last known position stored in your Dawarich instance."""
+
+import logging
+from datetime import UTC, datetime
+from typing import Any
+
+from homeassistant.components.device_tracker import SourceType, TrackerEntity
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from . import DawarichConfigEntry
+from .coordinator import DawarichPointsCoordinator
+from .helpers import get_device_info
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: DawarichConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+):
+    """Set up Dawarich device tracker."""
+    name = entry.data[CONF_NAME]
+    device_info = get_device_info(entry.entry_id, name, entry.runtime_data.api.url)
+
+    async_add_entities(
+        [
+            DawarichLastPositionTracker(
+                coordinator=entry.runtime_data.points_coordinator,
+                entry_id=entry.entry_id,
+                device_name=name,
+                device_info=device_info,
+            )
+        ]
+    )
+
+
+class DawarichLastPositionTracker(
+    CoordinatorEntity[DawarichPointsCoordinator], TrackerEntity
+):  # type: ignore[incompatible-subclass]
+    """Device tracker for the last point stored in Dawarich.
+
+    This includes points sent by the Dawarich mobile apps, which never pass
+    through Home Assistant.
+    """
+
+    _attr_translation_key = "last_position"
+
+    def __init__(
+        self,
+        coordinator: DawarichPointsCoordinator,
+        entry_id: str,
+        device_name: str,
+        device_info: DeviceInfo,
+    ):
+        """Initialize Dawarich device tracker."""
+        super().__init__(coordinator)
+        self._device_name = device_name
+        self._attr_unique_id = f"{entry_id}/last_position"
+        self._attr_device_info = device_info  # type: ignore[assignment]
+
+    @property
+    def source_type(self) -> SourceType:
+        """Return the source type of the device."""
+        return SourceType.GPS
+
+    @property
+    def latitude(self) -> float | None:
+        """Return the latitude of the last point."""
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data["latitude"]
+
+    @property
+    def longitude(self) -> float | None:
+        """Return the longitude of the last point."""
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data["longitude"]
+
+    @property
+    def location_accuracy(self) -> int:
+        """Return the accuracy of the last point in metres."""
+        if self.coordinator.data is None or self.coordinator.data["accuracy"] is None:
+            return 0
+        return int(self.coordinator.data["accuracy"])
+
+    @property
+    def battery_level(self) -> int | None:
+        """Return the battery level reported with the last point."""
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data["battery"]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the extra attributes of the last point."""
+        if self.coordinator.data is None:
+            return None
+        return {
+            "timestamp": datetime.fromtimestamp(
+                self.coordinator.data["timestamp"], UTC
+            ).isoformat(),
+            "altitude": self.coordinator.data["altitude"],
+            "velocity": self.coordinator.data["velocity"],
+            "tracker_id": self.coordinator.data["tracker_id"],
+        }
+
+    @property
+    def icon(self) -> str:
+        """Return the icon to use in the frontend."""
+        return "mdi:map-marker-account"
+
+    @property
+    def name(self) -> str:  # type: ignore[override]
+        """Return the name of the device tracker."""
+        return f"{self._device_name} Last Known Position"
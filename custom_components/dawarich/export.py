@@ -0,0 +1,275 @@
+"""Streamed export of Dawarich points to GPX, GeoJSON and CSV files."""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TextIO
+from xml.sax.saxutils import escape
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .api import DawarichClient, DawarichPoint, PointsResponse
+from .simplify import StreamingSimplifier
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_PAGE_SIZE = 1000
+EXPORT_PREFETCH_PAGES = 2
+
+
+def _isoformat(timestamp: int) -> str:
+    """Return the ISO 8601 representation of an epoch timestamp."""
+    return datetime.fromtimestamp(timestamp, UTC).isoformat().replace("+00:00", "Z")
+
+
+class PointWriter(ABC):
+    """Format points for an export file, one page at a time."""
+
+    def header(self) -> str:
+        """Return the text written before the first point."""
+        return ""
+
+    @abstractmethod
+    def format(self, points: list[DawarichPoint]) -> str:
+        """Return the text for a page of points."""
+
+    def footer(self) -> str:
+        """Return the text written after the last point."""
+        return ""
+
+
+class GpxWriter(PointWriter):
+    """Write points as a single GPX track."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize the writer."""
+        self._name = name
+
+    def header(self) -> str:
+        """Return the GPX document and track opening."""
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<gpx version="1.1" creator="Dawarich Home Assistant" '
+            'xmlns="http://www.topografix.com/GPX/1/1">\n'
+            f"<trk><name>{escape(self._name)}</name><trkseg>\n"
+        )
+
+    def format(self, points: list[DawarichPoint]) -> str:
+        """Return a track point per point."""
+        lines = []
+        for point in points:
+            elevation = (
+                f"<ele>{point.altitude}</ele>" if point.altitude is not None else ""
+            )
+            lines.append(
+                f'<trkpt lat="{point.latitude}" lon="{point.longitude}">'
+                f"{elevation}<time>{_isoformat(point.timestamp)}</time></trkpt>\n"
+            )
+        return "".join(lines)
+
+    def footer(self) -> str:
+        """Return the track and document closing."""
+        return "</trkseg></trk>\n</gpx>\n"
+
+
+class GeoJsonWriter(PointWriter):
+    """Write points as a GeoJSON feature collection."""
+
+    def __init__(self) -> None:
+        """Initialize the writer."""
+        self._first = True
+
+    def header(self) -> str:
+        """Return the feature collection opening."""
+        return '{"type": "FeatureCollection", "features": [\n'
+
+    def format(self, points: list[DawarichPoint]) -> str:
+        """Return a point feature per point."""
+        features = []
+        for point in points:
+            feature = {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [point.longitude, point.latitude],
+                },
+                "properties": {
+                    "timestamp": point.timestamp,
+                    "altitude": point.altitude,
+                    "velocity": point.velocity,
+                    "accuracy": point.accuracy,
+                    "battery": point.battery,
+                    "tracker_id": point.tracker_id,
+                },
+            }
+            separator = "" if self._first else ",\n"
+            self._first = False
+            features.append(separator + json.dumps(feature))
+        return "".join(features)
+
+    def footer(self) -> str:
+        """Return the feature collection closing."""
+        return "\n]}\n"
+
+
+class CsvWriter(PointWriter):
+    """Write points as CSV rows."""
+
+    FIELDS = (
+        "timestamp",
+        "latitude",
+        "longitude",
+        "altitude",
+        "velocity",
+        "accuracy",
+        "battery",
+        "tracker_id",
+    )
+
+    def header(self) -> str:
+        """Return the header row."""
+        return ",".join(self.FIELDS) + "\r\n"
+
+    def format(self, points: list[DawarichPoint]) -> str:
+        """Return a row per point."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for point in points:
+            row = point.model_dump(include=set(self.FIELDS))
+            row["timestamp"] = _isoformat(point.timestamp)
+            writer.writerow(row[field] for field in self.FIELDS)
+        return buffer.getvalue()
+
+
+def get_writer(export_format: str, name: str) -> PointWriter:
+    """Get the writer for an export format."""
+    match export_format:
+        case "gpx":
+            return GpxWriter(name)
+        case "geojson":
+            return GeoJsonWriter()
+        case "csv":
+            return CsvWriter()
+        case _:
+            raise ValueError(f"Unsupported export format {export_format}")
+
+
+async def async_iter_point_pages(
+    hass: HomeAssistant,
+    api: DawarichClient,
+    start_at: int,
+    end_at: int,
+) -> AsyncIterator[list[DawarichPoint]]:
+    """Yield the pages of points between two timestamps, oldest first.
+
+    Up to `EXPORT_PREFETCH_PAGES` pages are requested while the current page
+    is being processed, so at most that many pages are held in memory.
+    """
+    pending: deque[asyncio.Task[PointsResponse]] = deque()
+
+    def fetch(page: int) -> asyncio.Task[PointsResponse]:
+        return hass.async_create_task(
+            api.get_points(
+                start_at=start_at,
+                end_at=end_at,
+                page=page,
+                per_page=EXPORT_PAGE_SIZE,
+                order="asc",
+            )
+        )
+
+    pending.append(fetch(1))
+    next_page = 2
+    try:
+        while pending:
+            response = await pending.popleft()
+            if not response.success or response.response is None:
+                raise HomeAssistantError(
+                    f"Error fetching points from Dawarich (status {response.response_code})"
+                )
+            while (
+                next_page <= response.total_pages
+                and len(pending) < EXPORT_PREFETCH_PAGES
+            ):
+                pending.append(fetch(next_page))
+                next_page += 1
+            yield response.response
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def async_export_points(
+    hass: HomeAssistant,
+    api: DawarichClient,
+    path: Path,
+    writer: PointWriter,
+    *,
+    start_at: int,
+    end_at: int,
+    simplify_tolerance: float = 0,
+) -> int:
+    """Export the points between two timestamps to a file.
+
+    Every page is written before the next one is taken, so memory stays
+    bounded however large the range is. The file is written next to `path`
+    and only moved into place once the export is complete. With a
+    `simplify_tolerance` in metres the track is simplified while streaming.
+
+    Returns the number of exported points.
+    """
+    partial_path = path.with_name(f"{path.name}.part")
+    simplifier: StreamingSimplifier[DawarichPoint] | None = None
+    if simplify_tolerance > 0:
+        simplifier = StreamingSimplifier(
+            simplify_tolerance, lambda point: (point.latitude, point.longitude)
+        )
+
+    def open_file() -> TextIO:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file = partial_path.open("w", encoding="utf-8", newline="")
+        file.write(writer.header())
+        return file
+
+    def write_page(file: TextIO, points: list[DawarichPoint]) -> int:
+        if simplifier is not None:
+            points = [kept for point in points for kept in simplifier.push(point)]
+        file.write(writer.format(points))
+        return len(points)
+
+    def finish(file: TextIO) -> int:
+        remaining = simplifier.flush() if simplifier is not None else []
+        file.write(writer.format(remaining))
+        file.write(writer.footer())
+        file.close()
+        partial_path.replace(path)
+        return len(remaining)
+
+    def abort(file: TextIO) -> None:
+        file.close()
+        partial_path.unlink(missing_ok=True)
+
+    file = await hass.async_add_executor_job(open_file)
+    exported = 0
+    try:
+        async with aclosing(
+            async_iter_point_pages(hass, api, start_at, end_at)
+        ) as pages:
+            async for points in pages:
+                exported += await hass.async_add_executor_job(write_page, file, points)
+                _LOGGER.debug("Exported %s points to %s", exported, path)
+    except BaseException:
+        await hass.async_add_executor_job(abort, file)
+        raise
+
+    exported += await hass.async_add_executor_job(finish, file)
+    return exported
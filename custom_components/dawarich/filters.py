@@ -0,0 +1,183 @@
+"""Smoothing of the tracker points before they are sent to Dawarich."""
+
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from .const import DOMAIN
+from .simplify import EARTH_RADIUS_M
+
+# Standard deviation of the acceleration of the tracked device, in m/s²
+ACCELERATION_STD = 1.0
+# Accuracy assumed for fixes that do not report one, in metres
+DEFAULT_ACCURACY = 30.0
+# Standard deviation of the speed reported by the device, in m/s
+SPEED_STD = 1.0
+# Speed above which a jump is implausible, unless the device reports it
+MAX_PLAUSIBLE_SPEED = 70.0
+# Restart the filter after this many fixes in a row were dropped
+MAX_REJECTED_FIXES = 3
+# Restart the filter after a gap this long, in seconds
+RESET_AFTER = 1800.0
+
+
+def filter_storage_key(entry_id: str) -> str:
+    """Return the storage key of the tracker filter of a config entry."""
+    return f"{DOMAIN}.{entry_id}.track_filter"
+
+
+def _distance(
+    latitude: float, longitude: float, other_latitude: float, other_longitude: float
+) -> float:
+    """Return the distance in metres between two close positions."""
+    scale = math.cos(math.radians(latitude))
+    east = math.radians(other_longitude - longitude) * scale * EARTH_RADIUS_M
+    north = math.radians(other_latitude - latitude) * EARTH_RADIUS_M
+    return math.hypot(east, north)
+
+
+@dataclass(slots=True)
+class _Axis:
+    """Constant velocity model of one axis, in metres relative to the estimate."""
+
+    velocity: float = 0.0
+    position_variance: float = DEFAULT_ACCURACY**2
+    covariance: float = 0.0
+    velocity_variance: float = 10.0**2
+
+    def predict(self, dt: float) -> float:
+        """Advance the model by `dt` seconds and return the displacement."""
+        noise = ACCELERATION_STD**2
+        self.position_variance += (
+            2 * dt * self.covariance
+            + dt * dt * self.velocity_variance
+            + noise * dt**4 / 4
+        )
+        self.covariance += dt * self.velocity_variance + noise * dt**3 / 2
+        self.velocity_variance += noise * dt * dt
+        return self.velocity * dt
+
+    def update_position(self, residual: float, variance: float) -> float:
+        """Correct with a measured position and return the position correction."""
+        total = self.position_variance + variance
+        position_gain = self.position_variance / total
+        velocity_gain = self.covariance / total
+        self.velocity += velocity_gain * residual
+        self.velocity_variance -= velocity_gain * self.covariance
+        self.position_variance *= 1 - position_gain
+        self.covariance *= 1 - position_gain
+        return position_gain * residual
+
+    def update_velocity(self, measured: float, variance: float) -> float:
+        """Correct with a measured velocity and return the position correction."""
+        residual = measured - self.velocity
+        total = self.velocity_variance + variance
+        position_gain = self.covariance / total
+        velocity_gain = self.velocity_variance / total
+        self.velocity += velocity_gain * residual
+        self.position_variance -= position_gain * self.covariance
+        self.covariance *= 1 - velocity_gain
+        self.velocity_variance *= 1 - velocity_gain
+        return position_gain * residual
+
+
+@dataclass(slots=True)
+class TrackFilter:
+    """Constant velocity Kalman filter for the fixes of one device.
+
+    Each fix is weighted by its reported accuracy, and a reported speed of
+    about zero holds the estimate in place. Fixes that would need an
+    implausible speed to be reached from the current estimate are dropped,
+    where a higher reported speed raises what is plausible. Every fix costs
+    the same constant amount of work, and the whole state can be persisted
+    with `as_dict`.
+    """
+
+    latitude: float | None = None
+    longitude: float | None = None
+    timestamp: float = 0.0
+    rejected: int = 0
+    east: _Axis = field(default_factory=_Axis)
+    north: _Axis = field(default_factory=_Axis)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> "TrackFilter":
+        """Restore a filter persisted with `as_dict`."""
+        if not data:
+            return cls()
+        return cls(
+            latitude=data["latitude"],
+            longitude=data["longitude"],
+            timestamp=data["timestamp"],
+            rejected=data["rejected"],
+            east=_Axis(**data["east"]),
+            north=_Axis(**data["north"]),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the filter for storage."""
+        return asdict(self)
+
+    def update(
+        self,
+        latitude: float,
+        longitude: float,
+        timestamp: float,
+        accuracy: float | None = None,
+        speed: float | None = None,
+    ) -> tuple[float, float] | None:
+        """Add a fix and return the smoothed position, or `None` to drop it."""
+        variance = max(accuracy or DEFAULT_ACCURACY, 1.0) ** 2
+        dt = timestamp - self.timestamp
+        if self.latitude is None or self.longitude is None or dt > RESET_AFTER:
+            return self._reset(latitude, longitude, timestamp, variance)
+
+        max_speed = MAX_PLAUSIBLE_SPEED
+        if speed is not None:
+            max_speed = max(max_speed, 1.5 * speed)
+        # Allow for the uncertainty of both the fix and the estimate
+        jump = _distance(self.latitude, self.longitude, latitude, longitude)
+        uncertainty = 3 * math.sqrt(
+            variance + self.east.position_variance + self.north.position_variance
+        )
+        if jump - uncertainty > max_speed * max(dt, 1.0):
+            self.rejected += 1
+            if self.rejected >= MAX_REJECTED_FIXES:
+                # The estimate is more likely wrong than all of these fixes
+                return self._reset(latitude, longitude, timestamp, variance)
+            return None
+        self.rejected = 0
+
+        east = north = 0.0
+        if dt > 0:
+            east = self.east.predict(dt)
+            north = self.north.predict(dt)
+            self.timestamp = timestamp
+        # Residuals in metres from the predicted position
+        scale = math.cos(math.radians(self.latitude)) * EARTH_RADIUS_M
+        east_residual = math.radians(longitude - self.longitude) * scale - east
+        north_residual = math.radians(latitude - self.latitude) * EARTH_RADIUS_M - north
+        east += self.east.update_position(east_residual, variance)
+        north += self.north.update_position(north_residual, variance)
+
+        if speed is not None and speed <= SPEED_STD:
+            # The speed has no heading, so it is only trusted to tell that
+            # the device stands still, which is when indoor fixes wander most
+            east += self.east.update_velocity(0.0, SPEED_STD**2)
+            north += self.north.update_velocity(0.0, SPEED_STD**2)
+
+        self.latitude += math.degrees(north / EARTH_RADIUS_M)
+        self.longitude += math.degrees(east / scale)
+        return self.latitude, self.longitude
+
+    def _reset(
+        self, latitude: float, longitude: float, timestamp: float, variance: float
+    ) -> tuple[float, float]:
+        """Restart the filter at a fix."""
+        self.latitude = latitude
+        self.longitude = longitude
+        self.timestamp = timestamp
+        self.rejected = 0
+        self.east = _Axis(position_variance=variance)
+        self.north = _Axis(position_variance=variance)
+        return latitude, longitude
@@ -1,13 +1,102 @@
 """Helper functions for the Dawarich integration."""
 
-from dawarich_api import DawarichAPI
+import asyncio
+import math
+from datetime import UTC, datetime, timedelta
+from typing import Any
 
+import aiohttp
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.util import dt as dt_util
 
-def get_api(host: str, api_key: str, use_ssl: bool, verify_ssl: bool) -> DawarichAPI:
-    """Get the API object."""
+from .api import DawarichClient
+from .const import DOMAIN
+
+# Epoch timestamps above this are in milliseconds (it is in the year 5138)
+MAX_EPOCH_SECONDS = 1e11
+# Timestamps further in the future than this are not trusted
+MAX_CLOCK_SKEW = timedelta(hours=1)
+
+
+def get_url(host: str, use_ssl: bool) -> str:
+    """Get the URL of a Dawarich server."""
     url = host.removeprefix("http://").removeprefix("https://")
     if use_ssl:
-        url = f"https://{url}"
+        return f"https://{url}"
+    return f"http://{url}"
+
+
+def get_api(
+    host: str,
+    api_key: str,
+    use_ssl: bool,
+    verify_ssl: bool,
+    *,
+    session: aiohttp.ClientSession | None = None,
+    limiter: asyncio.Semaphore | None = None,
+) -> DawarichClient:
+    """Get the API object."""
+    return DawarichClient(
+        url=get_url(host, use_ssl),
+        api_key=api_key,
+        verify_ssl=verify_ssl,
+        session=session,
+        limiter=limiter,
+    )
+
+
+def get_device_info(entry_id: str, name: str, url: str) -> DeviceInfo:
+    """Get the device info shared by all entities of a config entry."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry_id)},
+        name=name,
+        manufacturer="Dawarich",
+        configuration_url=url,
+        entry_type=DeviceEntryType.SERVICE,
+    )
+
+
+def parse_timestamp(value: Any) -> float | None:
+    """Return a timestamp in epoch seconds, or `None` if it cannot be read.
+
+    Timestamps come as datetimes, ISO 8601 strings or epoch seconds or
+    milliseconds, as numbers or strings. Naive times are taken as UTC, as in
+    GPX files. Values that are not finite or beyond the year 5138 are not
+    timestamps.
+    """
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            if (value := dt_util.parse_datetime(value)) is None:
+                return None
+
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        timestamp = value.timestamp()
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        timestamp = float(value)
     else:
-        url = f"http://{url}"
-    return DawarichAPI(url=url, api_key=api_key, verify_ssl=verify_ssl)
+        return None
+
+    if not math.isfinite(timestamp):
+        return None
+    if timestamp > MAX_EPOCH_SECONDS:
+        timestamp /= 1000
+    if timestamp > MAX_EPOCH_SECONDS:
+        return None
+    return timestamp
+
+
+def normalize_timestamp(value: Any, captured_at: datetime) -> float:
+    """Return a timestamp reported by a device tracker in epoch seconds.
+
+    When the value is missing, unreadable or in the future, the time at
+    which Home Assistant captured the state is used instead.
+    """
+    captured = captured_at.timestamp()
+    timestamp = parse_timestamp(value)
+    if timestamp is None or timestamp > captured + MAX_CLOCK_SKEW.total_seconds():
+        return captured
+    return timestamp
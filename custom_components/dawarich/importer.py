@@ -0,0 +1,383 @@
+"""Streamed import of GPX, GeoJSON and OwnTracks files into Dawarich."""
+
+import asyncio
+import gzip
+import json
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, TextIO
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .api import DawarichClient
+from .helpers import parse_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("gpx", "geojson", "jsonl", "owntracks")
+IMPORT_BATCH_SIZE = 1000
+IMPORT_CONCURRENCY = 4
+READ_CHUNK_SIZE = 1 << 20
+
+# File suffixes of the import formats, before an optional .gz
+FORMAT_SUFFIXES = {
+    ".gpx": "gpx",
+    ".geojson": "geojson",
+    ".json": "geojson",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".rec": "owntracks",
+}
+
+# A point holds the keyword arguments of `DawarichClient.add_one_point`,
+# `None` stands for a record that is not a usable point
+type ImportedPoint = dict[str, Any] | None
+
+
+def detect_format(path: Path) -> str:
+    """Return the import format of a file from its name."""
+    suffixes = path.suffixes
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes = suffixes[:-1]
+    if suffixes and (import_format := FORMAT_SUFFIXES.get(suffixes[-1].lower())):
+        return import_format
+    raise ValueError(f"Cannot tell the format of {path.name} from its name")
+
+
+def _point(
+    latitude: Any, longitude: Any, timestamp: Any, **optional: Any
+) -> ImportedPoint:
+    """Return a point, or `None` if it has no valid position or time."""
+    if latitude is None or longitude is None:
+        return None
+    try:
+        if (parsed_timestamp := parse_timestamp(timestamp)) is None:
+            return None
+        point = {
+            "latitude": float(latitude),
+            "longitude": float(longitude),
+            "timestamp": parsed_timestamp,
+        }
+        point.update(
+            (key, float(value)) for key, value in optional.items() if value is not None
+        )
+    except (TypeError, ValueError):
+        return None
+    if "battery_level" in point:
+        point["battery_level"] = int(point["battery_level"])
+    return point
+
+
+def _local_name(tag: str) -> str:
+    """Return the tag of an XML element without its namespace."""
+    return tag.rpartition("}")[2]
+
+
+def _point_from_gpx(element: Element) -> ImportedPoint:
+    """Return the point of a GPX track, route or way point."""
+    children = {_local_name(child.tag): child.text for child in element}
+    return _point(
+        element.get("lat"),
+        element.get("lon"),
+        children.get("time"),
+        altitude=children.get("ele"),
+        speed=children.get("speed"),
+    )
+
+
+def iter_gpx_points(file: TextIO) -> Iterator[ImportedPoint]:
+    """Yield the points of a GPX file.
+
+    Every point is removed from the document once read, so memory does not
+    grow with the size of the file.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    stack: list[Element] = []
+
+    def points() -> Iterator[ImportedPoint]:
+        for event, element in parser.read_events():
+            if event == "start":
+                stack.append(element)
+                continue
+            stack.pop()
+            if _local_name(element.tag) in ("trkpt", "rtept", "wpt"):
+                yield _point_from_gpx(element)
+                if stack:
+                    stack[-1].remove(element)
+
+    while chunk := file.read(READ_CHUNK_SIZE):
+        parser.feed(chunk)
+        yield from points()
+    parser.close()
+    yield from points()
+
+
+def _point_from_feature(feature: dict[str, Any]) -> ImportedPoint:
+    """Return the point of a GeoJSON feature, as exported by Dawarich."""
+    geometry = feature.get("geometry") or {}
+    properties = feature.get("properties") or {}
+    if geometry.get("type") != "Point":
+        return None
+    coordinates = geometry.get("coordinates") or []
+    if len(coordinates) < 2:
+        return None
+    return _point(
+        coordinates[1],
+        coordinates[0],
+        properties.get("timestamp"),
+        altitude=properties.get("altitude", (coordinates[2:3] or [None])[0]),
+        speed=properties.get("speed", properties.get("velocity")),
+        horizontal_accuracy=properties.get(
+            "horizontal_accuracy", properties.get("accuracy")
+        ),
+        vertical_accuracy=properties.get("vertical_accuracy"),
+        battery_level=properties.get("battery_level", properties.get("battery")),
+    )
+
+
+def _point_from_owntracks(location: dict[str, Any]) -> ImportedPoint:
+    """Return the point of an OwnTracks location message."""
+    return _point(
+        location.get("lat"),
+        location.get("lon"),
+        location.get("tst"),
+        altitude=location.get("alt"),
+        # OwnTracks reports the velocity in km/h
+        speed=location["vel"] / 3.6 if location.get("vel") is not None else None,
+        horizontal_accuracy=location.get("acc"),
+        vertical_accuracy=location.get("vac"),
+        battery_level=location.get("batt"),
+    )
+
+
+def _point_from_object(record: Any) -> ImportedPoint:
+    """Return the point of a GeoJSON feature, OwnTracks location or plain record."""
+    if not isinstance(record, dict):
+        return None
+    if record.get("type") == "Feature":
+        return _point_from_feature(record)
+    if record.get("_type") == "location":
+        return _point_from_owntracks(record)
+    return _point(
+        record.get("latitude", record.get("lat")),
+        record.get("longitude", record.get("lon")),
+        record.get("timestamp", record.get("time")),
+        altitude=record.get("altitude"),
+        speed=record.get("speed", record.get("velocity")),
+        horizontal_accuracy=record.get("accuracy"),
+        battery_level=record.get("battery"),
+    )
+
+
+class _JsonReader:
+    """Read the values of a large JSON document one at a time."""
+
+    def __init__(self, file: TextIO) -> None:
+        """Initialize the reader."""
+        self._file = file
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Read the next chunk, dropping what has been consumed."""
+        if self._eof:
+            return False
+        chunk = self._file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next character that is not whitespace, empty at the end."""
+        while True:
+            buffer = self._buffer
+            while self._position < len(buffer) and buffer[self._position] in " \t\r\n":
+                self._position += 1
+            if self._position < len(buffer) or not self._fill():
+                return buffer[self._position : self._position + 1]
+
+    def expect(self, character: str) -> None:
+        """Consume a structural character."""
+        if (found := self.peek()) != character:
+            raise ValueError(f"Expected {character!r} in JSON, found {found!r}")
+        self._position += 1
+
+    def value(self) -> Any:
+        """Decode the next value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError as err:
+                if not self._fill():
+                    raise ValueError(f"Invalid JSON: {err}") from err
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end < len(self._buffer) or not self._fill():
+                self._position = end
+                return value
+
+    def array(self) -> Iterator[Any]:
+        """Yield the values of an array."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._position += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == "]":
+                self._position += 1
+                return
+            self.expect(",")
+
+
+def iter_geojson_points(file: TextIO) -> Iterator[ImportedPoint]:
+    """Yield the points of a GeoJSON feature collection, or an array of features.
+
+    Only one feature is decoded at a time, however large the collection is.
+    """
+    reader = _JsonReader(file)
+    if reader.peek() == "[":
+        for feature in reader.array():
+            yield _point_from_object(feature)
+        return
+
+    reader.expect("{")
+    while reader.peek() != "}":
+        key = reader.value()
+        reader.expect(":")
+        if key == "features":
+            for feature in reader.array():
+                yield _point_from_object(feature)
+        else:
+            reader.value()
+        if reader.peek() != "}":
+            reader.expect(",")
+
+
+def iter_jsonl_points(file: TextIO) -> Iterator[ImportedPoint]:
+    """Yield the points of a file with a JSON record per line.
+
+    This also reads the files of the OwnTracks recorder, where every line
+    starts with a timestamp and a tag before the location message.
+    """
+    for line in file:
+        if (start := line.find("{")) == -1:
+            continue
+        try:
+            record = json.loads(line[start:])
+        except json.JSONDecodeError:
+            yield None
+            continue
+        yield _point_from_object(record)
+
+
+def iter_batches(
+    path: Path, import_format: str, batch_size: int
+) -> Iterator[tuple[list[dict[str, Any]], int]]:
+    """Yield the points of a file in batches, with the number of skipped records.
+
+    This does blocking I/O, so it has to run in the executor.
+    """
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as file:
+        match import_format:
+            case "gpx":
+                points = iter_gpx_points(file)
+            case "geojson":
+                points = iter_geojson_points(file)
+            case "jsonl" | "owntracks":
+                points = iter_jsonl_points(file)
+            case _:
+                raise ValueError(f"Unsupported import format {import_format}")
+
+        batch: list[dict[str, Any]] = []
+        skipped = 0
+        for point in points:
+            if point is None:
+                skipped += 1
+                continue
+            batch.append(point)
+            if len(batch) >= batch_size:
+                yield batch, skipped
+                batch, skipped = [], 0
+        if batch or skipped:
+            yield batch, skipped
+
+
+async def _async_next_batch(
+    hass: HomeAssistant,
+    path: Path,
+    batches: Iterator[tuple[list[dict[str, Any]], int]],
+) -> tuple[list[dict[str, Any]], int] | None:
+    """Parse the next batch of a file in the executor."""
+    try:
+        return await hass.async_add_executor_job(next, batches, None)
+    except (OSError, ValueError, ParseError) as err:
+        raise HomeAssistantError(f"Error reading {path}: {err}") from err
+
+
+async def async_import_file(
+    hass: HomeAssistant,
+    api: DawarichClient,
+    path: Path,
+    import_format: str,
+    name: str,
+    *,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    concurrency: int = IMPORT_CONCURRENCY,
+) -> tuple[int, int]:
+    """Import the points of a file into Dawarich.
+
+    The file is parsed in the executor one batch at a time, while up to
+    `concurrency` batches are being uploaded, so memory stays bounded
+    however large the file is. The uploads also go through the request
+    limiter of the client.
+
+    Returns the number of imported points and of skipped records.
+    """
+    batches = iter_batches(path, import_format, batch_size)
+    pending: set[asyncio.Task[int]] = set()
+    imported = skipped = 0
+
+    async def upload(points: list[dict[str, Any]]) -> int:
+        response = await api.add_points(points, name)
+        if not response.success:
+            raise HomeAssistantError(
+                f"Error sending points to Dawarich (status {response.response_code})"
+            )
+        return len(points)
+
+    try:
+        while batch := await _async_next_batch(hass, path, batches):
+            points, batch_skipped = batch
+            skipped += batch_skipped
+            if not points:
+                continue
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                imported += sum(task.result() for task in done)
+            pending.add(hass.async_create_task(upload(points)))
+            _LOGGER.debug("Imported %s points from %s so far", imported, path)
+        if pending:
+            done, pending = await asyncio.wait(pending)
+            imported += sum(task.result() for task in done)
+    except HomeAssistantError as err:
+        raise HomeAssistantError(
+            f"{err}, {imported} points were imported before the error"
+        ) from err
+    finally:
+        for task in pending:
+            task.cancel()
+        await hass.async_add_executor_job(batches.close)
+    return imported, skipped
@@ -0,0 +1,219 @@
+"""On demand profiling of the hot paths of the Dawarich integration.
+
+Hot paths are marked with `profiled` or `span`, which do nothing but check a
+global while no session is running. While a `ProfileSession` runs, every
+marked call is timed, and cProfile is enabled only while the integration's
+own code runs on the event loop: for coroutines, during each step between
+two awaits. The rest of Home Assistant is not profiled, so this is cheap
+enough for a busy instance.
+"""
+
+import cProfile
+import functools
+import inspect
+import logging
+import time
+from collections.abc import Callable, Coroutine, Generator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+_session: "ProfileSession | None" = None
+
+
+@dataclass(slots=True)
+class SpanStats:
+    """Timings of a profiled code path, in milliseconds.
+
+    The wall time of a coroutine includes its awaits, the loop time only
+    the steps it spent running on the event loop.
+    """
+
+    count: int = 0
+    wall_ms: float = 0.0
+    wall_max_ms: float = 0.0
+    loop_ms: float = 0.0
+    loop_max_ms: float = 0.0
+
+    def add(self, wall_ms: float, loop_ms: float) -> None:
+        """Add the timings of a call."""
+        self.count += 1
+        self.wall_ms += wall_ms
+        self.wall_max_ms = max(self.wall_max_ms, wall_ms)
+        self.loop_ms += loop_ms
+        self.loop_max_ms = max(self.loop_max_ms, loop_ms)
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the timings, rounded for a service response."""
+        return {
+            "count": self.count,
+            "wall_ms": round(self.wall_ms, 3),
+            "wall_max_ms": round(self.wall_max_ms, 3),
+            "loop_ms": round(self.loop_ms, 3),
+            "loop_max_ms": round(self.loop_max_ms, 3),
+        }
+
+
+class ProfileSession:
+    """Collect the timings and the cProfile stats of the marked code paths."""
+
+    def __init__(self) -> None:
+        """Initialize the session."""
+        self.profile = cProfile.Profile()
+        self.spans: dict[str, SpanStats] = {}
+        self._depth = 0
+        self._closed = False
+
+    def start(self) -> None:
+        """Make this the running session.
+
+        Raises ValueError if another profiler, such as the one of Home
+        Assistant, is running.
+        """
+        global _session  # noqa: PLW0603
+        # Fail now rather than on the first profiled call
+        self.profile.enable()
+        self.profile.disable()
+        _session = self
+
+    def stop(self) -> None:
+        """Stop profiling, calls still in flight are no longer recorded."""
+        global _session  # noqa: PLW0603
+        if _session is self:
+            _session = None
+        self._closed = True
+        if self._depth:
+            self.profile.disable()
+            self._depth = 0
+
+    def resume(self) -> None:
+        """Enable cProfile, unless an outer profiled call already did.
+
+        If another profiler started since, the session is stopped instead,
+        as profiling must never fail the code it wraps.
+        """
+        if self._closed:
+            return
+        if self._depth == 0:
+            try:
+                self.profile.enable()
+            except ValueError as err:
+                _LOGGER.warning("Stopping the profile session: %s", err)
+                self.stop()
+                return
+        self._depth += 1
+
+    def pause(self) -> None:
+        """Disable cProfile when the outermost profiled call leaves."""
+        if self._closed:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            self.profile.disable()
+
+    def _record(self, name: str, wall_ms: float, loop_ms: float) -> None:
+        """Record the timings of a call."""
+        if self._closed:
+            return
+        if (stats := self.spans.get(name)) is None:
+            stats = self.spans[name] = SpanStats()
+        stats.add(wall_ms, loop_ms)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Profile a synchronous block."""
+        start = time.perf_counter()
+        self.resume()
+        try:
+            yield
+        finally:
+            self.pause()
+            elapsed = (time.perf_counter() - start) * 1000
+            self._record(name, elapsed, elapsed)
+
+    async def run[T](self, name: str, coro: Coroutine[Any, Any, T]) -> T:
+        """Profile a coroutine, only while its steps run on the event loop."""
+        start = time.perf_counter()
+        step = _ProfiledCoroutine(self, coro)
+        try:
+            return await step
+        finally:
+            self._record(name, (time.perf_counter() - start) * 1000, step.loop_ms)
+
+
+class _ProfiledCoroutine[T]:
+    """Await a coroutine, profiling each step it runs."""
+
+    def __init__(self, session: ProfileSession, coro: Coroutine[Any, Any, T]) -> None:
+        """Initialize the wrapper."""
+        self._session = session
+        self._coro = coro
+        self.loop_ms = 0.0
+
+    def __await__(self) -> Generator[Any, Any, T]:
+        """Drive the coroutine, forwarding what the event loop sends to it."""
+        value: Any = None
+        error: BaseException | None = None
+        while True:
+            start = time.perf_counter()
+            self._session.resume()
+            try:
+                if error is None:
+                    future = self._coro.send(value)
+                else:
+                    future = self._coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._session.pause()
+                self.loop_ms += (time.perf_counter() - start) * 1000
+            try:
+                value, error = (yield future), None
+            except BaseException as err:  # noqa: BLE001
+                value, error = None, err
+
+
+def profiled[**P, R](
+    name: str,
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Mark a function or coroutine function as a hot path."""
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+                coro = func(*args, **kwargs)
+                if (session := _session) is None:
+                    return await coro
+                return await session.run(name, coro)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if (session := _session) is None:
+                return func(*args, **kwargs)
+            with session.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Mark a block as a hot path."""
+    if (session := _session) is None:
+        yield
+        return
+    with session.span(name):
+        yield
+
+
+def profile_running() -> bool:
+    """Return whether a session is running."""
+    return _session is not None
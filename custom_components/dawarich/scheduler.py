@@ -0,0 +1,59 @@
+"""Per-host scheduling of the requests to a Dawarich server."""
+
+import asyncio
+import random
+from datetime import timedelta
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+MAX_CONCURRENT_REQUESTS_PER_HOST = 4
+# Fraction of a coordinator's slot used for random jitter
+SCHEDULE_JITTER = 0.25
+# Never schedule a refresh closer than this to the previous one
+MIN_REFRESH_DELAY = timedelta(seconds=5)
+
+
+class DawarichHostScheduler:
+    """Spread the refreshes of all coordinators polling one host.
+
+    Every registered coordinator gets its own slot in the polling interval,
+    with a bit of jitter, instead of all of them refreshing on the same tick.
+    All requests to the host share `limiter`, which caps how many of them are
+    in flight at once.
+    """
+
+    def __init__(self, host: str) -> None:
+        """Initialize the scheduler."""
+        self.host = host
+        self.limiter = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS_PER_HOST)
+        self._members: dict[str, float] = {}
+
+    @callback
+    def async_register(self, key: str) -> CALLBACK_TYPE:
+        """Register a coordinator and return a callback to unregister it."""
+        self._members[key] = random.random() * SCHEDULE_JITTER
+
+        @callback
+        def _async_unregister() -> None:
+            self._members.pop(key, None)
+
+        return _async_unregister
+
+    def next_refresh_delay(
+        self, key: str, interval: timedelta, now: float
+    ) -> timedelta:
+        """Return the delay until the next slot of a coordinator.
+
+        `now` is a monotonic time in seconds, such as the event loop time.
+        """
+        if key not in self._members:
+            return interval
+        members = list(self._members)
+        slot = interval.total_seconds() / len(members)
+        phase = (members.index(key) + self._members[key]) * slot
+
+        seconds = interval.total_seconds()
+        delay = (phase - now) % seconds
+        if delay < MIN_REFRESH_DELAY.total_seconds():
+            delay += seconds
+        return timedelta(seconds=delay)
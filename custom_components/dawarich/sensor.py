@@ -1,36 +1,88 @@
 """Show statistical data from your Dawarich instance."""
 
 import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
 
-from dawarich_api import DawarichAPI
 from homeassistant.components.device_tracker.const import SourceType
 from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
 from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
 from homeassistant.const import (
     CONF_HOST,
     CONF_NAME,
+    PERCENTAGE,
+    EntityCategory,
     UnitOfLength,
+    UnitOfTime,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
 )
-from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+    async_track_time_change,
+)
 from homeassistant.helpers.issue_registry import (
     IssueSeverity,
     async_create_issue,
     async_delete_issue,
 )
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
 )
+from homeassistant.util import dt as dt_util
 
 from custom_components.dawarich import DawarichConfigEntry
 
-from .const import CONF_DEVICE, DOMAIN, DawarichTrackerStates
-from .coordinator import DawarichStatsCoordinator, DawarichVersionCoordinator
+from .api import DawarichClient
+from .const import (
+    CONF_DEVICE,
+    CONF_SIMPLIFY_TOLERANCE,
+    CONF_SMOOTHING,
+    CONF_UPLOAD_BATCH_SIZE,
+    CONF_UPLOAD_CONCURRENCY,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+    DEFAULT_SMOOTHING,
+    DEFAULT_UPLOAD_BATCH_SIZE,
+    DEFAULT_UPLOAD_CONCURRENCY,
+    DOMAIN,
+    SIMPLIFY_FLUSH_DELAY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    TRACKER_STATE_WRITE_INTERVAL,
+    DawarichTrackerStates,
+)
+from .coordinator import (
+    DawarichHealthCoordinator,
+    DawarichStatsBreakdown,
+    DawarichStatsCoordinator,
+)
+from .filters import TrackFilter, filter_storage_key
+from .helpers import get_device_info, normalize_timestamp
+from .profiler import profiled
+from .simplify import StreamingSimplifier
+from .tiles import TileIndex
+from .uploader import (
+    DawarichPointSender,
+    DawarichUploader,
+    upload_options_signal,
+    upload_queue_storage_key,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -69,6 +121,63 @@ SENSOR_TYPES = (
     ),
 )
 
+
+@dataclass(frozen=True, kw_only=True)
+class DawarichBreakdownSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor derived from the yearly stats of Dawarich."""
+
+    value_fn: Callable[[DawarichStatsBreakdown, date], StateType]
+
+
+BREAKDOWN_SENSOR_TYPES = (
+    DawarichBreakdownSensorEntityDescription(
+        key="current_month_distance_km",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        name="Distance This Month",
+        icon="mdi:calendar-month",
+        device_class=SensorDeviceClass.DISTANCE,
+        # Drops back to 0 when a month or year begins, which the recorder
+        # takes as a meter reset
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        translation_key="current_month_distance",
+        value_fn=lambda breakdown, today: breakdown.monthly_distance_km.get(
+            (today.year, today.month), 0
+        ),
+    ),
+    DawarichBreakdownSensorEntityDescription(
+        key="current_year_distance_km",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        name="Distance This Year",
+        icon="mdi:calendar-range",
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        translation_key="current_year_distance",
+        value_fn=lambda breakdown, today: breakdown.years.get(today.year, {}).get(
+            "total_distance_km", 0
+        ),
+    ),
+    DawarichBreakdownSensorEntityDescription(
+        key="current_year_countries_visited",
+        name="Countries Visited This Year",
+        icon="mdi:earth",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        translation_key="current_year_countries_visited",
+        value_fn=lambda breakdown, today: breakdown.years.get(today.year, {}).get(
+            "total_countries_visited", 0
+        ),
+    ),
+    DawarichBreakdownSensorEntityDescription(
+        key="current_year_cities_visited",
+        name="Cities Visited This Year",
+        icon="mdi:city",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        translation_key="current_year_cities_visited",
+        value_fn=lambda breakdown, today: breakdown.years.get(today.year, {}).get(
+            "total_cities_visited", 0
+        ),
+    ),
+)
+
 TRACKER_SENSOR_TYPES = SensorEntityDescription(
     key="last_update",
     name="Last Update",
@@ -82,8 +191,86 @@ VERSION_SENSOR_TYPES = SensorEntityDescription(
     translation_key="version",
 )
 
+HEALTH_SENSOR_TYPES = (
+    SensorEntityDescription(
+        key="availability",
+        native_unit_of_measurement=PERCENTAGE,
+        name="Dawarich Availability",
+        icon="mdi:heart-pulse",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        translation_key="availability",
+    ),
+    SensorEntityDescription(
+        key="latency_median",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        name="Dawarich Latency Median",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        translation_key="latency_median",
+    ),
+    SensorEntityDescription(
+        key="latency_p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        name="Dawarich Latency 95th Percentile",
+        icon="mdi:timer-alert-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        translation_key="latency_p95",
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class DawarichTileSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor derived from the visited tiles index."""
+
+    value_fn: Callable[[TileIndex, date], StateType]
+
+
+TILE_SENSOR_TYPES = (
+    DawarichTileSensorEntityDescription(
+        key="tiles_visited",
+        name="Tiles Visited",
+        icon="mdi:checkerboard",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        translation_key="tiles_visited",
+        value_fn=lambda tiles, today: len(tiles.tiles),
+    ),
+    DawarichTileSensorEntityDescription(
+        key="new_tiles_today",
+        name="New Tiles Today",
+        icon="mdi:checkerboard-plus",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        translation_key="new_tiles_today",
+        value_fn=lambda tiles, today: tiles.new_tiles_on(today),
+    ),
+    DawarichTileSensorEntityDescription(
+        key="exploration_percent_of_home_region",
+        native_unit_of_measurement=PERCENTAGE,
+        name="Home Region Explored",
+        icon="mdi:map-search",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        translation_key="exploration_percent_of_home_region",
+        value_fn=lambda tiles, today: (
+            round(100 * tiles.home_tiles_visited / tiles.home_tiles, 4)
+            if tiles.home_tiles
+            else None
+        ),
+    ),
+)
+
 type DawarichSensors = (
-    DawarichTrackerSensor | DawarichStatisticsSensor | DawarichVersionSensor
+    DawarichTrackerSensor
+    | DawarichStatisticsSensor
+    | DawarichBreakdownSensor
+    | DawarichVersionSensor
+    | DawarichHealthSensor
+    | DawarichTileSensor
 )
 
 
@@ -99,35 +286,45 @@ async def async_setup_entry(
     # Use entry_id for stable identifiers (doesn't change when API key changes)
     entry_id = entry.entry_id
 
-    device_info = DeviceInfo(
-        identifiers={(DOMAIN, entry_id)},
-        name=name,
-        manufacturer="Dawarich",
-        configuration_url=entry.runtime_data.api.url,
-        entry_type=DeviceEntryType.SERVICE,
-    )
+    device_info = get_device_info(entry_id, name, entry.runtime_data.api.url)
 
     # Add statistics sensor
     sensors: list[DawarichSensors] = [
         DawarichStatisticsSensor(url, entry_id, name, desc, coordinator, device_info)
         for desc in SENSOR_TYPES
     ]
+    sensors.extend(
+        DawarichBreakdownSensor(url, entry_id, name, desc, coordinator, device_info)
+        for desc in BREAKDOWN_SENSOR_TYPES
+    )
 
-    # Add version sensor
+    # Add version and health sensors
+    health = entry.runtime_data.server.health_coordinator
     sensors.append(
         DawarichVersionSensor(
-            coordinator=entry.runtime_data.version_coordinator,
+            coordinator=health,
             description=VERSION_SENSOR_TYPES,
             entry_id=entry_id,
             device_info=device_info,
         )
     )
+    sensors.extend(
+        DawarichHealthSensor(
+            coordinator=health,
+            description=desc,
+            entry_id=entry_id,
+            device_info=device_info,
+        )
+        for desc in HEALTH_SENSOR_TYPES
+    )
 
     # Add (optional) mobile app tracker sensor
     mobile_app = entry.data[CONF_DEVICE]
     if mobile_app is not None:
         _LOGGER.info("Adding tracker sensor for %s", mobile_app)
         api = entry.runtime_data.api
+        tiles = TileIndex(hass, entry_id)
+        entry.async_on_unload(await tiles.async_load())
         sensors.append(
             DawarichTrackerSensor(
                 entry_id=entry_id,
@@ -137,8 +334,24 @@ async def async_setup_entry(
                 hass=hass,
                 device_info=device_info,
                 description=TRACKER_SENSOR_TYPES,
+                simplify_tolerance=entry.options.get(
+                    CONF_SIMPLIFY_TOLERANCE, DEFAULT_SIMPLIFY_TOLERANCE
+                ),
+                smoothing=entry.options.get(CONF_SMOOTHING, DEFAULT_SMOOTHING),
+                health=entry.runtime_data.server.health_coordinator,
+                tiles=tiles,
+                upload_batch_size=entry.options.get(
+                    CONF_UPLOAD_BATCH_SIZE, DEFAULT_UPLOAD_BATCH_SIZE
+                ),
+                upload_concurrency=entry.options.get(
+                    CONF_UPLOAD_CONCURRENCY, DEFAULT_UPLOAD_CONCURRENCY
+                ),
             )
         )
+        sensors.extend(
+            DawarichTileSensor(entry_id, name, desc, tiles, device_info)
+            for desc in TILE_SENSOR_TYPES
+        )
     else:
         _LOGGER.info("No mobile device provided, skipping tracker sensor")
 
@@ -148,17 +361,33 @@ async def async_setup_entry(
 class DawarichTrackerSensor(SensorEntity):
     """Sensor that updates and keep track of the updates to the Dawarich API."""
 
+    _attr_should_poll = False
+
     def __init__(
         self,
         entry_id: str,
         device_name: str,
         mobile_app: str,
-        api: DawarichAPI,
+        api: DawarichClient,
         hass: HomeAssistant,
         device_info: DeviceInfo,
         description: SensorEntityDescription,
+        simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
+        smoothing: bool = DEFAULT_SMOOTHING,
+        health: DawarichHealthCoordinator | None = None,
+        tiles: TileIndex | None = None,
+        upload_batch_size: int = DEFAULT_UPLOAD_BATCH_SIZE,
+        upload_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
     ) -> None:
-        """Initialize the sensor."""
+        """Initialize the sensor.
+
+        Uploads are paused while the `health` coordinator reports the server
+        unavailable, the points queue up until it is back, across restarts.
+        Every point that is not dropped marks its tile as visited in `tiles`.
+        While the upload queue has a backlog, up to `upload_batch_size`
+        points are sent per request, with up to `upload_concurrency` requests
+        in flight.
+        """
         self._device_name = device_name
         self._mobile_app = mobile_app
         self._entry_id = entry_id
@@ -168,6 +397,40 @@ class DawarichTrackerSensor(SensorEntity):
         self._attr_device_class = description.device_class
         self.entity_description = description
         self._repair_issue_created = False
+        # Timestamp of the newest point passed on to be sent
+        self._last_timestamp: float | None = None
+        # The filter is restored from storage when the entity is added
+        self._smoothing = smoothing
+        self._track_filter: TrackFilter | None = None
+        self._filter_store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, filter_storage_key(entry_id)
+        )
+        # Points are only held back when simplification is enabled
+        self._simplifier: StreamingSimplifier[dict[str, Any]] | None = None
+        if simplify_tolerance > 0:
+            self._simplifier = StreamingSimplifier(
+                simplify_tolerance,
+                lambda point: (point["latitude"], point["longitude"]),
+            )
+        self._cancel_simplifier_flush: CALLBACK_TYPE | None = None
+        # The upload queue is published on a timer, not for every point
+        self._cancel_state_write: CALLBACK_TYPE | None = None
+        self._sender = DawarichPointSender(
+            hass,
+            mobile_app,
+            self._async_send_points,
+            upload_batch_size,
+            upload_concurrency,
+        )
+        self._uploader = DawarichUploader(
+            hass,
+            mobile_app,
+            self._async_process_state,
+            idle=self._sender.async_flush,
+            store=Store(hass, STORAGE_VERSION, upload_queue_storage_key(entry_id)),
+        )
+        self._health = health
+        self._tiles = tiles
 
         self._async_unsubscribe_state_changed = async_track_state_change_event(
             hass=self._hass,
@@ -182,6 +445,52 @@ class DawarichTrackerSensor(SensorEntity):
         # Check initial state of the tracked entity
         initial_state = self._hass.states.get(self._mobile_app)
         self._async_check_entity_availability(initial_state)
+        if self._smoothing:
+            self._track_filter = TrackFilter.from_dict(
+                await self._filter_store.async_load()
+            )
+        if self._health is not None:
+            self.async_on_remove(
+                self._health.async_add_listener(self._async_health_updated)
+            )
+            self._async_health_updated()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self._hass,
+                upload_options_signal(self._entry_id),
+                self._async_set_upload_options,
+            )
+        )
+        await self._uploader.async_load()
+        self._uploader.async_start()
+
+    @callback
+    def _async_set_upload_options(self, batch_size: int, concurrency: int) -> None:
+        """Apply new upload options to the points still to be sent."""
+        _LOGGER.debug(
+            "Sending the points of %s in batches of %s, %s at a time",
+            self._mobile_app,
+            batch_size,
+            concurrency,
+        )
+        self._sender.batch_size = batch_size
+        self._sender.concurrency = concurrency
+
+    @callback
+    def _async_health_updated(self) -> None:
+        """Pause or resume the uploads after a health probe."""
+        assert self._health is not None
+        # Nothing to do while the uploads already follow the health
+        if self._health.healthy != self._uploader.paused:
+            return
+        if self._health.healthy:
+            _LOGGER.debug("Resuming the uploads of %s", self._mobile_app)
+            self._uploader.async_resume()
+            self._async_schedule_queue_write()
+        else:
+            _LOGGER.debug("Pausing the uploads of %s", self._mobile_app)
+            self._uploader.async_pause()
+        self.async_write_ha_state()
 
     @property
     def _issue_id(self) -> str:
@@ -226,6 +535,14 @@ class DawarichTrackerSensor(SensorEntity):
     async def async_will_remove_from_hass(self) -> None:
         """Clean up when entity is removed."""
         self._async_unsubscribe_state_changed()
+        await self._uploader.async_stop()
+        if self._cancel_simplifier_flush is not None:
+            self._cancel_simplifier_flush()
+        if self._cancel_state_write is not None:
+            self._cancel_state_write()
+            self._cancel_state_write = None
+        await self._async_flush_simplifier(dt_util.utcnow())
+        await self._sender.async_drain()
         if self._repair_issue_created:
             async_delete_issue(self._hass, DOMAIN, self._issue_id)
 
@@ -244,7 +561,51 @@ class DawarichTrackerSensor(SensorEntity):
         """Return the icon to use in the frontend."""
         return "mdi:map-marker-circle"
 
-    async def _async_update_callback(self, event):
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state of the upload queue."""
+        return {
+            "queued_points": self._uploader.queued + self._sender.pending,
+            "uploads_in_flight": self._sender.in_flight,
+            "uploads_paused": self._uploader.paused,
+            "dropped_points": self._uploader.dropped,
+            "callback_time_us": round(self._uploader.callback_time_us, 1),
+            "callback_time_max_us": round(self._uploader.callback_time_max_us, 1),
+        }
+
+    @callback
+    @profiled("tracker.callback")
+    def _async_update_callback(self, event: Event[EventStateChangedData]) -> None:
+        """Queue the new location, it is sent to the Dawarich API in the background.
+
+        This runs on the event loop for every state change of the tracked
+        entity, so it must not do more than enqueue the state.
+        """
+        self._uploader.async_enqueue(event.data["new_state"])
+        self._async_schedule_queue_write()
+
+    @callback
+    def _async_schedule_queue_write(self) -> None:
+        """Publish the upload queue in a while, unless that is already due."""
+        if self._cancel_state_write is None:
+            self._cancel_state_write = async_call_later(
+                self._hass, TRACKER_STATE_WRITE_INTERVAL, self._async_write_queue_state
+            )
+
+    @callback
+    def _async_write_queue_state(self, _now: datetime) -> None:
+        """Publish the upload queue, and again later while it is being sent."""
+        self._cancel_state_write = None
+        if self.hass is None:
+            return
+        self.async_write_ha_state()
+        if not self._uploader.paused and (
+            self._uploader.queued or self._sender.pending or self._sender.in_flight
+        ):
+            self._async_schedule_queue_write()
+
+    @profiled("tracker.process_state")
+    async def _async_process_state(self, new_state: State | None) -> None:
         """Update the Dawarich API with the new location."""
         if await self._async_check_is_disabled():
             return
@@ -252,7 +613,6 @@ class DawarichTrackerSensor(SensorEntity):
         _LOGGER.debug(
             "State change detected for %s, updating Dawarich", self._mobile_app
         )
-        new_state = event.data.get("new_state")
 
         if not self._async_check_entity_availability(new_state):
             return
@@ -263,7 +623,8 @@ class DawarichTrackerSensor(SensorEntity):
 
         # Log received data
         new_data = new_state.attributes
-        _LOGGER.debug("Received data: %s", new_data)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Received data: %s", dict(new_data))
 
         # Get coordinates from new_data
         latitude = new_data.get("latitude")
@@ -285,16 +646,99 @@ class DawarichTrackerSensor(SensorEntity):
             return
 
         optional_params = await self._async_add_optional_params(new_data)
+        point = {"latitude": latitude, "longitude": longitude, **optional_params}
+        if not self._async_stamp_point(point, new_state.last_updated):
+            _LOGGER.debug(
+                "Dropping duplicate or out of order location of %s", self._mobile_app
+            )
+            return
+        await self._async_forward_point(point)
 
-        # Send to Dawarich API
-        response = await self._api.add_one_point(
-            name=self._device_name,
-            latitude=latitude,
-            longitude=longitude,
-            **optional_params,
+    async def _async_forward_point(self, point: dict[str, Any]) -> None:
+        """Smooth and simplify a stamped point, and send what is left of it."""
+        if self._track_filter is not None and not self._async_smooth_point(point):
+            _LOGGER.debug("Dropping implausible location of %s", self._mobile_app)
+            return
+        if self._tiles is not None:
+            self._tiles.async_add_point(
+                point["latitude"], point["longitude"], point["timestamp"]
+            )
+
+        if self._simplifier is None:
+            await self._async_send_point(point)
+            return
+
+        for kept_point in self._simplifier.push(point):
+            await self._async_send_point(kept_point)
+        self._async_schedule_simplifier_flush()
+
+    @callback
+    def _async_stamp_point(self, point: dict[str, Any], captured_at: datetime) -> bool:
+        """Normalize the timestamp of a point to epoch seconds.
+
+        Every point is stamped, so that it keeps its time however late it is
+        sent. Returns False if the point is not newer than the last one.
+        """
+        timestamp = normalize_timestamp(point.get("timestamp"), captured_at)
+        if self._last_timestamp is not None and timestamp <= self._last_timestamp:
+            return False
+        point["timestamp"] = self._last_timestamp = timestamp
+        return True
+
+    @callback
+    def _async_smooth_point(self, point: dict[str, Any]) -> bool:
+        """Replace the position of a point by the filtered one.
+
+        Returns False if the point should be dropped.
+        """
+        assert self._track_filter is not None
+        position = self._track_filter.update(
+            point["latitude"],
+            point["longitude"],
+            point["timestamp"],
+            accuracy=point.get("horizontal_accuracy"),
+            speed=point.get("speed"),
         )
+        self._filter_store.async_delay_save(
+            self._track_filter.as_dict, STORAGE_SAVE_DELAY
+        )
+        if position is None:
+            return False
+        point["latitude"], point["longitude"] = position
+        return True
+
+    @callback
+    def _async_schedule_simplifier_flush(self) -> None:
+        """Send the point held back by the simplifier if no new point arrives."""
+        if self._cancel_simplifier_flush is not None:
+            self._cancel_simplifier_flush()
+            self._cancel_simplifier_flush = None
+        if self._simplifier is None or not self._simplifier.pending:
+            return
+        self._cancel_simplifier_flush = async_call_later(
+            self._hass, SIMPLIFY_FLUSH_DELAY, self._async_flush_simplifier
+        )
+
+    async def _async_flush_simplifier(self, _now: datetime) -> None:
+        """Send the point held back by the simplifier."""
+        self._cancel_simplifier_flush = None
+        if self._simplifier is None:
+            return
+        for point in self._simplifier.flush():
+            await self._async_send_point(point)
+        await self._sender.async_flush()
+
+    async def _async_send_point(self, point: dict[str, Any]) -> None:
+        """Queue a point to be sent to the Dawarich API."""
+        await self._sender.async_add(point)
+
+    @profiled("tracker.send_points")
+    async def _async_send_points(self, points: list[dict[str, Any]]) -> None:
+        """Send a batch of points to the Dawarich API."""
+        response = await self._api.add_points(points, self._device_name)
+        previous_state = self._state
         if response.success:
-            _LOGGER.debug("Location sent to Dawarich API")
+            _LOGGER.debug("%s locations sent to Dawarich API", len(points))
             self._state = DawarichTrackerStates.SUCCESS
         else:
             self._state = DawarichTrackerStates.ERROR
@@ -303,6 +747,9 @@ class DawarichTrackerSensor(SensorEntity):
                 response.response_code,
                 response.error,
             )
+        # The queue attributes are published by the timer in between
+        if self._state != previous_state and self.hass is not None:
+            self.async_write_ha_state()
 
     async def _async_add_optional_params(self, new_data: dict) -> dict:
         # Only include optional parameters if they have valid values
@@ -323,7 +770,7 @@ class DawarichTrackerSensor(SensorEntity):
             optional_params["speed"] = velocity
 
         if (battery := new_data.get("battery")) is not None:
-            optional_params["battery"] = battery
+            optional_params["battery_level"] = battery
 
         if (raw_timestamp := new_data.get("last_seen")) is not None or (
             raw_timestamp := new_data.get("last_timestamp")
@@ -332,6 +779,7 @@ class DawarichTrackerSensor(SensorEntity):
 
         return optional_params
 
+    @profiled("tracker.check_is_disabled")
     async def _async_check_is_disabled(self) -> bool:
         """Check if the Dawarich tracker sensor is disabled."""
         device_registry = dr.async_get(self._hass)
@@ -417,7 +865,13 @@ class DawarichStatisticsSensor(CoordinatorEntity, SensorEntity):  # type: ignore
         self.entity_description = description
         self._attr_unique_id = f"{entry_id}/{description.key}"
         self._attr_device_info = device_info
-        self._attr_state_class = SensorStateClass.TOTAL
+        self._attr_state_class = description.state_class or SensorStateClass.TOTAL
+
+    @callback
+    @profiled("sensor.coordinator_update")
+    def _handle_coordinator_update(self) -> None:
+        """Write the state after a refresh of the stats."""
+        super()._handle_coordinator_update()
 
     @property
     def native_value(self) -> StateType:  # type: ignore[override]
@@ -442,14 +896,31 @@ class DawarichStatisticsSensor(CoordinatorEntity, SensorEntity):  # type: ignore
         return f"{self._device_name}"
 
 
-class DawarichVersionSensor(
-    CoordinatorEntity[DawarichVersionCoordinator], SensorEntity
-):  # type: ignore[incompatible-subclass]
+class DawarichBreakdownSensor(DawarichStatisticsSensor):
+    """Representation of a Dawarich sensor for the current month or year.
+
+    The value is looked up in the breakdown index of the coordinator, so no
+    extra request is made and no list is scanned on refresh.
+    """
+
+    entity_description: DawarichBreakdownSensorEntityDescription
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the state of the device."""
+        if self.coordinator.data is None:
+            return None
+        return self.entity_description.value_fn(
+            self.coordinator.breakdown, dt_util.now().date()
+        )
+
+
+class DawarichVersionSensor(CoordinatorEntity[DawarichHealthCoordinator], SensorEntity):  # type: ignore[incompatible-subclass]
     """Representation of a Dawarich version sensor."""
 
     def __init__(
         self,
-        coordinator: DawarichVersionCoordinator,
+        coordinator: DawarichHealthCoordinator,
         description: SensorEntityDescription,
         entry_id: str,
         device_info: DeviceInfo,
@@ -463,15 +934,78 @@ class DawarichVersionSensor(
     @property
     def native_value(self) -> StateType:  # type: ignore[override]
         """Return the state of the device."""
-        if self.coordinator.data is None:
+        if self.coordinator.data is None or self.coordinator.data["version"] is None:
             return None
         # Combine the version parts
-        major = self.coordinator.data["major"]
-        minor = self.coordinator.data["minor"]
-        patch = self.coordinator.data["patch"]
-        return f"{major}.{minor}.{patch}"
+        version = self.coordinator.data["version"]
+        return f"{version['major']}.{version['minor']}.{version['patch']}"
 
     @property
     def icon(self) -> str:
         """Return the icon to use in the frontend."""
         return "mdi:information-outline"
+
+
+class DawarichHealthSensor(DawarichVersionSensor):
+    """Representation of the availability or latency of a Dawarich server.
+
+    The values are computed over the recent health probes of the server,
+    so the sensor stays available while the server is down.
+    """
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the state of the device."""
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data[self.entity_description.key]
+
+    @property
+    def icon(self) -> str:
+        """Return the icon to use in the frontend."""
+        return self.entity_description.icon or "mdi:heart-pulse"
+
+
+class DawarichTileSensor(SensorEntity):
+    """Representation of a sensor of the visited tiles index.
+
+    The state is written when a new tile is visited, and at midnight for the
+    tiles visited today.
+    """
+
+    _attr_should_poll = False
+    entity_description: DawarichTileSensorEntityDescription
+
+    def __init__(
+        self,
+        entry_id: str,
+        device_name: str,
+        description: DawarichTileSensorEntityDescription,
+        tiles: TileIndex,
+        device_info: DeviceInfo,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._tiles = tiles
+        self._attr_unique_id = f"{entry_id}/{description.key}"
+        self._attr_name = f"{device_name} {description.name}"
+        self._attr_device_info = device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state when the index changes and at midnight."""
+        self.async_on_remove(self._tiles.async_add_listener(self.async_write_ha_state))
+        self.async_on_remove(
+            async_track_time_change(
+                self.hass, self._async_midnight, hour=0, minute=0, second=0
+            )
+        )
+
+    @callback
+    def _async_midnight(self, _now: datetime) -> None:
+        """Write the state for the new day."""
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> StateType:  # type: ignore[override]
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self._tiles, dt_util.now().date())
@@ -0,0 +1,89 @@
+"""Infrastructure shared by all config entries of a Dawarich server."""
+
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .coordinator import DawarichHealthCoordinator
+from .helpers import get_api, get_url
+from .scheduler import DawarichHostScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SERVERS: HassKey[dict[str, "DawarichServer"]] = HassKey(f"{DOMAIN}_servers")
+
+
+class DawarichServer:
+    """The parts of the integration that belong to a server, not to a user.
+
+    Config entries are per API key, so several of them can point at the same
+    server. They share one request scheduler, one connection pool and one
+    health coordinator, instead of each probing the server on their own.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, host: str, use_ssl: bool, verify_ssl: bool
+    ) -> None:
+        """Initialize the server."""
+        self.url = get_url(host, use_ssl)
+        self.session = async_get_clientsession(hass, verify_ssl=verify_ssl)
+        self.scheduler = DawarichHostScheduler(self.url)
+        # The health endpoint does not need an API key
+        self.api = get_api(
+            host,
+            "",
+            use_ssl,
+            verify_ssl,
+            session=self.session,
+            limiter=self.scheduler.limiter,
+        )
+        self.health_coordinator = DawarichHealthCoordinator(
+            hass, self.api, self.scheduler
+        )
+        self.entry_ids: set[str] = set()
+        self._setup: asyncio.Task[None] = hass.async_create_task(
+            self._async_setup(), f"Dawarich server {self.url} setup"
+        )
+
+    async def _async_setup(self) -> None:
+        """Fetch the shared data for the first time."""
+        await self.health_coordinator.async_refresh()
+
+    async def async_wait_ready(self) -> None:
+        """Wait until the shared data has been fetched once."""
+        await asyncio.shield(self._setup)
+
+    async def async_shutdown(self) -> None:
+        """Stop polling the server."""
+        self._setup.cancel()
+        await self.health_coordinator.async_shutdown()
+
+
+async def async_get_server(
+    hass: HomeAssistant, entry_id: str, host: str, use_ssl: bool, verify_ssl: bool
+) -> DawarichServer:
+    """Get the server of a config entry, setting it up for the first entry."""
+    servers = hass.data.setdefault(DATA_SERVERS, {})
+    url = get_url(host, use_ssl)
+    if (server := servers.get(url)) is None:
+        _LOGGER.debug("Setting up shared Dawarich server %s", url)
+        server = servers[url] = DawarichServer(hass, host, use_ssl, verify_ssl)
+    server.entry_ids.add(entry_id)
+    await server.async_wait_ready()
+    return server
+
+
+async def async_release_server(
+    hass: HomeAssistant, server: DawarichServer, entry_id: str
+) -> None:
+    """Release the server of a config entry, shutting it down after the last."""
+    server.entry_ids.discard(entry_id)
+    if server.entry_ids:
+        return
+    _LOGGER.debug("Shutting down shared Dawarich server %s", server.url)
+    hass.data[DATA_SERVERS].pop(server.url, None)
+    await server.async_shutdown()
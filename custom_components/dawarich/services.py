@@ -0,0 +1,230 @@
+"""Services for the Dawarich integration."""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .export import async_export_points, get_writer
+from .importer import IMPORT_FORMATS, async_import_file, detect_format
+from .profiler import ProfileSession, profile_running
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_EXPORT_POINTS = "export_points"
+SERVICE_IMPORT_FILE = "import_file"
+SERVICE_PROFILE = "profile"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FORMAT = "format"
+ATTR_FILENAME = "filename"
+ATTR_SIMPLIFY_TOLERANCE = "simplify_tolerance"
+ATTR_SECONDS = "seconds"
+
+EXPORT_FORMATS = ("gpx", "geojson", "csv")
+# Exports are written to this folder of the configuration directory, so they
+# cannot replace the configuration or the storage of Home Assistant
+EXPORT_DIR = "dawarich"
+
+EXPORT_POINTS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Required(ATTR_END): cv.datetime,
+        vol.Required(ATTR_FORMAT): vol.In(EXPORT_FORMATS),
+        vol.Required(ATTR_FILENAME): cv.string,
+        vol.Optional(ATTR_SIMPLIFY_TOLERANCE, default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+
+IMPORT_FILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_FILENAME): cv.string,
+        vol.Optional(ATTR_FORMAT, default="auto"): vol.In(("auto", *IMPORT_FORMATS)),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_SECONDS, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+    }
+)
+
+
+def _get_entry(hass: HomeAssistant, entry_id: str) -> ConfigEntry:
+    """Get a loaded Dawarich config entry."""
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if entry is None or entry.domain != DOMAIN:
+        raise ServiceValidationError(f"Config entry {entry_id} is not a Dawarich entry")
+    if entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(f"Config entry {entry_id} is not loaded")
+    return entry
+
+
+def _resolve_config_path(hass: HomeAssistant, filename: str, subdir: str) -> Path:
+    """Resolve a file name relative to the configuration directory.
+
+    The file has to be in `subdir` of the configuration directory, or in a
+    directory allowed by `allowlist_external_dirs`. This touches the
+    filesystem, so it has to run in the executor.
+    """
+    config_dir = Path(hass.config.config_dir).resolve()
+    base_dir = config_dir / subdir
+    path = (config_dir / filename).resolve()
+    if path == base_dir or not (
+        path.is_relative_to(base_dir) or hass.config.is_allowed_path(str(path))
+    ):
+        raise ServiceValidationError(
+            f"{filename} is not a file in the {subdir} folder of the "
+            "configuration directory"
+        )
+    return path
+
+
+async def _async_get_export_path(hass: HomeAssistant, filename: str) -> Path:
+    """Resolve the file name of an export, which must not exist yet."""
+
+    def resolve() -> Path:
+        path = _resolve_config_path(hass, filename, EXPORT_DIR)
+        if path.exists():
+            raise ServiceValidationError(f"{filename} already exists")
+        return path
+
+    return await hass.async_add_executor_job(resolve)
+
+
+async def _async_get_import_path(hass: HomeAssistant, filename: str) -> Path:
+    """Resolve the file name of an import, which must exist."""
+
+    def resolve() -> Path:
+        path = _resolve_config_path(hass, filename, EXPORT_DIR)
+        if not path.is_file():
+            raise ServiceValidationError(f"{filename} does not exist")
+        return path
+
+    return await hass.async_add_executor_job(resolve)
+
+
+def _as_timestamp(value: datetime) -> int:
+    """Convert a service datetime, local if naive, to epoch seconds."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.get_default_time_zone())
+    return int(value.timestamp())
+
+
+async def _async_export_points(call: ServiceCall) -> ServiceResponse:
+    """Export the points in a date range to a file under the config directory."""
+    hass = call.hass
+    entry = _get_entry(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+    path = await _async_get_export_path(hass, call.data[ATTR_FILENAME])
+    start_at = _as_timestamp(call.data[ATTR_START])
+    end_at = _as_timestamp(call.data[ATTR_END])
+    if end_at < start_at:
+        raise ServiceValidationError("The end of the range is before its start")
+
+    writer = get_writer(call.data[ATTR_FORMAT], entry.title)
+    exported = await async_export_points(
+        hass,
+        entry.runtime_data.api,
+        path,
+        writer,
+        start_at=start_at,
+        end_at=end_at,
+        simplify_tolerance=call.data[ATTR_SIMPLIFY_TOLERANCE],
+    )
+    _LOGGER.info("Exported %s points from Dawarich to %s", exported, path)
+    return {"points": exported, "path": str(path)}
+
+
+async def _async_import_file(call: ServiceCall) -> ServiceResponse:
+    """Import the points of a file under the config directory into Dawarich."""
+    hass = call.hass
+    entry = _get_entry(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+    path = await _async_get_import_path(hass, call.data[ATTR_FILENAME])
+    import_format = call.data[ATTR_FORMAT]
+    if import_format == "auto":
+        try:
+            import_format = detect_format(path)
+        except ValueError as err:
+            raise ServiceValidationError(str(err)) from err
+
+    imported, skipped = await async_import_file(
+        hass, entry.runtime_data.api, path, import_format, entry.title
+    )
+    _LOGGER.info(
+        "Imported %s points from %s into Dawarich, skipped %s records",
+        imported,
+        path,
+        skipped,
+    )
+    return {"points": imported, "skipped": skipped}
+
+
+async def _async_profile(call: ServiceCall) -> ServiceResponse:
+    """Profile the hot paths of the integration for a number of seconds."""
+    hass = call.hass
+    if profile_running():
+        raise ServiceValidationError("Dawarich is already being profiled")
+    session = ProfileSession()
+    try:
+        session.start()
+    except ValueError as err:
+        raise ServiceValidationError(
+            "Another profiler, such as the Profiler integration, is running"
+        ) from err
+    try:
+        await asyncio.sleep(call.data[ATTR_SECONDS])
+    finally:
+        session.stop()
+
+    path = hass.config.path(f"dawarich.profile.{int(time.time())}.prof")
+    await hass.async_add_executor_job(session.profile.dump_stats, path)
+    spans = {name: stats.as_dict() for name, stats in sorted(session.spans.items())}
+    _LOGGER.info("Wrote the Dawarich profile to %s, timings: %s", path, spans)
+    return {"path": str(path), "spans": spans}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Dawarich services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_POINTS,
+        _async_export_points,
+        schema=EXPORT_POINTS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_FILE,
+        _async_import_file,
+        schema=IMPORT_FILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        _async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,106 @@
+"""Streaming track simplification for the Dawarich integration."""
+
+import math
+from collections.abc import Callable, Iterable, Iterator
+
+EARTH_RADIUS_M = 6371008.8
+DEFAULT_MAX_WINDOW = 32
+
+
+def distance_to_segment(
+    point: tuple[float, float],
+    start: tuple[float, float],
+    end: tuple[float, float],
+) -> float:
+    """Return the distance in metres from a point to a segment.
+
+    Coordinates are (latitude, longitude) pairs. The points are projected on
+    a plane tangent at `start`, which is accurate for the short segments a
+    track is made of.
+    """
+    scale = math.cos(math.radians(start[0]))
+    px = math.radians(point[1] - start[1]) * scale * EARTH_RADIUS_M
+    py = math.radians(point[0] - start[0]) * EARTH_RADIUS_M
+    ex = math.radians(end[1] - start[1]) * scale * EARTH_RADIUS_M
+    ey = math.radians(end[0] - start[0]) * EARTH_RADIUS_M
+
+    length_squared = ex * ex + ey * ey
+    if length_squared == 0:
+        return math.hypot(px, py)
+    t = max(0.0, min(1.0, (px * ex + py * ey) / length_squared))
+    return math.hypot(px - t * ex, py - t * ey)
+
+
+class StreamingSimplifier[T]:
+    """Simplify a track one point at a time.
+
+    This is the opening window variant of Douglas-Peucker: the last kept
+    point is the anchor, and points are held back while every one of them is
+    within `tolerance` metres of the segment from the anchor to the newest
+    point. When a point breaks that, the point before it is kept and becomes
+    the new anchor. The error of the simplified track is therefore bounded by
+    `tolerance`, and at most `max_window` points are ever held back.
+    """
+
+    def __init__(
+        self,
+        tolerance: float,
+        coordinates: Callable[[T], tuple[float, float]],
+        max_window: int = DEFAULT_MAX_WINDOW,
+    ) -> None:
+        """Initialize the simplifier."""
+        self.tolerance = tolerance
+        self._coordinates = coordinates
+        self._max_window = max_window
+        self._anchor: tuple[float, float] | None = None
+        self._window: list[tuple[tuple[float, float], T]] = []
+
+    @property
+    def pending(self) -> int:
+        """Return the number of points held back."""
+        return len(self._window)
+
+    def push(self, item: T) -> list[T]:
+        """Add a point and return the points to keep, if any."""
+        position = self._coordinates(item)
+        if self._anchor is None:
+            self._anchor = position
+            return [item]
+
+        if any(
+            distance_to_segment(held, self._anchor, position) > self.tolerance
+            for held, _ in self._window
+        ):
+            kept = self._keep_last()
+            self._window.append((position, item))
+            return kept
+
+        self._window.append((position, item))
+        if len(self._window) >= self._max_window:
+            return self._keep_last()
+        return []
+
+    def flush(self) -> list[T]:
+        """Keep the point held back last, for example at the end of a track."""
+        if not self._window:
+            return []
+        return self._keep_last()
+
+    def _keep_last(self) -> list[T]:
+        """Keep the newest held back point and make it the anchor."""
+        position, item = self._window[-1]
+        self._anchor = position
+        self._window.clear()
+        return [item]
+
+
+def simplify[T](
+    items: Iterable[T],
+    tolerance: float,
+    coordinates: Callable[[T], tuple[float, float]],
+) -> Iterator[T]:
+    """Simplify a whole track, for example for a backfill or an export."""
+    simplifier = StreamingSimplifier(tolerance, coordinates)
+    for item in items:
+        yield from simplifier.push(item)
+    yield from simplifier.flush()
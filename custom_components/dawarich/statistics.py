@@ -0,0 +1,170 @@
+"""Import Dawarich stats into Home Assistant's long-term statistics."""
+
+import logging
+from datetime import date, datetime
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import MAJOR_VERSION, MINOR_VERSION, UnitOfLength
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_conversion import DistanceConverter
+
+from .const import DOMAIN
+from .coordinator import DawarichStatsBreakdown
+
+# Home Assistant 2025.4 replaced `has_mean` by `mean_type`, and 2025.10 added
+# the unit class to the metadata of statistics
+MEAN_TYPE_SUPPORTED = (MAJOR_VERSION, MINOR_VERSION) >= (2025, 4)
+UNIT_CLASS_SUPPORTED = (MAJOR_VERSION, MINOR_VERSION) >= (2025, 10)
+
+if MEAN_TYPE_SUPPORTED:
+    from homeassistant.components.recorder.models import StatisticMeanType
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _period_start(year: int, month: int = 1) -> datetime:
+    """Return the start of a period, aligned to the hour as statistics require."""
+    start = dt_util.as_utc(dt_util.start_of_local_day(date(year, month, 1)))
+    return start.replace(minute=0, second=0, microsecond=0)
+
+
+class DawarichStatisticsImporter:
+    """Write Dawarich stats as external statistics.
+
+    The monthly distance and the yearly countries and cities come from the
+    yearly breakdown of the stats payload and are backfilled in one call per
+    statistic. The total number of points is written once per hour. Nothing
+    is written when the payload has not changed since the last import.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, name: str) -> None:
+        """Initialize the importer."""
+        self._hass = hass
+        self._name = name
+        self._statistic_prefix = f"{DOMAIN}:{entry_id.lower()}"
+        self._last_breakdown: DawarichStatsBreakdown | None = None
+        self._last_points: tuple[datetime, int] | None = None
+
+    def _metadata(
+        self, key: str, name: str, unit: str | None, *, has_sum: bool
+    ) -> StatisticMetaData:
+        """Return the metadata of a statistic."""
+        metadata = StatisticMetaData(
+            has_sum=has_sum,
+            name=f"{self._name} {name}",
+            source=DOMAIN,
+            statistic_id=f"{self._statistic_prefix}_{key}",
+            unit_of_measurement=unit,
+        )
+        if MEAN_TYPE_SUPPORTED:
+            metadata["mean_type"] = (
+                StatisticMeanType.NONE if has_sum else StatisticMeanType.ARITHMETIC
+            )
+        else:
+            metadata["has_mean"] = not has_sum
+        if UNIT_CLASS_SUPPORTED:
+            metadata["unit_class"] = (
+                DistanceConverter.UNIT_CLASS
+                if unit == UnitOfLength.KILOMETERS
+                else None
+            )
+        return metadata
+
+    @callback
+    def async_import(
+        self, stats: dict[str, Any], breakdown: DawarichStatsBreakdown
+    ) -> None:
+        """Queue the statistics of a stats payload for the recorder."""
+        if "recorder" not in self._hass.config.components:
+            return
+        self._async_import_breakdown(breakdown)
+        self._async_import_points(stats["total_points_tracked"])
+
+    @callback
+    def _async_import_breakdown(self, breakdown: DawarichStatsBreakdown) -> None:
+        """Backfill the monthly distance and yearly countries and cities."""
+        if breakdown == self._last_breakdown:
+            return
+        self._last_breakdown = breakdown
+
+        distance: list[StatisticData] = []
+        total_distance = 0.0
+        # The index is built in chronological order
+        for (year, month), month_distance in breakdown.monthly_distance_km.items():
+            total_distance += month_distance
+            distance.append(
+                StatisticData(
+                    start=_period_start(year, month),
+                    state=month_distance,
+                    sum=total_distance,
+                )
+            )
+
+        countries: list[StatisticData] = []
+        cities: list[StatisticData] = []
+        for year, year_stats in breakdown.years.items():
+            for statistics, key in (
+                (countries, "total_countries_visited"),
+                (cities, "total_cities_visited"),
+            ):
+                value = year_stats[key]
+                statistics.append(
+                    StatisticData(
+                        start=_period_start(year),
+                        mean=value,
+                        min=value,
+                        max=value,
+                    )
+                )
+
+        _LOGGER.debug(
+            "Importing %s months of Dawarich statistics for %s",
+            len(distance),
+            self._name,
+        )
+        async_add_external_statistics(
+            self._hass,
+            self._metadata(
+                "monthly_distance",
+                "Monthly Distance",
+                UnitOfLength.KILOMETERS,
+                has_sum=True,
+            ),
+            distance,
+        )
+        async_add_external_statistics(
+            self._hass,
+            self._metadata(
+                "yearly_countries_visited",
+                "Yearly Countries Visited",
+                "countries",
+                has_sum=False,
+            ),
+            countries,
+        )
+        async_add_external_statistics(
+            self._hass,
+            self._metadata(
+                "yearly_cities_visited",
+                "Yearly Cities Visited",
+                "cities",
+                has_sum=False,
+            ),
+            cities,
+        )
+
+    @callback
+    def _async_import_points(self, total_points: int) -> None:
+        """Write the total number of points for the current hour."""
+        hour = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        if self._last_points == (hour, total_points):
+            return
+        self._last_points = (hour, total_points)
+        async_add_external_statistics(
+            self._hass,
+            self._metadata("points_tracked", "Points Tracked", "points", has_sum=True),
+            [StatisticData(start=hour, state=total_points, sum=total_points)],
+        )
@@ -0,0 +1,281 @@
+"""Index of the map tiles visited by the device tracker."""
+
+import base64
+import logging
+import math
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import date
+from typing import Any
+
+from homeassistant.const import EVENT_CORE_CONFIG_UPDATE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, STORAGE_SAVE_DELAY, STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+# Slippy map zoom of the tiles, about 300 m wide at the equator and 190 m at
+# 50° latitude, as counted by tile explorer games
+TILE_ZOOM = 17
+# Tiles are grouped in chunks of 128 x 128, so a tile within its chunk fits
+# in 14 bits
+CHUNK_BITS = 7
+CHUNK_SIZE = 1 << CHUNK_BITS
+BITMAP_BYTES = CHUNK_SIZE * CHUNK_SIZE // 8
+# A chunk with more tiles than this is smaller as a bitmap than as an array
+ARRAY_MAX_TILES = BITMAP_BYTES // 2
+# Half the width of the square around home used for the exploration percentage
+HOME_REGION_RADIUS_KM = 10
+EARTH_CIRCUMFERENCE_KM = 40_075.017
+
+type Tile = tuple[int, int]
+
+
+def tiles_storage_key(entry_id: str) -> str:
+    """Return the storage key of the visited tiles of a config entry."""
+    return f"{DOMAIN}.{entry_id}.tiles"
+
+
+def tile_of(latitude: float, longitude: float) -> Tile:
+    """Return the slippy map tile of a position."""
+    n = 1 << TILE_ZOOM
+    latitude = min(max(latitude, -85.0511), 85.0511)
+    x = int((longitude + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(latitude))) / math.pi) / 2 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _to_bytes(container: array | bytearray) -> str:
+    """Encode a chunk container, arrays in little endian."""
+    if isinstance(container, array) and sys.byteorder == "big":
+        container = array("H", container)
+        container.byteswap()
+    return base64.b64encode(bytes(container)).decode()
+
+
+def _chunk_key(key: str) -> Tile:
+    """Parse the key of a chunk in `TileSet.as_dict`."""
+    chunk_x, chunk_y = key.split(",")
+    return int(chunk_x), int(chunk_y)
+
+
+class TileSet:
+    """Set of tiles, stored like a roaring bitmap.
+
+    Tiles are grouped in chunks. A chunk with few tiles holds their offsets
+    in a sorted array of 16 bit integers, and is turned into a bitmap of
+    2 KB when it fills up, so a set takes about two bytes per tile and
+    never more than 2 KB per chunk. Adding and looking up a tile does not
+    depend on the size of the set.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty set."""
+        self._chunks: dict[Tile, array | bytearray] = {}
+        self._len = 0
+
+    def __len__(self) -> int:
+        """Return the number of tiles."""
+        return self._len
+
+    @staticmethod
+    def _split(tile: Tile) -> tuple[Tile, int]:
+        """Return the chunk of a tile and its offset within it."""
+        x, y = tile
+        offset = (x & (CHUNK_SIZE - 1)) << CHUNK_BITS | (y & (CHUNK_SIZE - 1))
+        return (x >> CHUNK_BITS, y >> CHUNK_BITS), offset
+
+    def __contains__(self, tile: Tile) -> bool:
+        """Return whether a tile is in the set."""
+        key, offset = self._split(tile)
+        if (container := self._chunks.get(key)) is None:
+            return False
+        if isinstance(container, bytearray):
+            return bool(container[offset >> 3] & (1 << (offset & 7)))
+        index = bisect_left(container, offset)
+        return index < len(container) and container[index] == offset
+
+    def add(self, tile: Tile) -> bool:
+        """Add a tile, returning whether it was not in the set yet."""
+        key, offset = self._split(tile)
+        if (container := self._chunks.get(key)) is None:
+            container = self._chunks[key] = array("H")
+        if isinstance(container, bytearray):
+            mask = 1 << (offset & 7)
+            if container[offset >> 3] & mask:
+                return False
+            container[offset >> 3] |= mask
+        else:
+            index = bisect_left(container, offset)
+            if index < len(container) and container[index] == offset:
+                return False
+            container.insert(index, offset)
+            if len(container) > ARRAY_MAX_TILES:
+                self._chunks[key] = self._to_bitmap(container)
+        self._len += 1
+        return True
+
+    @staticmethod
+    def _to_bitmap(container: array) -> bytearray:
+        """Turn a full array container into a bitmap."""
+        bitmap = bytearray(BITMAP_BYTES)
+        for offset in container:
+            bitmap[offset >> 3] |= 1 << (offset & 7)
+        return bitmap
+
+    @property
+    def nbytes(self) -> int:
+        """Return the size of the tiles in memory, without the chunk index."""
+        return sum(
+            len(container) * (container.itemsize if isinstance(container, array) else 1)
+            for container in self._chunks.values()
+        )
+
+    def count_in(self, x_range: range, y_range: range) -> int:
+        """Return the number of tiles in a rectangle."""
+        return sum(1 for x in x_range for y in y_range if (x, y) in self)
+
+    def as_dict(self) -> dict[str, dict[str, str]]:
+        """Return the set as base64 encoded containers by chunk."""
+        arrays: dict[str, str] = {}
+        bitmaps: dict[str, str] = {}
+        for (chunk_x, chunk_y), container in self._chunks.items():
+            target = bitmaps if isinstance(container, bytearray) else arrays
+            target[f"{chunk_x},{chunk_y}"] = _to_bytes(container)
+        return {"arrays": arrays, "bitmaps": bitmaps}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, dict[str, str]]) -> "TileSet":
+        """Restore a set from `as_dict`."""
+        tiles = cls()
+        for key, encoded in data.get("arrays", {}).items():
+            container = array("H", base64.b64decode(encoded))
+            if sys.byteorder == "big":
+                container.byteswap()
+            tiles._chunks[_chunk_key(key)] = container
+            tiles._len += len(container)
+        for key, encoded in data.get("bitmaps", {}).items():
+            bitmap = bytearray(base64.b64decode(encoded))
+            tiles._chunks[_chunk_key(key)] = bitmap
+            tiles._len += int.from_bytes(bitmap, "little").bit_count()
+        return tiles
+
+
+class TileIndex:
+    """Map tiles visited by the device tracker of a config entry.
+
+    Every point sent by the tracker marks its tile as visited, which is a
+    lookup in a `TileSet`, so the index stays cheap however long the track
+    history is. The index is persisted and counts the tiles visited in
+    total, for the first time today and around the home location.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the index."""
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, tiles_storage_key(entry_id)
+        )
+        self.tiles = TileSet()
+        # Local date of the newest point and tiles first visited on that date
+        self._day: date | None = None
+        self._new_tiles_on_day = 0
+        self._home_x = range(0)
+        self._home_y = range(0)
+        self.home_tiles_visited = 0
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    async def async_load(self) -> CALLBACK_TYPE:
+        """Restore the index and follow the home location.
+
+        Returns a callback to stop following the home location.
+        """
+        if (stored := await self._store.async_load()) is not None:
+            self.tiles = TileSet.from_dict(stored["tiles"])
+            if stored.get("day") is not None:
+                self._day = date.fromisoformat(stored["day"])
+                self._new_tiles_on_day = stored["new_tiles_on_day"]
+        self._async_update_home_region()
+        _LOGGER.debug(
+            "Loaded %s visited tiles in %s bytes", len(self.tiles), self.tiles.nbytes
+        )
+        return self._hass.bus.async_listen(
+            EVENT_CORE_CONFIG_UPDATE, self._async_core_config_updated
+        )
+
+    @callback
+    def _async_core_config_updated(self, event: Event) -> None:
+        """Recount the home region when the home location moves."""
+        self._async_update_home_region()
+        self._async_notify()
+
+    @callback
+    def _async_update_home_region(self) -> None:
+        """Find the tiles of the square around home and count the visited ones."""
+        latitude = self._hass.config.latitude
+        longitude = self._hass.config.longitude
+        half_height = HOME_REGION_RADIUS_KM / EARTH_CIRCUMFERENCE_KM * 360
+        half_width = half_height / max(math.cos(math.radians(latitude)), 0.01)
+        min_x, min_y = tile_of(latitude + half_height, longitude - half_width)
+        max_x, max_y = tile_of(latitude - half_height, longitude + half_width)
+        self._home_x = range(min_x, max_x + 1)
+        self._home_y = range(min_y, max_y + 1)
+        self.home_tiles_visited = self.tiles.count_in(self._home_x, self._home_y)
+
+    @property
+    def home_tiles(self) -> int:
+        """Return the number of tiles of the home region."""
+        return len(self._home_x) * len(self._home_y)
+
+    def new_tiles_on(self, day: date) -> int:
+        """Return the number of tiles first visited on a local date."""
+        return self._new_tiles_on_day if day == self._day else 0
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for new tiles, returning a callback to stop listening."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _async_remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _async_remove
+
+    @callback
+    def _async_notify(self) -> None:
+        """Call the listeners."""
+        for update_callback in self._listeners:
+            update_callback()
+
+    @callback
+    def async_add_point(
+        self, latitude: float, longitude: float, timestamp: float
+    ) -> None:
+        """Mark the tile of a point as visited."""
+        tile = tile_of(latitude, longitude)
+        if not self.tiles.add(tile):
+            return
+        day = dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).date()
+        if self._day is None or day > self._day:
+            self._day = day
+            self._new_tiles_on_day = 0
+        if day == self._day:
+            self._new_tiles_on_day += 1
+        if tile[0] in self._home_x and tile[1] in self._home_y:
+            self.home_tiles_visited += 1
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+        self._async_notify()
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "tiles": self.tiles.as_dict(),
+            "day": self._day.isoformat() if self._day is not None else None,
+            "new_tiles_on_day": self._new_tiles_on_day,
+        }
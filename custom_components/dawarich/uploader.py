@@ -0,0 +1,277 @@
+"""Background uploader for the Dawarich tracker sensor."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from typing import Any
+
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_SAVE_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+UPLOAD_QUEUE_SIZE = 1000
+UPLOAD_STOP_TIMEOUT = 10
+# Budget for the work done on the event loop per state change, in microseconds
+CALLBACK_BUDGET_US = 100
+
+
+def upload_queue_storage_key(entry_id: str) -> str:
+    """Return the storage key of the upload queue of a config entry."""
+    return f"{DOMAIN}.{entry_id}.upload_queue"
+
+
+def upload_options_signal(entry_id: str) -> str:
+    """Return the signal sending new upload options to the tracker of an entry."""
+    return f"{DOMAIN}_{entry_id}_upload_options"
+
+
+class DawarichUploader:
+    """Queue state changes on the event loop and process them in the background.
+
+    Enqueueing is constant time, so the state change listener does no
+    parsing, validation, logging or I/O. When the queue is full, the oldest
+    state is dropped and counted. A `None` state means that the tracked
+    entity was removed. While paused, for example when the server is down,
+    states are queued but not processed. With a `store`, the states still
+    queued when the uploader stops, or Home Assistant shuts down, are
+    persisted and queued again by `async_load`.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        process: Callable[[State | None], Awaitable[None]],
+        *,
+        maxsize: int = UPLOAD_QUEUE_SIZE,
+        idle: Callable[[], Awaitable[None]] | None = None,
+        store: Store[list[dict[str, Any] | None]] | None = None,
+    ) -> None:
+        """Initialize the uploader.
+
+        `idle` is awaited whenever the queue has been emptied.
+        """
+        self._hass = hass
+        self._name = name
+        self._process = process
+        self._idle = idle
+        self._store = store
+        self._queue: deque[State | None] = deque(maxlen=maxsize)
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._paused = False
+        self._stopping = False
+        self.dropped = 0
+        self.callback_time_us = 0.0
+        self.callback_time_max_us = 0.0
+        self._over_budget_logged = False
+
+    @property
+    def queued(self) -> int:
+        """Return the number of states waiting to be processed."""
+        return len(self._queue)
+
+    @callback
+    def async_enqueue(self, state: State | None) -> None:
+        """Queue a state for processing."""
+        start = time.perf_counter_ns()
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(state)
+        self._wakeup.set()
+        if self._paused:
+            self._async_schedule_save()
+        self._async_record_callback_time((time.perf_counter_ns() - start) / 1000)
+
+    @callback
+    def _async_record_callback_time(self, elapsed_us: float) -> None:
+        """Keep a moving average and the maximum of the enqueue cost."""
+        self.callback_time_us += (elapsed_us - self.callback_time_us) / 16
+        if elapsed_us <= self.callback_time_max_us:
+            return
+        self.callback_time_max_us = elapsed_us
+        if elapsed_us > CALLBACK_BUDGET_US and not self._over_budget_logged:
+            self._over_budget_logged = True
+            _LOGGER.warning(
+                "Queueing a state change for %s took %.0f µs, more than the %s µs budget",
+                self._name,
+                elapsed_us,
+                CALLBACK_BUDGET_US,
+            )
+
+    @property
+    def paused(self) -> bool:
+        """Return whether processing is paused."""
+        return self._paused
+
+    @callback
+    def async_pause(self) -> None:
+        """Keep queueing states, but stop processing them."""
+        self._paused = True
+        self._async_schedule_save()
+
+    @callback
+    def async_resume(self) -> None:
+        """Process the states queued while paused."""
+        self._paused = False
+        self._wakeup.set()
+
+    async def async_load(self) -> None:
+        """Queue the states persisted when the uploader last stopped."""
+        if self._store is None or not (stored := await self._store.async_load()):
+            return
+        for data in stored:
+            self._queue.append(None if data is None else State.from_dict(data))
+        _LOGGER.debug("Restored %s queued points for %s", len(stored), self._name)
+        self._wakeup.set()
+        # Replace the stored states once they have been processed
+        self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Persist the queue, as it is when the save happens."""
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> list[dict[str, Any] | None]:
+        """Return the queued states to persist."""
+        return [None if state is None else state.as_dict() for state in self._queue]
+
+    @callback
+    def async_start(self) -> None:
+        """Start processing queued states."""
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), f"Dawarich uploader {self._name}"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop the background task once it has processed what is still queued.
+
+        The task is only cancelled if that takes longer than
+        `UPLOAD_STOP_TIMEOUT`, so the state being processed is not lost.
+        """
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            async with asyncio.timeout(UPLOAD_STOP_TIMEOUT):
+                await asyncio.shield(task)
+        except TimeoutError:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        if self._store is not None:
+            if self._queue:
+                _LOGGER.info(
+                    "Keeping %s queued points for %s until the next start",
+                    len(self._queue),
+                    self._name,
+                )
+            await self._store.async_save(self._data_to_save())
+        elif self._queue:
+            _LOGGER.warning(
+                "Dropping %s queued points for %s on shutdown",
+                len(self._queue),
+                self._name,
+            )
+        self._queue.clear()
+
+    async def _async_run(self) -> None:
+        """Process queued states until stopped."""
+        while not self._stopping:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue and not self._paused:
+                state = self._queue.popleft()
+                try:
+                    await self._process(state)
+                except Exception:
+                    _LOGGER.exception("Error processing location for %s", self._name)
+            if self._idle is not None:
+                await self._idle()
+
+
+class DawarichPointSender:
+    """Send points in batches, with a bounded number of batches in flight.
+
+    Points are collected until `batch_size` of them are waiting or `flush`
+    is called, typically when the upload queue is empty, so batching only
+    delays points while there is a backlog. Up to `concurrency` batches are
+    sent at once; adding more waits for one of them to finish. Both limits
+    can be changed while points are being sent.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        send: Callable[[list[dict[str, Any]]], Awaitable[None]],
+        batch_size: int = 1,
+        concurrency: int = 1,
+    ) -> None:
+        """Initialize the sender."""
+        self._hass = hass
+        self._name = name
+        self._send = send
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self._batch: list[dict[str, Any]] = []
+        self._in_flight: set[asyncio.Task[None]] = set()
+        # Flushes wait for a free slot one at a time, so that two of them
+        # woken by the same finished batch do not both take it
+        self._slot_lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Return the number of points waiting for a batch to fill up."""
+        return len(self._batch)
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of batches being sent."""
+        return len(self._in_flight)
+
+    async def async_add(self, point: dict[str, Any]) -> None:
+        """Add a point, sending the batch when it is full."""
+        self._batch.append(point)
+        if len(self._batch) >= self.batch_size:
+            await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Send the waiting points, once a batch slot is free."""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        async with self._slot_lock:
+            while len(self._in_flight) >= self.concurrency:
+                await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+            task = self._hass.async_create_task(
+                self._async_send(batch), f"Dawarich upload {self._name}"
+            )
+            if not task.done():
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+
+    async def async_drain(self) -> None:
+        """Send the waiting points and wait for every batch in flight."""
+        await self.async_flush()
+        if self._in_flight:
+            await asyncio.wait(self._in_flight)
+
+    async def _async_send(self, batch: list[dict[str, Any]]) -> None:
+        """Send a batch, logging unexpected errors."""
+        try:
+            await self._send(batch)
+        except Exception:
+            _LOGGER.exception(
+                "Error sending %s locations for %s", len(batch), self._name
+            )
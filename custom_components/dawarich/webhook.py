@@ -0,0 +1,72 @@
+"""Push updates from Dawarich through a Home Assistant webhook."""
+
+import logging
+from json import JSONDecodeError
+
+from aiohttp.web import Request, Response
+from homeassistant.components import webhook
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.network import NoURLAvailableError
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_IMPORT_FINISHED = "import_finished"
+EVENT_POINTS_CREATED = "points_created"
+EVENT_STATS_UPDATED = "stats_updated"
+
+
+@callback
+def async_register_webhook(
+    hass: HomeAssistant,
+    webhook_id: str,
+    name: str,
+    stats_coordinator: DataUpdateCoordinator,
+    points_coordinator: DataUpdateCoordinator,
+) -> None:
+    """Register the webhook that refreshes the coordinators on demand.
+
+    The webhook accepts a JSON body with an `event`. New points refresh the
+    last known position, a stats recalculation refreshes the stats, and a
+    finished import or an unknown event refresh both.
+    """
+
+    async def _async_handle_webhook(
+        hass: HomeAssistant, webhook_id: str, request: Request
+    ) -> Response:
+        try:
+            event = (await request.json()).get("event")
+        except (JSONDecodeError, AttributeError):
+            event = None
+        _LOGGER.debug("Received Dawarich webhook for %s with event %s", name, event)
+
+        if event != EVENT_STATS_UPDATED:
+            await points_coordinator.async_request_refresh()
+        if event != EVENT_POINTS_CREATED:
+            await stats_coordinator.async_request_refresh()
+        return Response(status=204)
+
+    webhook.async_register(
+        hass,
+        DOMAIN,
+        f"Dawarich {name}",
+        webhook_id,
+        _async_handle_webhook,
+        allowed_methods=["POST"],
+    )
+    _LOGGER.info(
+        "Dawarich push updates for %s are sent to %s",
+        name,
+        async_get_webhook_url(hass, webhook_id),
+    )
+
+
+@callback
+def async_get_webhook_url(hass: HomeAssistant, webhook_id: str) -> str:
+    """Return the URL of the webhook, or its path if no URL is configured."""
+    try:
+        return webhook.async_generate_url(hass, webhook_id)
+    except NoURLAvailableError:
+        return webhook.async_generate_path(webhook_id)
@@ -0,0 +1,501 @@
+"""Record device tracker states and replay them into the Dawarich tracker.
+
+Recordings are gzipped JSON lines: a header with the recorded entities and
+the time of the first state, then one `[offset, entity, state, attributes]`
+line per state, where the offset is in seconds from the first state. Only
+the attributes read by the tracker are kept.
+
+Record the device trackers of a Home Assistant instance from its recorder
+database, or synthesize a family road trip:
+
+    python -m script.replay_tracker record home-assistant_v2.db trip.jsonl.gz device_tracker.phone_alice device_tracker.phone_bob
+    python -m script.replay_tracker synthesize trip.jsonl.gz --devices 4 --hours 2
+
+Replay a recording into `DawarichTrackerSensor`, 100 times faster than it
+was recorded, against a stand-in Dawarich server on localhost:
+
+    python -m script.replay_tracker replay trip.jsonl.gz --speed 100
+
+The replay reports the throughput, the latency from the state change to the
+point arriving at the server, and the points that were not uploaded. With
+`--profile`, the hot paths are profiled as by the `dawarich.profile` service.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import math
+import random
+import sqlite3
+import tempfile
+import time
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, TextIO
+
+from aiohttp import ThreadedResolver, web
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import aiohttp_client
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_component import EntityComponent
+
+from custom_components.dawarich.const import DEFAULT_SIMPLIFY_TOLERANCE
+from custom_components.dawarich.helpers import get_api, normalize_timestamp
+from custom_components.dawarich.profiler import ProfileSession
+from custom_components.dawarich.sensor import (
+    TRACKER_SENSOR_TYPES,
+    DawarichTrackerSensor,
+)
+from custom_components.dawarich.server import (
+    DawarichServer,
+    async_get_server,
+    async_release_server,
+)
+
+FORMAT = "dawarich-replay"
+FORMAT_VERSION = 1
+# Attributes of a device tracker state that the tracker sensor reads
+TRACKER_ATTRIBUTES = (
+    "latitude",
+    "longitude",
+    "gps_accuracy",
+    "altitude",
+    "vertical_accuracy",
+    "speed",
+    "velocity",
+    "battery",
+    "last_seen",
+    "last_timestamp",
+    "source",
+)
+
+type RecordedState = tuple[float, str, str, dict[str, Any]]
+
+
+def write_recording(
+    path: Path, entity_ids: list[str], states: Iterable[RecordedState]
+) -> int:
+    """Write states, ordered by their epoch timestamp, to a recording."""
+    index = {entity_id: i for i, entity_id in enumerate(entity_ids)}
+    written = 0
+    start: float | None = None
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for timestamp, entity_id, state, attributes in states:
+            if start is None:
+                start = timestamp
+                _write_header(file, entity_ids, start)
+            kept = {
+                key: attributes[key]
+                for key in TRACKER_ATTRIBUTES
+                if attributes.get(key) is not None
+            }
+            line = [round(timestamp - start, 3), index[entity_id], state, kept]
+            file.write(json.dumps(line, separators=(",", ":")) + "\n")
+            written += 1
+        if start is None:
+            _write_header(file, entity_ids, 0)
+    return written
+
+
+def _write_header(file: TextIO, entity_ids: list[str], start: float) -> None:
+    """Write the header of a recording."""
+    header = {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        "start": start,
+        "entities": entity_ids,
+    }
+    file.write(json.dumps(header) + "\n")
+
+
+def read_recording(path: Path) -> tuple[list[str], Iterator[RecordedState]]:
+    """Read a recording, returning its entities and its states.
+
+    The states are stamped with the epoch time they were recorded at.
+    """
+    file = gzip.open(path, "rt", encoding="utf-8")
+    header = json.loads(file.readline())
+    if header.get("format") != FORMAT or header.get("version") != FORMAT_VERSION:
+        file.close()
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} recording")
+    entity_ids: list[str] = header["entities"]
+    start: float = header["start"]
+
+    def states() -> Iterator[RecordedState]:
+        with file:
+            for line in file:
+                offset, index, state, attributes = json.loads(line)
+                yield start + offset, entity_ids[index], state, attributes
+
+    return entity_ids, states()
+
+
+def record(database: Path, output: Path, entity_ids: list[str]) -> int:
+    """Record the states of device trackers from a recorder database."""
+    query = (
+        "SELECT states.last_updated_ts, states_meta.entity_id, states.state, "
+        "state_attributes.shared_attrs FROM states "
+        "JOIN states_meta ON states.metadata_id = states_meta.metadata_id "
+        "LEFT JOIN state_attributes "
+        "ON states.attributes_id = state_attributes.attributes_id "
+        "WHERE states_meta.entity_id IN (SELECT value FROM json_each(?)) "
+        "ORDER BY states.last_updated_ts"
+    )
+    with sqlite3.connect(f"file:{database}?mode=ro", uri=True) as connection:
+        rows = connection.execute(query, (json.dumps(entity_ids),))
+        return write_recording(
+            output,
+            entity_ids,
+            (
+                (timestamp, entity_id, state, json.loads(attributes or "{}"))
+                for timestamp, entity_id, state, attributes in rows
+            ),
+        )
+
+
+def synthesize(
+    output: Path, devices: int, hours: float, interval: float, seed: int
+) -> int:
+    """Synthesize a family road trip, one car and phone per device.
+
+    Every car drives at a varying speed along a slowly turning heading, and
+    every fix has GPS noise and now and then an outlier of a few hundred
+    metres, as phones indoors or in tunnels report.
+    """
+    rng = random.Random(seed)
+    entity_ids = [f"device_tracker.phone_{i}" for i in range(devices)]
+    start = datetime(2024, 7, 1, 8, tzinfo=UTC).timestamp()
+
+    def states() -> Iterator[RecordedState]:
+        cars = [
+            {
+                "latitude": 52.37 + rng.uniform(-0.05, 0.05),
+                "longitude": 4.89 + rng.uniform(-0.05, 0.05),
+                "heading": rng.uniform(0, 2 * math.pi),
+                "speed": rng.uniform(20, 30),
+                "battery": rng.randint(60, 100),
+            }
+            for _ in entity_ids
+        ]
+        # Devices report on their own clocks, slightly out of step
+        offsets = sorted(rng.uniform(0, interval) for _ in entity_ids)
+        for step in range(int(hours * 3600 / interval)):
+            for entity_id, car, offset in zip(entity_ids, cars, offsets, strict=True):
+                car["heading"] += rng.gauss(0, 0.05)
+                car["speed"] = min(max(car["speed"] + rng.gauss(0, 1), 0), 36)
+                distance = car["speed"] * interval
+                car["latitude"] += math.degrees(
+                    distance * math.cos(car["heading"]) / 6371008.8
+                )
+                car["longitude"] += math.degrees(
+                    distance
+                    * math.sin(car["heading"])
+                    / (6371008.8 * math.cos(math.radians(car["latitude"])))
+                )
+                accuracy = rng.choice((5, 10, 15, 30))
+                noise = accuracy if rng.random() > 0.01 else 300
+                if step % 600 == 0:
+                    car["battery"] = max(car["battery"] - 1, 5)
+                yield (
+                    start + step * interval + offset,
+                    entity_id,
+                    "not_home",
+                    {
+                        "source": "gps",
+                        "latitude": car["latitude"] + rng.gauss(0, noise) / 111_000,
+                        "longitude": car["longitude"] + rng.gauss(0, noise) / 68_000,
+                        "gps_accuracy": accuracy,
+                        "speed": round(car["speed"], 1),
+                        "altitude": round(rng.uniform(0, 20), 1),
+                        "battery": car["battery"],
+                    },
+                )
+
+    return write_recording(output, entity_ids, states())
+
+
+class StubDawarichServer:
+    """Stand-in Dawarich server that records when points arrive."""
+
+    def __init__(self, latency: float) -> None:
+        """Initialize the server."""
+        self._latency = latency
+        self._runner: web.AppRunner | None = None
+        # Arrival time of every point, by device name and timestamp in ms
+        self.arrivals: dict[tuple[str, int], float] = {}
+
+    async def async_start(self) -> str:
+        """Start the server on a free port and return its host."""
+        app = web.Application()
+        app.router.add_post("/api/v1/points", self._handle_points)
+        app.router.add_get("/api/v1/health", self._handle_health)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        return f"127.0.0.1:{port}"
+
+    async def async_stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle_points(self, request: web.Request) -> web.Response:
+        """Record the points of a batch."""
+        arrived = time.perf_counter()
+        payload = await request.json()
+        for feature in payload["locations"]:
+            properties = feature["properties"]
+            timestamp = datetime.fromisoformat(properties["timestamp"]).timestamp()
+            key = (properties["device_id"], round(timestamp * 1000))
+            self.arrivals[key] = arrived
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return web.json_response({}, status=201)
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        """Report a recent Dawarich version."""
+        return web.json_response(
+            {"status": "ok"}, headers={"X-Dawarich-Version": "0.30.0"}
+        )
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    """Return a percentile of sorted values."""
+    if not values:
+        return math.nan
+    return values[min(int(len(values) * percentile / 100), len(values) - 1)]
+
+
+async def async_replay(  # noqa: PLR0917
+    path: Path,
+    speed: float,
+    latency: float,
+    simplify_tolerance: float,
+    smoothing: bool,
+    verbose: bool,
+    profile: Path | None = None,
+) -> None:
+    """Replay a recording into tracker sensors and report how they kept up."""
+    if not verbose:
+        # The replayed sensors have no device registry entry, which the
+        # sensor warns about for every state
+        logging.getLogger("custom_components.dawarich.sensor").setLevel(logging.ERROR)
+    entity_ids, states = read_recording(path)
+    stub = StubDawarichServer(latency)
+    host = await stub.async_start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        if hasattr(aiohttp_client, "DATA_RESOLVER"):
+            # Newer versions resolve names for the shared session through
+            # zeroconf, which needs the network integration. The stub server
+            # is an IP address, so any resolver will do
+            hass.data[aiohttp_client.DATA_RESOLVER] = ThreadedResolver()
+        await dr.async_load(hass)
+        await er.async_load(hass)
+        component = EntityComponent(logging.getLogger(__name__), "sensor", hass)
+
+        # Every device is a config entry, all of them on the same server
+        sensors = [
+            await _async_add_tracker(
+                component,
+                host,
+                f"replay{i}",
+                entity_id,
+                simplify_tolerance,
+                smoothing,
+            )
+            for i, entity_id in enumerate(entity_ids)
+        ]
+
+        session = ProfileSession()
+        if profile is not None:
+            session.start()
+        sent: dict[tuple[str, int], float] = {}
+        replayed = behind = 0
+        first: float | None = None
+        started = time.perf_counter()
+        for recorded_at, entity_id, state, attributes in states:
+            if first is None:
+                first = recorded_at
+            delay = started + (recorded_at - first) / speed - time.perf_counter()
+            behind = max(behind, -delay)
+            await asyncio.sleep(max(delay, 0))
+            # States keep the time they were recorded at, so that the tracker
+            # sees the same intervals between fixes at any speed
+            hass.states.async_set(entity_id, state, attributes, timestamp=recorded_at)
+            if (new_state := hass.states.get(entity_id)) is None:
+                continue
+            timestamp = normalize_timestamp(
+                attributes.get("last_seen", attributes.get("last_timestamp")),
+                new_state.last_updated,
+            )
+            sent[entity_id, round(timestamp * 1000)] = time.perf_counter()
+            replayed += 1
+        replay_time = time.perf_counter() - started
+
+        # Let the last state changes reach the sensors, removing them then
+        # sends what is still queued
+        await hass.async_block_till_done()
+        for sensor, _ in sensors:
+            await sensor.async_remove()
+        session.stop()
+        for i, (_, server) in enumerate(sensors):
+            await async_release_server(hass, server, f"replay{i}")
+        attributes = [sensor.extra_state_attributes for sensor, _ in sensors]
+        await hass.async_stop(force=True)
+    await stub.async_stop()
+
+    latencies = sorted(
+        (stub.arrivals[key] - sent_at) * 1000
+        for key, sent_at in sent.items()
+        if key in stub.arrivals
+    )
+    uploaded = len(stub.arrivals)
+    dropped = sum(attribute["dropped_points"] for attribute in attributes)
+    last_arrival = max(stub.arrivals.values(), default=started)
+    print(f"Devices:             {len(entity_ids)}")
+    print(f"States replayed:     {replayed} in {replay_time:.1f} s at {speed}x")
+    print(f"Replay behind by:    {behind * 1000:.0f} ms at most")
+    print(f"Points uploaded:     {uploaded}")
+    elapsed = last_arrival - started
+    print(f"Throughput:          {(replayed - dropped) / elapsed:.0f} states/s")
+    print(f"Upload throughput:   {uploaded / elapsed:.0f} points/s")
+    print(
+        "Upload latency (ms): "
+        f"p50 {_percentile(latencies, 50):.1f}, "
+        f"p95 {_percentile(latencies, 95):.1f}, "
+        f"p99 {_percentile(latencies, 99):.1f}, "
+        f"max {_percentile(latencies, 100):.1f}"
+    )
+    print(f"Dropped by queue:    {dropped}")
+    # Smoothed, simplified or deduplicated away, or dropped on shutdown
+    print(f"Not uploaded:        {replayed - uploaded - dropped}")
+    print(
+        "Callback time (µs):  max "
+        f"{max(attribute['callback_time_max_us'] for attribute in attributes)}"
+    )
+    if profile is not None:
+        _print_profile(session, profile)
+
+
+async def _async_add_tracker(  # noqa: PLR0917
+    component: EntityComponent,
+    host: str,
+    entry_id: str,
+    entity_id: str,
+    simplify_tolerance: float,
+    smoothing: bool,
+) -> tuple[DawarichTrackerSensor, DawarichServer]:
+    """Add a tracker sensor as a config entry of the Dawarich server would."""
+    hass = component.hass
+    server = await async_get_server(hass, entry_id, host, False, False)
+    sensor = DawarichTrackerSensor(
+        entry_id=entry_id,
+        device_name=entity_id,
+        mobile_app=entity_id,
+        api=get_api(
+            host,
+            "replay",
+            False,
+            False,
+            session=server.session,
+            limiter=server.scheduler.limiter,
+        ),
+        hass=hass,
+        device_info={},
+        description=TRACKER_SENSOR_TYPES,
+        simplify_tolerance=simplify_tolerance,
+        smoothing=smoothing,
+        health=server.health_coordinator,
+    )
+    sensor.entity_id = f"sensor.{entry_id}_tracker"
+    await component.async_add_entities([sensor])
+    return sensor, server
+
+
+def _print_profile(session: ProfileSession, profile: Path) -> None:
+    """Write the profile of a replay and print the timings of its hot paths."""
+    session.profile.dump_stats(profile)
+    print(f"Profile:             {profile}")
+    for name, stats in sorted(session.spans.items()):
+        print(f"  {name}: {stats.as_dict()}")
+
+
+def main() -> None:
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser(
+        "record", help="record device trackers from a recorder database"
+    )
+    record_parser.add_argument("database", type=Path)
+    record_parser.add_argument("output", type=Path)
+    record_parser.add_argument("entity_ids", nargs="+")
+
+    synthesize_parser = commands.add_parser(
+        "synthesize", help="synthesize a family road trip"
+    )
+    synthesize_parser.add_argument("output", type=Path)
+    synthesize_parser.add_argument("--devices", type=int, default=4)
+    synthesize_parser.add_argument("--hours", type=float, default=1)
+    synthesize_parser.add_argument(
+        "--interval", type=float, default=1, help="seconds between fixes"
+    )
+    synthesize_parser.add_argument("--seed", type=int, default=0)
+
+    replay_parser = commands.add_parser(
+        "replay", help="replay a recording into the tracker"
+    )
+    replay_parser.add_argument("recording", type=Path)
+    replay_parser.add_argument(
+        "--speed", type=float, default=1, help="1 replays in real time, up to 1000"
+    )
+    replay_parser.add_argument(
+        "--latency", type=float, default=0, help="server latency in seconds"
+    )
+    replay_parser.add_argument(
+        "--simplify-tolerance", type=float, default=DEFAULT_SIMPLIFY_TOLERANCE
+    )
+    replay_parser.add_argument("--smoothing", action="store_true")
+    replay_parser.add_argument(
+        "--profile", type=Path, help="write a cProfile stats file of the hot paths"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    match args.command:
+        case "record":
+            written = record(args.database, args.output, args.entity_ids)
+            print(f"Recorded {written} states to {args.output}")
+        case "synthesize":
+            written = synthesize(
+                args.output, args.devices, args.hours, args.interval, args.seed
+            )
+            print(f"Synthesized {written} states to {args.output}")
+        case "replay":
+            if not 0 < args.speed <= 1000:
+                parser.error("--speed must be between 0 and 1000")
+            asyncio.run(
+                async_replay(
+                    args.recording,
+                    args.speed,
+                    args.latency,
+                    args.simplify_tolerance,
+                    args.smoothing,
+                    args.verbose,
+                    args.profile,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""Fixtures for the Dawarich tests."""
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import frame
+
+
+@pytest.fixture
+async def hass(tmp_path: Path) -> AsyncGenerator[HomeAssistant]:
+    """Return a bare Home Assistant instance, for its loop and executor."""
+    hass = HomeAssistant(str(tmp_path))
+    # Newer versions report deprecated usage through the frame helper, which
+    # bootstrap sets up
+    if hasattr(frame, "async_setup"):
+        frame.async_setup(hass)
+    yield hass
+    await hass.async_stop(force=True)
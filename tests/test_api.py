@@ -0,0 +1,279 @@
+"""Tests for the Dawarich API client."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any
+
+import aiohttp
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.dawarich.api import DawarichClient
+from custom_components.dawarich.helpers import get_device_info
+from custom_components.dawarich.sensor import (
+    TRACKER_SENSOR_TYPES,
+    DawarichTrackerSensor,
+)
+
+
+class FakeResponse:
+    """Response of the fake session."""
+
+    def __init__(
+        self, status: int, body: Any = None, headers: dict[str, str] | None = None
+    ) -> None:
+        """Initialize the response."""
+        self.status = status
+        self.ok = status < 400
+        self.reason = "OK" if self.ok else "Unprocessable Entity"
+        self.headers = headers or {}
+        self._body = body
+
+    async def json(self) -> Any:
+        """Return the body."""
+        return self._body
+
+
+class FakeSession:
+    """Record the requests made through an aiohttp session."""
+
+    def __init__(
+        self,
+        status: int = 201,
+        error: Exception | None = None,
+        body: Any = None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Initialize the session."""
+        self.status = status
+        self.error = error
+        self.body = body
+        self.headers = headers
+        self.posted: list[tuple[str, Any]] = []
+        self.fetched: list[tuple[str, dict[str, Any] | None]] = []
+
+    @asynccontextmanager
+    async def get(
+        self, url: str, *, params: dict[str, Any] | None = None, **kwargs: Any
+    ) -> AsyncIterator:
+        """Record a GET request."""
+        if self.error is not None:
+            raise self.error
+        self.fetched.append((url, params))
+        yield FakeResponse(self.status, self.body, self.headers)
+
+    @asynccontextmanager
+    async def post(self, url: str, *, json: Any, **kwargs: Any) -> AsyncIterator:
+        """Record a POST request."""
+        if self.error is not None:
+            raise self.error
+        self.posted.append((url, json))
+        yield FakeResponse(self.status)
+
+
+def _client(session: FakeSession, limiter: asyncio.Semaphore | None = None):
+    """Return a client using a fake session."""
+    return DawarichClient(
+        "http://dawarich.local", "key", session=session, limiter=limiter
+    )
+
+
+def test_point_feature() -> None:
+    """Test the GeoJSON feature of a point with every optional value."""
+    feature = _client(FakeSession())._point_feature(
+        5.0,
+        52.0,
+        "phone",
+        timestamp=1_700_000_000,
+        altitude=10.0,
+        speed=3.0,
+        horizontal_accuracy=5.0,
+        vertical_accuracy=4.0,
+        battery_level=55,
+    )
+
+    assert feature["geometry"] == {"type": "Point", "coordinates": [5.0, 52.0]}
+    properties = feature["properties"]
+    assert properties["timestamp"] == "2023-11-14T22:13:20+00:00"
+    assert properties["device_id"] == "phone"
+    assert properties["altitude"] == 10.0
+    assert properties["speed"] == 3.0
+    assert properties["horizontal_accuracy"] == 5.0
+    assert properties["vertical_accuracy"] == 4.0
+    assert properties["battery_level"] == 55
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        1_700_000_000,
+        1_700_000_000.0,
+        "2023-11-14T22:13:20+00:00",
+        datetime(2023, 11, 14, 22, 13, 20, tzinfo=UTC),
+    ],
+)
+def test_point_feature_timestamps(timestamp: Any) -> None:
+    """Test that every kind of timestamp is sent in the same form."""
+    feature = _client(FakeSession())._point_feature(
+        5.0, 52.0, "phone", timestamp=timestamp
+    )
+
+    assert feature["properties"]["timestamp"] == "2023-11-14T22:13:20+00:00"
+
+
+def test_point_feature_unknown_key() -> None:
+    """Test that a value the API does not know is not silently dropped."""
+    with pytest.raises(TypeError):
+        _client(FakeSession())._point_feature(5.0, 52.0, "phone", battery=55)
+
+
+async def test_tracker_point_feature(hass: HomeAssistant) -> None:
+    """Test that every attribute the tracker reads reaches the feature."""
+    client = _client(FakeSession())
+    tracker = DawarichTrackerSensor(
+        "entry",
+        "Phone",
+        "device_tracker.phone",
+        client,
+        hass,
+        get_device_info("entry", "Phone", client.url),
+        TRACKER_SENSOR_TYPES,
+    )
+
+    params = await tracker._async_add_optional_params(
+        {
+            "gps_accuracy": 5,
+            "altitude": 10,
+            "vertical_accuracy": 4,
+            "velocity": 3,
+            "battery": 55,
+            "last_seen": "2023-11-14T22:13:20+00:00",
+        }
+    )
+    properties = client._point_feature(5.0, 52.0, "Phone", **params)["properties"]
+
+    assert properties["horizontal_accuracy"] == 5
+    assert properties["altitude"] == 10
+    assert properties["vertical_accuracy"] == 4
+    assert properties["speed"] == 3
+    assert properties["battery_level"] == 55
+    assert properties["timestamp"] == "2023-11-14T22:13:20+00:00"
+
+
+async def test_add_points() -> None:
+    """Test that a batch of points is sent in one request."""
+    session = FakeSession()
+    limiter = asyncio.Semaphore(1)
+    points = [
+        {"latitude": 52.0, "longitude": 5.0, "timestamp": 1_700_000_000},
+        {"latitude": 52.1, "longitude": 5.1, "timestamp": 1_700_000_060},
+    ]
+
+    response = await _client(session, limiter).add_points(points, "phone")
+
+    assert response.success
+    assert not limiter.locked()
+    [(url, body)] = session.posted
+    assert url == "http://dawarich.local/api/v1/points"
+    assert [feature["geometry"]["coordinates"] for feature in body["locations"]] == [
+        [5.0, 52.0],
+        [5.1, 52.1],
+    ]
+
+
+async def test_add_points_error_status() -> None:
+    """Test that an error status is returned, not raised."""
+    response = await _client(FakeSession(status=422)).add_one_point(
+        5.0, 52.0, "phone", timestamp=1_700_000_000
+    )
+
+    assert not response.success
+    assert response.response_code == 422
+    assert response.error == "Unprocessable Entity"
+
+
+async def test_add_points_connection_error() -> None:
+    """Test that a connection error is returned as a failed response."""
+    limiter = asyncio.Semaphore(1)
+    session = FakeSession(error=aiohttp.ClientConnectionError("refused"))
+
+    response = await _client(session, limiter).add_one_point(
+        5.0, 52.0, "phone", timestamp=1_700_000_000
+    )
+
+    assert response.response_code == 500
+    assert response.error == "refused"
+    assert not limiter.locked()
+
+
+async def test_get_points() -> None:
+    """Test that the time range is sent in ISO 8601 and the pages are read."""
+    session = FakeSession(
+        status=200,
+        body=[{"id": 7, "latitude": "52.0", "longitude": "5.0", "timestamp": 1}],
+        headers={"X-Total-Pages": "3"},
+    )
+
+    response = await _client(session).get_points(
+        start_at=1_700_000_000, end_at=1_700_000_060, page=2, per_page=1
+    )
+
+    assert response.success
+    assert response.total_pages == 3
+    assert response.response[0].latitude == 52.0
+    [(url, params)] = session.fetched
+    assert url == "http://dawarich.local/api/v1/points"
+    assert params == {
+        "page": 2,
+        "per_page": 1,
+        "order": "desc",
+        "start_at": "2023-11-14T22:13:20+00:00",
+        "end_at": "2023-11-14T22:14:20+00:00",
+    }
+
+
+async def test_get_points_without_range() -> None:
+    """Test that an open range is not sent and a single page is assumed."""
+    session = FakeSession(status=200, body=[])
+
+    response = await _client(session).get_points()
+
+    assert response.response == []
+    assert response.total_pages == 1
+    assert "start_at" not in session.fetched[0][1]
+
+
+async def test_get_points_error_status() -> None:
+    """Test that an error status is returned, not raised."""
+    response = await _client(FakeSession(status=401)).get_points(start_at=1)
+
+    assert response.response_code == 401
+    assert response.response is None
+
+
+async def test_get_health() -> None:
+    """Test that a healthy server reports its version and latency."""
+    session = FakeSession(
+        status=200, body={"status": "ok"}, headers={"X-Dawarich-Version": "0.30.1"}
+    )
+
+    response = await _client(session).get_health()
+
+    assert response.success
+    assert response.response.minor == 30
+    assert response.latency is not None
+    assert session.fetched[0][0] == "http://dawarich.local/api/v1/health"
+
+
+@pytest.mark.parametrize(
+    "body", [{"status": "maintenance"}, ["ok"], "ok", None, 1], ids=repr
+)
+async def test_get_health_unhealthy_body(body: Any) -> None:
+    """Test that anything but an ok status object is an unhealthy probe."""
+    response = await _client(FakeSession(status=200, body=body)).get_health()
+
+    assert not response.success
+    assert response.response_code == 503
+    assert response.latency is None
@@ -0,0 +1,69 @@
+"""Tests for the current month and year values of the stats breakdown."""
+
+from datetime import date
+
+from homeassistant.components.sensor import SensorStateClass
+
+from custom_components.dawarich.coordinator import DawarichStatsBreakdown
+from custom_components.dawarich.sensor import BREAKDOWN_SENSOR_TYPES
+
+YEARLY_STATS = [
+    {
+        "year": 2024,
+        "total_distance_km": 1500,
+        "total_countries_visited": 3,
+        "total_cities_visited": 12,
+        "monthly_distance_km": {"january": 100, "december": 200},
+    },
+    {
+        "year": 2023,
+        "total_distance_km": 900,
+        "total_countries_visited": 1,
+        "total_cities_visited": 4,
+        "monthly_distance_km": {"march": 50},
+    },
+]
+
+
+def _values(today: date) -> dict[str, object]:
+    """Return the value of every breakdown sensor on a date."""
+    breakdown = DawarichStatsBreakdown.from_yearly_stats(YEARLY_STATS)
+    return {
+        description.key: description.value_fn(breakdown, today)
+        for description in BREAKDOWN_SENSOR_TYPES
+    }
+
+
+def test_breakdown_index() -> None:
+    """Test that the yearly stats are indexed in chronological order."""
+    breakdown = DawarichStatsBreakdown.from_yearly_stats(YEARLY_STATS)
+
+    assert list(breakdown.years) == [2023, 2024]
+    assert breakdown.monthly_distance_km == {
+        (2023, 3): 50,
+        (2024, 1): 100,
+        (2024, 12): 200,
+    }
+
+
+def test_current_period_values() -> None:
+    """Test the values for the current month and year."""
+    assert _values(date(2024, 12, 31)) == {
+        "current_month_distance_km": 200,
+        "current_year_distance_km": 1500,
+        "current_year_countries_visited": 3,
+        "current_year_cities_visited": 12,
+    }
+
+
+def test_values_reset_with_a_new_period() -> None:
+    """Test that the values are 0 for a month or year without stats."""
+    assert set(_values(date(2025, 1, 1)).values()) == {0}
+    assert _values(date(2024, 2, 1))["current_month_distance_km"] == 0
+
+
+def test_reset_is_not_a_decrease() -> None:
+    """Test that the recorder takes the drop at a new period for a reset."""
+    assert {description.state_class for description in BREAKDOWN_SENSOR_TYPES} == {
+        SensorStateClass.TOTAL_INCREASING
+    }
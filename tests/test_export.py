@@ -0,0 +1,176 @@
+"""Tests for the export of points to files."""
+
+import csv
+import io
+import json
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.dawarich.api import DawarichPoint, PointsResponse
+from custom_components.dawarich.export import (
+    CsvWriter,
+    GeoJsonWriter,
+    GpxWriter,
+    PointWriter,
+    async_export_points,
+    get_writer,
+)
+
+GPX_NAMESPACE = {"gpx": "http://www.topografix.com/GPX/1/1"}
+
+
+def _points(count: int, start: int = 0) -> list[DawarichPoint]:
+    """Return points along a meridian, one per minute."""
+    return [
+        DawarichPoint(
+            latitude=52.0 + index * 0.001,
+            longitude=5.0,
+            timestamp=1_700_000_000 + index * 60,
+            altitude=10.0 if index % 2 else None,
+            battery=80,
+        )
+        for index in range(start, start + count)
+    ]
+
+
+def _write(writer: PointWriter, *pages: list[DawarichPoint]) -> str:
+    """Return the document written for some pages of points."""
+    return (
+        writer.header()
+        + "".join(writer.format(points) for points in pages)
+        + writer.footer()
+    )
+
+
+class FakeApi:
+    """Serve points in pages like the points API."""
+
+    def __init__(self, points: list[DawarichPoint], fail_page: int | None = None):
+        """Initialize the API."""
+        self._points = points
+        self._fail_page = fail_page
+        self.pages: list[int] = []
+
+    async def get_points(self, *, page: int, per_page: int, **kwargs) -> PointsResponse:
+        """Return a page of points."""
+        self.pages.append(page)
+        if page == self._fail_page:
+            return PointsResponse(response_code=500, error="boom")
+        total_pages = max(1, -(-len(self._points) // per_page))
+        start = (page - 1) * per_page
+        return PointsResponse(
+            response_code=200,
+            response=self._points[start : start + per_page],
+            total_pages=total_pages,
+        )
+
+
+def test_point_writer_is_abstract() -> None:
+    """Test that a writer has to format points."""
+    with pytest.raises(TypeError):
+        PointWriter()  # type: ignore[abstract]
+
+
+def test_gpx_writer() -> None:
+    """Test that the GPX writer writes one track across pages."""
+    document = _write(GpxWriter("Alice & Bob"), _points(2), _points(1, start=2))
+
+    root = ET.fromstring(document)
+    assert root.find("gpx:trk/gpx:name", GPX_NAMESPACE).text == "Alice & Bob"
+    track_points = root.findall("gpx:trk/gpx:trkseg/gpx:trkpt", GPX_NAMESPACE)
+    assert [point.get("lat") for point in track_points] == ["52.0", "52.001", "52.002"]
+    assert track_points[0].find("gpx:ele", GPX_NAMESPACE) is None
+    assert track_points[1].find("gpx:ele", GPX_NAMESPACE).text == "10.0"
+    assert (
+        track_points[0].find("gpx:time", GPX_NAMESPACE).text == "2023-11-14T22:13:20Z"
+    )
+
+
+def test_geojson_writer_across_pages() -> None:
+    """Test that pages, including empty ones, make one valid collection."""
+    document = _write(GeoJsonWriter(), _points(2), [], _points(1, start=2))
+
+    collection = json.loads(document)
+    assert collection["type"] == "FeatureCollection"
+    assert [
+        feature["geometry"]["coordinates"] for feature in collection["features"]
+    ] == [[5.0, 52.0], [5.0, 52.001], [5.0, 52.002]]
+    assert collection["features"][0]["properties"]["battery"] == 80
+
+
+def test_geojson_writer_without_points() -> None:
+    """Test that an export without points is an empty collection."""
+    assert json.loads(_write(GeoJsonWriter(), []))["features"] == []
+
+
+def test_csv_writer() -> None:
+    """Test that the CSV writer writes a header and a row per point."""
+    rows = list(csv.DictReader(io.StringIO(_write(CsvWriter(), _points(2)))))
+
+    assert len(rows) == 2
+    assert rows[0]["timestamp"] == "2023-11-14T22:13:20Z"
+    assert rows[0]["altitude"] == ""
+    assert rows[1]["latitude"] == "52.001"
+
+
+def test_get_writer() -> None:
+    """Test that writers are looked up by format."""
+    assert isinstance(get_writer("gpx", "name"), GpxWriter)
+    assert isinstance(get_writer("geojson", "name"), GeoJsonWriter)
+    assert isinstance(get_writer("csv", "name"), CsvWriter)
+    with pytest.raises(ValueError):
+        get_writer("kml", "name")
+
+
+async def test_export_points(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test that every page is exported and the file moved into place."""
+    api = FakeApi(_points(2500))
+    path = tmp_path / "dawarich" / "export.geojson"
+
+    exported = await async_export_points(
+        hass, api, path, GeoJsonWriter(), start_at=0, end_at=2_000_000_000
+    )
+
+    assert exported == 2500
+    assert api.pages == [1, 2, 3]
+    assert len(json.loads(path.read_text())["features"]) == 2500
+    assert list(path.parent.iterdir()) == [path]
+
+
+async def test_export_points_simplified(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test that a straight track is simplified to its ends."""
+    path = tmp_path / "export.csv"
+
+    exported = await async_export_points(
+        hass,
+        FakeApi(_points(20)),
+        path,
+        CsvWriter(),
+        start_at=0,
+        end_at=2_000_000_000,
+        simplify_tolerance=5,
+    )
+
+    assert exported == 2
+    assert len(path.read_text().splitlines()) == 3
+
+
+async def test_export_points_error(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test that a failed page leaves no file behind."""
+    path = tmp_path / "export.gpx"
+
+    with pytest.raises(HomeAssistantError):
+        await async_export_points(
+            hass,
+            FakeApi(_points(2500), fail_page=2),
+            path,
+            GpxWriter("name"),
+            start_at=0,
+            end_at=2_000_000_000,
+        )
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,125 @@
+"""Tests for the smoothing of tracker points."""
+
+import json
+import math
+
+import pytest
+
+from custom_components.dawarich.filters import (
+    MAX_REJECTED_FIXES,
+    RESET_AFTER,
+    TrackFilter,
+    _distance,
+)
+from custom_components.dawarich.simplify import EARTH_RADIUS_M
+
+LATITUDE = 52.0
+LONGITUDE = 5.0
+# Degrees of latitude per metre
+METRE = math.degrees(1 / EARTH_RADIUS_M)
+
+
+def _north(metres: float) -> float:
+    """Return the latitude some metres north of the start."""
+    return LATITUDE + metres * METRE
+
+
+def _offset(position: tuple[float, float] | None) -> float:
+    """Return the distance in metres of a position from the start."""
+    assert position is not None
+    return _distance(LATITUDE, LONGITUDE, *position)
+
+
+def _settled_filter() -> TrackFilter:
+    """Return a filter that has seen a device stand still for a minute."""
+    track_filter = TrackFilter()
+    for second in range(0, 60, 5):
+        track_filter.update(LATITUDE, LONGITUDE, second, accuracy=5, speed=0)
+    return track_filter
+
+
+def test_first_fix_is_kept() -> None:
+    """Test that the first fix starts the filter where it is."""
+    assert TrackFilter().update(LATITUDE, LONGITUDE, 0) == (LATITUDE, LONGITUDE)
+
+
+def test_inaccurate_fix_is_pulled_back() -> None:
+    """Test that an inaccurate fix of a standing device barely moves it."""
+    track_filter = _settled_filter()
+
+    position = track_filter.update(_north(50), LONGITUDE, 65, accuracy=100, speed=0)
+
+    assert _offset(position) < 2
+
+
+def test_accurate_fixes_are_followed() -> None:
+    """Test that the estimate follows a device moving at walking speed."""
+    track_filter = _settled_filter()
+
+    for second in range(60, 180, 5):
+        position = track_filter.update(
+            _north((second - 55) * 1.5), LONGITUDE, second, accuracy=5
+        )
+
+    assert _offset(position) == pytest.approx(180, abs=5)
+
+
+def test_implausible_jump_is_dropped() -> None:
+    """Test that a fix that could only be reached at 200 m/s is dropped."""
+    track_filter = _settled_filter()
+
+    assert track_filter.update(_north(2000), LONGITUDE, 70, accuracy=5) is None
+    assert track_filter.rejected == 1
+    # The next plausible fix is kept again
+    assert _offset(track_filter.update(LATITUDE, LONGITUDE, 75, accuracy=5)) < 1
+    assert track_filter.rejected == 0
+
+
+def test_reported_speed_allows_a_jump() -> None:
+    """Test that a fix is plausible at the speed the device reports."""
+    track_filter = _settled_filter()
+
+    position = track_filter.update(_north(2000), LONGITUDE, 70, accuracy=5, speed=200)
+
+    assert position is not None
+
+
+def test_restart_after_rejected_fixes() -> None:
+    """Test that the filter restarts when it keeps rejecting fixes."""
+    track_filter = _settled_filter()
+
+    positions = [
+        track_filter.update(_north(5000), LONGITUDE, 60 + index, accuracy=5)
+        for index in range(MAX_REJECTED_FIXES)
+    ]
+
+    assert positions[:-1] == [None] * (MAX_REJECTED_FIXES - 1)
+    assert positions[-1] == (_north(5000), LONGITUDE)
+
+
+def test_restart_after_gap() -> None:
+    """Test that the filter restarts after a long gap."""
+    track_filter = _settled_filter()
+
+    position = track_filter.update(
+        _north(50_000), LONGITUDE, 60 + RESET_AFTER + 1, accuracy=50
+    )
+
+    assert position == (_north(50_000), LONGITUDE)
+
+
+def test_persisted_filter_continues() -> None:
+    """Test that a restored filter gives the same estimates as the original."""
+    track_filter = _settled_filter()
+    restored = TrackFilter.from_dict(json.loads(json.dumps(track_filter.as_dict())))
+
+    for second in range(60, 120, 5):
+        fix = (_north(second - 55), LONGITUDE, second)
+        assert restored.update(*fix, accuracy=10) == track_filter.update(
+            *fix, accuracy=10
+        )
+
+
+def test_from_empty_storage() -> None:
+    """Test that a filter without stored state starts empty."""
+    assert TrackFilter.from_dict(None) == TrackFilter()
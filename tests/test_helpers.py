@@ -0,0 +1,81 @@
+"""Tests for the helpers of the Dawarich integration."""
+
+from datetime import UTC, datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from custom_components.dawarich.helpers import (
+    get_url,
+    normalize_timestamp,
+    parse_timestamp,
+)
+
+TIMESTAMP = 1_700_000_000.0
+CAPTURED_AT = datetime.fromtimestamp(TIMESTAMP + 30, UTC)
+
+
+@pytest.mark.parametrize(
+    ("host", "use_ssl", "url"),
+    [
+        ("dawarich.local", True, "https://dawarich.local"),
+        ("http://dawarich.local:3000", True, "https://dawarich.local:3000"),
+        ("https://dawarich.local", False, "http://dawarich.local"),
+    ],
+)
+def test_get_url(host: str, use_ssl: bool, url: str) -> None:
+    """Test that the scheme follows the SSL setting."""
+    assert get_url(host, use_ssl) == url
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        TIMESTAMP,
+        int(TIMESTAMP),
+        TIMESTAMP * 1000,
+        "1700000000",
+        "1700000000000",
+        "2023-11-14T22:13:20Z",
+        "2023-11-14T23:13:20+01:00",
+        "2023-11-14 22:13:20",
+        datetime(2023, 11, 14, 22, 13, 20, tzinfo=UTC),
+        datetime(2023, 11, 14, 23, 13, 20, tzinfo=timezone(timedelta(hours=1))),
+        datetime(2023, 11, 14, 22, 13, 20),
+    ],
+)
+def test_parse_timestamp(value: Any) -> None:
+    """Test that every form of a timestamp is read, naive times as UTC."""
+    assert parse_timestamp(value) == TIMESTAMP
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        "",
+        "yesterday",
+        "2023-13-45",
+        "nan",
+        "inf",
+        float("nan"),
+        float("-inf"),
+        1e300,
+        [TIMESTAMP],
+    ],
+)
+def test_parse_invalid_timestamp(value: Any) -> None:
+    """Test that values that are not timestamps are rejected."""
+    assert parse_timestamp(value) is None
+
+
+def test_normalize_timestamp() -> None:
+    """Test that a reported timestamp is kept."""
+    assert normalize_timestamp("2023-11-14T22:13:20Z", CAPTURED_AT) == TIMESTAMP
+
+
+@pytest.mark.parametrize("value", [None, "nan", "garbage", TIMESTAMP + 7200])
+def test_normalize_timestamp_falls_back(value: Any) -> None:
+    """Test that a missing, unreadable or future time is replaced."""
+    assert normalize_timestamp(value, CAPTURED_AT) == CAPTURED_AT.timestamp()
@@ -0,0 +1,289 @@
+"""Tests for the streamed import of files."""
+
+import asyncio
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from dawarich_api.response_model import AddOnePointResponse
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.dawarich import importer
+from custom_components.dawarich.importer import (
+    async_import_file,
+    detect_format,
+    iter_batches,
+    iter_geojson_points,
+    iter_gpx_points,
+    iter_jsonl_points,
+)
+
+TIMESTAMP = 1_700_000_000.0
+
+GPX = """<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1">
+  <wpt lat="52.0" lon="5.0"><time>2023-11-14T22:13:20Z</time></wpt>
+  <trk><trkseg>
+    <trkpt lat="52.001" lon="5.001">
+      <ele>12.5</ele><time>2023-11-14T22:14:20Z</time>
+    </trkpt>
+    <trkpt lat="52.002" lon="5.002"></trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+
+def _feature(index: int, **properties: Any) -> dict[str, Any]:
+    """Return a GeoJSON feature as exported by Dawarich."""
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [5.0, 52.0 + index * 0.001]},
+        "properties": {"timestamp": TIMESTAMP + index * 60, **properties},
+    }
+
+
+def _jsonl(count: int) -> str:
+    """Return a JSON Lines file of plain records."""
+    return "".join(
+        json.dumps({"lat": 52.0 + index * 0.001, "lon": 5.0, "time": TIMESTAMP + index})
+        + "\n"
+        for index in range(count)
+    )
+
+
+@pytest.mark.parametrize(
+    ("name", "import_format"),
+    [
+        ("track.gpx", "gpx"),
+        ("track.GPX", "gpx"),
+        ("export.geojson", "geojson"),
+        ("export.json.gz", "geojson"),
+        ("points.ndjson", "jsonl"),
+        ("2024-01.rec.gz", "owntracks"),
+    ],
+)
+def test_detect_format(name: str, import_format: str) -> None:
+    """Test that the format is told from the name, before an optional .gz."""
+    assert detect_format(Path(name)) == import_format
+
+
+@pytest.mark.parametrize("name", ["track", "track.gz", "track.kml"])
+def test_detect_unknown_format(name: str) -> None:
+    """Test that a name without a known suffix is rejected."""
+    with pytest.raises(ValueError, match="Cannot tell the format"):
+        detect_format(Path(name))
+
+
+def test_gpx_points() -> None:
+    """Test that way and track points are read, and those without a time skipped."""
+    points = list(iter_gpx_points(io.StringIO(GPX)))
+
+    assert points == [
+        {"latitude": 52.0, "longitude": 5.0, "timestamp": TIMESTAMP},
+        {
+            "latitude": 52.001,
+            "longitude": 5.001,
+            "timestamp": TIMESTAMP + 60,
+            "altitude": 12.5,
+        },
+        None,
+    ]
+
+
+def test_gpx_points_across_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a document read in small chunks gives the same points."""
+    monkeypatch.setattr(importer, "READ_CHUNK_SIZE", 7)
+
+    assert len(list(iter_gpx_points(io.StringIO(GPX)))) == 3
+
+
+@pytest.mark.parametrize("chunk_size", [3, 1 << 20])
+def test_geojson_feature_collection(
+    monkeypatch: pytest.MonkeyPatch, chunk_size: int
+) -> None:
+    """Test that the features of a collection are read whatever the chunks."""
+    monkeypatch.setattr(importer, "READ_CHUNK_SIZE", chunk_size)
+    document = json.dumps(
+        {
+            "type": "FeatureCollection",
+            "name": "export",
+            "features": [
+                _feature(0, battery=81, velocity=12.25, accuracy=5),
+                _feature(1, altitude=3.5),
+                {"type": "Feature", "geometry": {"type": "LineString"}},
+            ],
+            "crs": None,
+        }
+    )
+
+    points = list(iter_geojson_points(io.StringIO(document)))
+
+    assert points == [
+        {
+            "latitude": 52.0,
+            "longitude": 5.0,
+            "timestamp": TIMESTAMP,
+            "speed": 12.25,
+            "horizontal_accuracy": 5.0,
+            "battery_level": 81,
+        },
+        {
+            "latitude": 52.001,
+            "longitude": 5.0,
+            "timestamp": TIMESTAMP + 60,
+            "altitude": 3.5,
+        },
+        None,
+    ]
+
+
+def test_geojson_array() -> None:
+    """Test that a bare array of features is read."""
+    document = json.dumps([_feature(0), _feature(1)])
+
+    assert len(list(iter_geojson_points(io.StringIO(document)))) == 2
+    assert list(iter_geojson_points(io.StringIO("[]"))) == []
+
+
+@pytest.mark.parametrize("document", ['{"features": [1, 2', "[1 2]", '{"a" 1}'])
+def test_geojson_invalid(document: str) -> None:
+    """Test that a document that is not valid JSON raises a ValueError."""
+    with pytest.raises(ValueError):
+        list(iter_geojson_points(io.StringIO(document)))
+
+
+def test_jsonl_points() -> None:
+    """Test that every line is a record, and invalid ones are skipped."""
+    lines = _jsonl(2) + "\n{not json}\n" + json.dumps({"lat": 52.0}) + "\n"
+
+    points = list(iter_jsonl_points(io.StringIO(lines)))
+
+    assert points == [
+        {"latitude": 52.0, "longitude": 5.0, "timestamp": TIMESTAMP},
+        {"latitude": 52.001, "longitude": 5.0, "timestamp": TIMESTAMP + 1},
+        None,
+        None,
+    ]
+
+
+def test_owntracks_recorder() -> None:
+    """Test that the location messages of the OwnTracks recorder are read."""
+    location = {
+        "_type": "location",
+        "lat": 52.0,
+        "lon": 5.0,
+        "tst": int(TIMESTAMP),
+        "vel": 36,
+        "acc": 10,
+        "batt": 55,
+    }
+    lines = (
+        f"2023-11-14T22:13:20Z\t*                 \t{json.dumps(location)}\n"
+        '2023-11-14T22:13:30Z\tlwt               \t{"_type": "lwt"}\n'
+    )
+
+    points = list(iter_jsonl_points(io.StringIO(lines)))
+
+    assert points == [
+        {
+            "latitude": 52.0,
+            "longitude": 5.0,
+            "timestamp": TIMESTAMP,
+            "speed": 10.0,
+            "horizontal_accuracy": 10.0,
+            "battery_level": 55,
+        },
+        None,
+    ]
+
+
+def test_iter_batches_gzip(tmp_path: Path) -> None:
+    """Test that a gzipped file is read in batches, counting skipped records."""
+    path = tmp_path / "points.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        file.write(_jsonl(5) + "garbage {\n")
+
+    batches = list(iter_batches(path, "jsonl", 2))
+
+    assert [(len(points), skipped) for points, skipped in batches] == [
+        (2, 0),
+        (2, 0),
+        (1, 1),
+    ]
+
+
+def test_iter_batches_unsupported_format(tmp_path: Path) -> None:
+    """Test that an unknown format is rejected."""
+    path = tmp_path / "points.kml"
+    path.write_text("")
+
+    with pytest.raises(ValueError, match="Unsupported import format"):
+        list(iter_batches(path, "kml", 2))
+
+
+class FakeApi:
+    """Record the batches sent to Dawarich."""
+
+    def __init__(self, fail_on: int | None = None) -> None:
+        """Initialize the API."""
+        self.batches: list[list[dict[str, Any]]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._fail_on = fail_on
+
+    async def add_points(
+        self, points: list[dict[str, Any]], name: str
+    ) -> AddOnePointResponse:
+        """Accept a batch, or fail on the configured one."""
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        if len(self.batches) == self._fail_on:
+            return AddOnePointResponse(response_code=422, error="Unprocessable")
+        self.batches.append(points)
+        return AddOnePointResponse(response_code=201)
+
+
+async def test_import_file(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test that a file is uploaded in batches, a few at a time."""
+    path = tmp_path / "points.jsonl"
+    path.write_text(_jsonl(10) + "{}\n")
+    api = FakeApi()
+
+    result = await async_import_file(
+        hass, api, path, "jsonl", "Alice", batch_size=3, concurrency=2
+    )
+
+    assert result == (10, 1)
+    assert sorted(len(batch) for batch in api.batches) == [1, 3, 3, 3]
+    assert api.max_in_flight == 2
+
+
+async def test_import_file_upload_error(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test that a failed upload stops the import with the progress so far."""
+    path = tmp_path / "points.jsonl"
+    path.write_text(_jsonl(10))
+    api = FakeApi(fail_on=1)
+
+    with pytest.raises(HomeAssistantError, match="status 422.*points were imported"):
+        await async_import_file(
+            hass, api, path, "jsonl", "Alice", batch_size=3, concurrency=1
+        )
+
+    assert len(api.batches) == 1
+
+
+async def test_import_file_parse_error(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test that a file that cannot be parsed raises a HomeAssistantError."""
+    path = tmp_path / "points.gpx"
+    path.write_text("<gpx><trkpt")
+
+    with pytest.raises(HomeAssistantError, match="Error reading"):
+        await async_import_file(hass, FakeApi(), path, "gpx", "Alice")
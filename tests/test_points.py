@@ -0,0 +1,152 @@
+"""Tests for the last known position synced from Dawarich."""
+
+import asyncio
+from typing import Any
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.storage import Store
+
+from custom_components.dawarich import coordinator
+from custom_components.dawarich.api import DawarichPoint, PointsResponse
+from custom_components.dawarich.coordinator import (
+    DawarichPointsCoordinator,
+    points_storage_key,
+)
+from custom_components.dawarich.device_tracker import DawarichLastPositionTracker
+from custom_components.dawarich.scheduler import DawarichHostScheduler
+
+TIMESTAMP = 1_700_000_000
+
+
+def _point(timestamp: int) -> DawarichPoint:
+    """Return a point stored in Dawarich."""
+    return DawarichPoint(
+        id=timestamp,
+        latitude=52.0,
+        longitude=5.0,
+        timestamp=timestamp,
+        accuracy=12.5,
+        battery=80,
+    )
+
+
+class FakeApi:
+    """Serve the newest point after a timestamp like the points API."""
+
+    url = "http://dawarich.local"
+
+    def __init__(self, points: list[DawarichPoint], status: int = 200) -> None:
+        """Initialize the API."""
+        self.points = points
+        self.status = status
+        self.requests: list[dict[str, Any]] = []
+
+    async def get_points(self, **kwargs: Any) -> PointsResponse:
+        """Return the newest point at or after `start_at`."""
+        self.requests.append(kwargs)
+        if self.status != 200:
+            return PointsResponse(response_code=self.status, error="Unauthorized")
+        start_at = kwargs["start_at"] or 0
+        newer = [point for point in self.points if point.timestamp >= start_at]
+        newer.sort(key=lambda point: point.timestamp, reverse=True)
+        return PointsResponse(response_code=200, response=newer[: kwargs["per_page"]])
+
+
+async def _async_coordinator(
+    hass: HomeAssistant, api: FakeApi
+) -> DawarichPointsCoordinator:
+    """Return a points coordinator restored from storage."""
+    points = DawarichPointsCoordinator(
+        hass, api, "entry", DawarichHostScheduler(api.url)
+    )
+    await points._async_setup()
+    return points
+
+
+async def test_only_newer_points_are_requested(hass: HomeAssistant) -> None:
+    """Test that every refresh asks for the newest point after the last one."""
+    api = FakeApi([_point(TIMESTAMP - 60), _point(TIMESTAMP)])
+    points = await _async_coordinator(hass, api)
+
+    await points.async_refresh()
+    assert points.data["timestamp"] == TIMESTAMP
+
+    api.points.append(_point(TIMESTAMP + 30))
+    await points.async_refresh()
+
+    assert [request["start_at"] for request in api.requests] == [None, TIMESTAMP + 1]
+    assert all(request["per_page"] == 1 for request in api.requests)
+    assert points.data["timestamp"] == TIMESTAMP + 30
+    await points.async_shutdown()
+
+
+async def test_empty_page_keeps_the_last_point(hass: HomeAssistant) -> None:
+    """Test that no new point keeps the last point and the cursor."""
+    api = FakeApi([_point(TIMESTAMP)])
+    points = await _async_coordinator(hass, api)
+
+    await points.async_refresh()
+    await points.async_refresh()
+    await points.async_refresh()
+
+    assert points.last_update_success
+    assert points.data["timestamp"] == TIMESTAMP
+    assert [request["start_at"] for request in api.requests] == [
+        None,
+        TIMESTAMP + 1,
+        TIMESTAMP + 1,
+    ]
+    await points.async_shutdown()
+
+
+async def test_cursor_survives_a_restart(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a restart resumes after the persisted cursor."""
+    monkeypatch.setattr(coordinator, "STORAGE_SAVE_DELAY", 0)
+    api = FakeApi([_point(TIMESTAMP)])
+    points = await _async_coordinator(hass, api)
+    await points.async_refresh()
+    await points.async_shutdown()
+    # Let the delayed save write the cursor
+    await asyncio.sleep(0.01)
+    await hass.async_block_till_done()
+
+    store: Store[dict[str, Any]] = Store(hass, 1, points_storage_key("entry"))
+    assert (await store.async_load())["cursor"] == TIMESTAMP
+
+    restarted = await _async_coordinator(hass, FakeApi([]))
+    assert restarted.data["timestamp"] == TIMESTAMP
+    await restarted.async_refresh()
+
+    assert restarted.api.requests[0]["start_at"] == TIMESTAMP + 1
+    assert restarted.data["timestamp"] == TIMESTAMP
+    await restarted.async_shutdown()
+
+
+async def test_invalid_api_key(hass: HomeAssistant) -> None:
+    """Test that a rejected API key starts a reauthentication."""
+    points = await _async_coordinator(hass, FakeApi([], status=401))
+
+    await points.async_refresh()
+
+    assert isinstance(points.last_exception, ConfigEntryAuthFailed)
+    await points.async_shutdown()
+
+
+async def test_last_position_tracker(hass: HomeAssistant) -> None:
+    """Test that the device tracker shows the last point."""
+    points = await _async_coordinator(hass, FakeApi([_point(TIMESTAMP)]))
+    tracker = DawarichLastPositionTracker(points, "entry", "Phone", {})
+    assert tracker.latitude is None
+    assert tracker.extra_state_attributes is None
+
+    await points.async_refresh()
+
+    assert (tracker.latitude, tracker.longitude) == (52.0, 5.0)
+    assert tracker.location_accuracy == 12
+    assert tracker.battery_level == 80
+    assert tracker.extra_state_attributes["timestamp"] == "2023-11-14T22:13:20+00:00"
+    await points.async_shutdown()
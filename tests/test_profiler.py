@@ -0,0 +1,146 @@
+"""Tests for the profiling of the hot paths."""
+
+import asyncio
+import cProfile
+from collections.abc import Generator
+
+import pytest
+
+from custom_components.dawarich import profiler
+from custom_components.dawarich.profiler import (
+    ProfileSession,
+    SpanStats,
+    profile_running,
+    profiled,
+    span,
+)
+
+
+@pytest.fixture
+def session() -> Generator[ProfileSession]:
+    """Return a running session, stopped after the test."""
+    session = ProfileSession()
+    session.start()
+    yield session
+    session.stop()
+
+
+def test_span_stats() -> None:
+    """Test that the timings of calls are summed and their maximum kept."""
+    stats = SpanStats()
+    stats.add(2.0, 1.0)
+    stats.add(4.0, 0.5)
+
+    assert stats.as_dict() == {
+        "count": 2,
+        "wall_ms": 6.0,
+        "wall_max_ms": 4.0,
+        "loop_ms": 1.5,
+        "loop_max_ms": 1.0,
+    }
+
+
+def test_not_running() -> None:
+    """Test that marked code runs as usual without a session."""
+
+    @profiled("test.function")
+    def function(value: int) -> int:
+        return value + 1
+
+    assert not profile_running()
+    assert function(1) == 2
+    with span("test.block"):
+        pass
+
+
+def test_profile_functions(session: ProfileSession) -> None:
+    """Test that marked functions and blocks are timed."""
+
+    @profiled("test.function")
+    def function(value: int) -> int:
+        with span("test.block"):
+            return value + 1
+
+    assert profile_running()
+    assert function(1) == 2
+    assert function(2) == 3
+
+    assert session.spans["test.function"].count == 2
+    assert session.spans["test.block"].count == 2
+    assert session._depth == 0
+
+
+async def test_profile_coroutines(session: ProfileSession) -> None:
+    """Test that the awaits of a coroutine only count towards its wall time."""
+
+    @profiled("test.coroutine")
+    async def coroutine(value: int) -> int:
+        await asyncio.sleep(0.05)
+        return value + 1
+
+    assert await coroutine(1) == 2
+
+    stats = session.spans["test.coroutine"]
+    assert stats.count == 1
+    assert stats.wall_ms >= 50
+    assert stats.loop_ms < stats.wall_ms
+    assert session._depth == 0
+
+
+async def test_profile_errors(session: ProfileSession) -> None:
+    """Test that calls raising an error are still recorded."""
+
+    @profiled("test.coroutine")
+    async def coroutine() -> None:
+        await asyncio.sleep(0)
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        await coroutine()
+
+    assert session.spans["test.coroutine"].count == 1
+    assert session._depth == 0
+
+
+def test_stop(session: ProfileSession) -> None:
+    """Test that nothing is recorded once the session stopped."""
+    session.stop()
+
+    @profiled("test.function")
+    def function() -> None:
+        pass
+
+    function()
+
+    assert profiler._session is None
+    assert session.spans == {}
+
+
+async def test_other_profiler_stops_session(
+    session: ProfileSession, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test that another profiler starting mid-session does not break calls."""
+
+    @profiled("test.function")
+    def function(value: int) -> int:
+        with span("test.block"):
+            return value + 1
+
+    @profiled("test.coroutine")
+    async def coroutine(value: int) -> int:
+        await asyncio.sleep(0)
+        return function(value)
+
+    assert function(1) == 2
+    other = cProfile.Profile()
+    other.enable()
+    try:
+        assert function(1) == 2
+        assert await coroutine(2) == 3
+    finally:
+        other.disable()
+
+    assert not profile_running()
+    assert session.spans["test.function"].count == 1
+    assert "Stopping the profile session" in caplog.text
+    assert caplog.text.count("Stopping") == 1
@@ -0,0 +1,97 @@
+"""Tests for the replay script of the Dawarich tracker."""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from script.replay_tracker import (
+    FORMAT,
+    async_replay,
+    read_recording,
+    synthesize,
+    write_recording,
+)
+
+
+def test_recording_round_trip(tmp_path: Path) -> None:
+    """Test that a recording reads back the states it was written with."""
+    path = tmp_path / "trip.jsonl.gz"
+    states = [
+        (
+            1700000000.0,
+            "device_tracker.phone_0",
+            "home",
+            {"latitude": 52.0, "longitude": 4.0, "friendly_name": "Phone"},
+        ),
+        (
+            1700000001.5,
+            "device_tracker.phone_1",
+            "not_home",
+            {"latitude": 52.1, "longitude": 4.1, "battery": None},
+        ),
+    ]
+
+    written = write_recording(
+        path, ["device_tracker.phone_0", "device_tracker.phone_1"], states
+    )
+
+    assert written == 2
+    entity_ids, recorded = read_recording(path)
+    assert entity_ids == ["device_tracker.phone_0", "device_tracker.phone_1"]
+    # Only the attributes the tracker reads, and that are set, are kept
+    assert list(recorded) == [
+        (
+            1700000000.0,
+            "device_tracker.phone_0",
+            "home",
+            {"latitude": 52.0, "longitude": 4.0},
+        ),
+        (
+            1700000001.5,
+            "device_tracker.phone_1",
+            "not_home",
+            {"latitude": 52.1, "longitude": 4.1},
+        ),
+    ]
+
+
+def test_read_other_format(tmp_path: Path) -> None:
+    """Test that a file of another format is not read as a recording."""
+    path = tmp_path / "trip.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        file.write(json.dumps({"format": FORMAT, "version": 0}) + "\n")
+
+    with pytest.raises(ValueError, match="is not a version 1 recording"):
+        read_recording(path)
+
+
+async def test_synthesize_and_replay(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that a synthesized trip is replayed into the stub server."""
+    path = tmp_path / "trip.jsonl.gz"
+
+    written = synthesize(path, devices=2, hours=0.01, interval=1, seed=0)
+
+    assert written == 72
+    entity_ids, states = read_recording(path)
+    assert entity_ids == ["device_tracker.phone_0", "device_tracker.phone_1"]
+    assert sum(1 for _ in states) == written
+
+    await async_replay(
+        path,
+        speed=1000,
+        latency=0,
+        simplify_tolerance=0,
+        smoothing=False,
+        verbose=False,
+    )
+
+    report = dict(line.split(":", 1) for line in capsys.readouterr().out.splitlines())
+    assert report["Devices"].strip() == "2"
+    assert report["States replayed"].split()[0] == "72"
+    assert report["Points uploaded"].strip() == "72"
+    assert report["Dropped by queue"].strip() == "0"
+    assert report["Not uploaded"].strip() == "0"
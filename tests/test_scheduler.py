@@ -0,0 +1,64 @@
+"""Tests for the per host scheduling of refreshes."""
+
+from datetime import timedelta
+
+import pytest
+
+from custom_components.dawarich import scheduler
+from custom_components.dawarich.scheduler import (
+    MIN_REFRESH_DELAY,
+    DawarichHostScheduler,
+)
+
+INTERVAL = timedelta(seconds=60)
+
+
+def test_coordinators_get_their_own_slot(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the refreshes of a host are spread over the interval."""
+    monkeypatch.setattr(scheduler.random, "random", lambda: 0.0)
+    host = DawarichHostScheduler("http://dawarich.local")
+    for key in ("a", "b", "c"):
+        host.async_register(key)
+
+    # Slots of 20 seconds, seen from the start of an interval
+    delays = [host.next_refresh_delay(key, INTERVAL, 600.0) for key in "abc"]
+
+    assert delays == [INTERVAL, timedelta(seconds=20), timedelta(seconds=40)]
+
+
+def test_next_slot_is_never_too_close(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a slot that is about to pass moves to the next interval."""
+    monkeypatch.setattr(scheduler.random, "random", lambda: 0.0)
+    host = DawarichHostScheduler("http://dawarich.local")
+    host.async_register("a")
+    host.async_register("b")
+
+    delay = host.next_refresh_delay("b", INTERVAL, 29.0)
+
+    assert delay == timedelta(seconds=61)
+    assert delay >= MIN_REFRESH_DELAY
+
+
+def test_jitter_stays_within_the_slot() -> None:
+    """Test that the random jitter does not move a refresh out of its slot."""
+    host = DawarichHostScheduler("http://dawarich.local")
+    for key in ("a", "b"):
+        host.async_register(key)
+
+    delay = host.next_refresh_delay("b", INTERVAL, 0.0)
+
+    assert timedelta(seconds=30) <= delay < timedelta(seconds=45)
+
+
+def test_unregister(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the slots are recomputed when a coordinator leaves."""
+    # A jitter of a tenth of the slot
+    monkeypatch.setattr(scheduler.random, "random", lambda: 0.4)
+    host = DawarichHostScheduler("http://dawarich.local")
+    unregister = host.async_register("a")
+    host.async_register("b")
+
+    unregister()
+
+    assert host.next_refresh_delay("a", INTERVAL, 0.0) == INTERVAL
+    assert host.next_refresh_delay("b", INTERVAL, 0.0) == timedelta(seconds=6)
@@ -0,0 +1,113 @@
+"""Tests for the infrastructure shared by the entries of a server."""
+
+import pytest
+from dawarich_api.response_model import DawarichVersion
+from homeassistant.core import HomeAssistant
+
+from custom_components.dawarich import server as dawarich_server
+from custom_components.dawarich.api import DawarichClient, HealthResponse
+from custom_components.dawarich.server import (
+    DATA_SERVERS,
+    async_get_server,
+    async_release_server,
+)
+
+
+@pytest.fixture(autouse=True)
+def client_session(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Do not create the shared session, which needs the network integration."""
+    monkeypatch.setattr(
+        dawarich_server,
+        "async_get_clientsession",
+        lambda hass, verify_ssl=True: object(),
+    )
+
+
+@pytest.fixture(autouse=True)
+def healthy_server(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Answer the health probes without a server, returning the probed URLs."""
+    probed: list[str] = []
+
+    async def get_health(self: DawarichClient) -> HealthResponse:
+        probed.append(self.url)
+        return HealthResponse(
+            response_code=200,
+            response=DawarichVersion(major=0, minor=30, patch=1),
+            latency=0.02,
+        )
+
+    monkeypatch.setattr(DawarichClient, "get_health", get_health)
+    return probed
+
+
+async def test_entries_share_a_server(
+    hass: HomeAssistant, healthy_server: list[str]
+) -> None:
+    """Test that the entries of a server share it and its health probes."""
+    first = await async_get_server(hass, "a", "dawarich.local", True, True)
+    second = await async_get_server(hass, "b", "https://dawarich.local", True, True)
+    other = await async_get_server(hass, "c", "dawarich.local", False, True)
+
+    assert first is second
+    assert other is not first
+    assert first.entry_ids == {"a", "b"}
+    assert first.scheduler is second.scheduler
+    assert first.health_coordinator.data["version"] == {
+        "major": 0,
+        "minor": 30,
+        "patch": 1,
+    }
+    assert sorted(healthy_server) == ["http://dawarich.local", "https://dawarich.local"]
+
+    await async_release_server(hass, first, "a")
+    await async_release_server(hass, other, "c")
+
+
+async def test_last_entry_shuts_the_server_down(hass: HomeAssistant) -> None:
+    """Test that the server is only shut down when its last entry leaves."""
+    server = await async_get_server(hass, "a", "dawarich.local", True, True)
+    await async_get_server(hass, "b", "dawarich.local", True, True)
+
+    await async_release_server(hass, server, "a")
+    assert hass.data[DATA_SERVERS] == {"https://dawarich.local": server}
+
+    await async_release_server(hass, server, "b")
+    assert hass.data[DATA_SERVERS] == {}
+    replacement = await async_get_server(hass, "a", "dawarich.local", True, True)
+    assert replacement is not server
+
+    await async_release_server(hass, replacement, "a")
+
+
+async def test_health_probes(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that failed probes are counted and lower the availability."""
+    server = await async_get_server(hass, "a", "dawarich.local", True, True)
+    health = server.health_coordinator
+    responses = [
+        HealthResponse(response_code=500, error="down"),
+        HealthResponse(response_code=500, error="down"),
+        HealthResponse(response_code=200, latency=0.04),
+    ]
+
+    async def get_health(self: DawarichClient) -> HealthResponse:
+        return responses.pop(0)
+
+    monkeypatch.setattr(DawarichClient, "get_health", get_health)
+
+    await health.async_refresh()
+    await health.async_refresh()
+    assert not health.healthy
+    assert health.consecutive_failures == 2
+    assert health.data["available"] is False
+    assert health.data["availability"] == 33.3
+    assert health.data["version"] == {"major": 0, "minor": 30, "patch": 1}
+
+    await health.async_refresh()
+    assert health.healthy
+    assert health.data["availability"] == 50.0
+    assert health.data["latency_median"] == 20.0
+    assert health.data["latency_p95"] == 40.0
+
+    await async_release_server(hass, server, "a")
@@ -0,0 +1,78 @@
+"""Tests for the file paths of the Dawarich services."""
+
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.dawarich.services import (
+    _async_get_export_path,
+    _async_get_import_path,
+)
+
+
+@pytest.fixture
+def config_dir(hass: HomeAssistant) -> Path:
+    """Return a configuration directory with files in and out of the folder."""
+    config_dir = Path(hass.config.config_dir)
+    (config_dir / "dawarich").mkdir()
+    (config_dir / "dawarich" / "2024.gpx").write_text("<gpx/>")
+    (config_dir / ".storage").mkdir()
+    (config_dir / ".storage" / "core.config_entries").write_text("{}")
+    (config_dir / "secrets.yaml").write_text("password: secret\n")
+    return config_dir
+
+
+async def test_import_path(hass: HomeAssistant, config_dir: Path) -> None:
+    """Test that a file in the dawarich folder can be imported."""
+    path = await _async_get_import_path(hass, "dawarich/2024.gpx")
+
+    assert path == (config_dir / "dawarich" / "2024.gpx").resolve()
+
+
+@pytest.mark.parametrize(
+    "filename",
+    [
+        "secrets.yaml",
+        ".storage/core.config_entries",
+        "dawarich/../secrets.yaml",
+        "../secrets.yaml",
+        "dawarich",
+    ],
+)
+async def test_import_path_outside_folder(
+    hass: HomeAssistant, config_dir: Path, filename: str
+) -> None:
+    """Test that a file outside the dawarich folder is not imported."""
+    with pytest.raises(ServiceValidationError, match="not a file in the dawarich"):
+        await _async_get_import_path(hass, filename)
+
+
+async def test_import_path_allowlisted(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Test that a file in an allowlisted folder can be imported."""
+    external = tmp_path.parent / f"{tmp_path.name}-external"
+    external.mkdir()
+    (external / "track.gpx").write_text("<gpx/>")
+    hass.config.allowlist_external_dirs = {str(external)}
+
+    path = await _async_get_import_path(hass, str(external / "track.gpx"))
+
+    assert path == (external / "track.gpx").resolve()
+
+
+async def test_import_path_missing(hass: HomeAssistant, config_dir: Path) -> None:
+    """Test that a missing file in the dawarich folder is not imported."""
+    with pytest.raises(ServiceValidationError, match="does not exist"):
+        await _async_get_import_path(hass, "dawarich/2025.gpx")
+
+
+async def test_export_path(hass: HomeAssistant, config_dir: Path) -> None:
+    """Test that an export is confined to the dawarich folder."""
+    path = await _async_get_export_path(hass, "dawarich/2025.gpx")
+
+    assert path == (config_dir / "dawarich" / "2025.gpx").resolve()
+    with pytest.raises(ServiceValidationError, match="not a file in the dawarich"):
+        await _async_get_export_path(hass, "secrets.gpx")
+    with pytest.raises(ServiceValidationError, match="already exists"):
+        await _async_get_export_path(hass, "dawarich/2024.gpx")
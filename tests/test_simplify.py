@@ -0,0 +1,99 @@
+"""Tests for the streaming track simplification."""
+
+import math
+
+import pytest
+
+from custom_components.dawarich.simplify import (
+    EARTH_RADIUS_M,
+    StreamingSimplifier,
+    distance_to_segment,
+    simplify,
+)
+
+# Degrees of latitude per metre
+METRE = math.degrees(1 / EARTH_RADIUS_M)
+
+
+def _position(point: tuple[float, float]) -> tuple[float, float]:
+    """Return the position of a test point."""
+    return point
+
+
+def _track(*offsets: tuple[float, float]) -> list[tuple[float, float]]:
+    """Return a track from offsets in metres north and east of 0, 0."""
+    return [(north * METRE, east * METRE) for north, east in offsets]
+
+
+def test_distance_to_segment() -> None:
+    """Test the distance to a segment, its line and its ends."""
+    start, end = _track((0, 0), (0, 100))
+
+    middle = distance_to_segment(_track((10, 50))[0], start, end)
+    assert middle == pytest.approx(10, rel=1e-3)
+    beyond = distance_to_segment(_track((0, 130))[0], start, end)
+    assert beyond == pytest.approx(30, rel=1e-3)
+    assert distance_to_segment(_track((3, 4))[0], start, start) == pytest.approx(
+        5, rel=1e-3
+    )
+
+
+def test_straight_track_keeps_ends() -> None:
+    """Test that a straight track is simplified to its ends."""
+    track = _track(*((0, east) for east in range(0, 100, 10)))
+
+    assert list(simplify(track, 1, _position)) == [track[0], track[-1]]
+
+
+def test_corner_is_kept() -> None:
+    """Test that the corner of an L shaped track is kept."""
+    track = _track((0, 0), (0, 10), (0, 20), (0, 30), (10, 30), (20, 30))
+
+    assert list(simplify(track, 1, _position)) == [track[0], track[3], track[5]]
+
+
+def test_error_is_bounded() -> None:
+    """Test that no dropped point is further from the result than the tolerance."""
+    track = _track(*((5 * math.sin(east / 7), east) for east in range(200)))
+
+    kept = list(simplify(track, 2, _position))
+
+    assert len(kept) < len(track) / 2
+    for start, end in zip(kept, kept[1:], strict=False):
+        section = track[track.index(start) : track.index(end) + 1]
+        assert all(distance_to_segment(point, start, end) <= 2 for point in section)
+
+
+def test_zero_tolerance_keeps_turns() -> None:
+    """Test that every point off the line is kept with no tolerance."""
+    track = _track((0, 0), (1, 10), (0, 20), (1, 30))
+
+    assert list(simplify(track, 0, _position)) == track
+
+
+def test_streaming_holds_back_and_flushes() -> None:
+    """Test that points are held back until they are kept or flushed."""
+    simplifier = StreamingSimplifier(1, _position)
+    track = _track((0, 0), (0, 10), (0, 20))
+
+    assert simplifier.push(track[0]) == [track[0]]
+    assert simplifier.push(track[1]) == []
+    assert simplifier.push(track[2]) == []
+    assert simplifier.pending == 2
+    assert simplifier.flush() == [track[2]]
+    assert simplifier.pending == 0
+    assert simplifier.flush() == []
+
+
+def test_window_is_bounded() -> None:
+    """Test that no more than the window of points is ever held back."""
+    simplifier = StreamingSimplifier(1, _position, max_window=4)
+
+    kept = [
+        point
+        for point in _track(*((0, east) for east in range(10)))
+        for point in simplifier.push(point)
+    ]
+
+    assert kept == _track((0, 0), (0, 4), (0, 8))
+    assert simplifier.pending == 1
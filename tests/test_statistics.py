@@ -0,0 +1,57 @@
+"""Tests for the import of Dawarich stats into long-term statistics."""
+
+from homeassistant.const import UnitOfLength
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.dawarich import statistics
+from custom_components.dawarich.statistics import (
+    DawarichStatisticsImporter,
+    _period_start,
+)
+
+
+async def test_period_start(hass: HomeAssistant) -> None:
+    """Test that periods start at local midnight, aligned to the hour."""
+    await hass.config.async_set_time_zone("Asia/Kolkata")
+
+    start = _period_start(2024, 3)
+
+    assert start == dt_util.parse_datetime("2024-02-29T18:00:00+00:00")
+
+
+async def test_metadata(hass: HomeAssistant) -> None:
+    """Test the metadata of a summed and of an averaged statistic."""
+    importer = DawarichStatisticsImporter(hass, "01JENTRY", "Alice")
+
+    distance = importer._metadata(
+        "monthly_distance", "Monthly Distance", UnitOfLength.KILOMETERS, has_sum=True
+    )
+    countries = importer._metadata(
+        "yearly_countries_visited", "Countries", "countries", has_sum=False
+    )
+
+    assert distance["statistic_id"] == "dawarich:01jentry_monthly_distance"
+    assert distance["name"] == "Alice Monthly Distance"
+    assert distance["source"] == "dawarich"
+    assert distance["has_sum"]
+    assert not countries["has_sum"]
+    if statistics.MEAN_TYPE_SUPPORTED:
+        assert distance["mean_type"] is statistics.StatisticMeanType.NONE
+        assert countries["mean_type"] is statistics.StatisticMeanType.ARITHMETIC
+        assert "has_mean" not in distance
+    else:
+        assert not distance["has_mean"]
+        assert countries["has_mean"]
+    if statistics.UNIT_CLASS_SUPPORTED:
+        assert distance["unit_class"] == "distance"
+        assert countries["unit_class"] is None
+
+
+async def test_import_without_recorder(hass: HomeAssistant) -> None:
+    """Test that nothing is imported while the recorder is not loaded."""
+    importer = DawarichStatisticsImporter(hass, "01JENTRY", "Alice")
+
+    importer.async_import({"total_points_tracked": 10}, None)  # type: ignore[arg-type]
+
+    assert importer._last_points is None
@@ -0,0 +1,125 @@
+"""Tests for the index of visited map tiles."""
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.dawarich.tiles import (
+    ARRAY_MAX_TILES,
+    BITMAP_BYTES,
+    TILE_ZOOM,
+    TileIndex,
+    TileSet,
+    tile_of,
+)
+
+TIMESTAMP = 1_700_000_000.0
+DAY = 86_400
+N = 1 << TILE_ZOOM
+
+
+@pytest.mark.parametrize(
+    ("latitude", "longitude", "tile"),
+    [
+        (0.0, 0.0, (N // 2, N // 2)),
+        (0.001, -0.001, (N // 2 - 1, N // 2 - 1)),
+        (90.0, 180.0, (N - 1, 0)),
+        (-90.0, -180.0, (0, N - 1)),
+        (51.47788, -0.00147, (65535, 43602)),
+    ],
+)
+def test_tile_of(latitude: float, longitude: float, tile: tuple[int, int]) -> None:
+    """Test the slippy map tile of positions, clamped at the poles."""
+    assert tile_of(latitude, longitude) == tile
+
+
+def test_tile_set() -> None:
+    """Test that tiles are added once and looked up across chunks."""
+    tiles = TileSet()
+
+    assert tiles.add((5, 7))
+    assert not tiles.add((5, 7))
+    assert tiles.add((5 + 128, 7))
+    assert tiles.add((0, 0))
+
+    assert len(tiles) == 3
+    assert (5, 7) in tiles
+    assert (133, 7) in tiles
+    assert (7, 5) not in tiles
+    assert (5, 7 + 128) not in tiles
+    assert tiles.nbytes == 6
+
+
+def test_tile_set_turns_full_chunk_into_bitmap() -> None:
+    """Test that a chunk past the array limit becomes a fixed size bitmap."""
+    tiles = TileSet()
+    added = [(x, y) for x in range(128) for y in range(0, 128, 3)]
+
+    for tile in added:
+        tiles.add(tile)
+
+    assert len(added) > ARRAY_MAX_TILES
+    assert len(tiles) == len(added)
+    assert tiles.nbytes == BITMAP_BYTES
+    assert all(tile in tiles for tile in added)
+    assert (0, 1) not in tiles
+    assert not tiles.add((0, 0))
+    assert tiles.add((0, 1))
+    assert len(tiles) == len(added) + 1
+
+
+def test_tile_set_round_trip() -> None:
+    """Test that a set with array and bitmap chunks is restored as it was."""
+    tiles = TileSet()
+    for x in range(128):
+        for y in range(0, 128, 3):
+            tiles.add((x, y))
+    tiles.add((1000, 2000))
+
+    restored = TileSet.from_dict(tiles.as_dict())
+
+    assert len(restored) == len(tiles)
+    assert restored.nbytes == tiles.nbytes
+    assert (1000, 2000) in restored
+    assert (127, 126) in restored
+    assert (127, 127) not in restored
+    assert restored.as_dict() == tiles.as_dict()
+
+
+def test_count_in() -> None:
+    """Test that only the tiles within the rectangle are counted."""
+    tiles = TileSet()
+    for tile in [(1, 1), (2, 3), (4, 4), (10, 10)]:
+        tiles.add(tile)
+
+    assert tiles.count_in(range(1, 5), range(1, 5)) == 3
+    assert tiles.count_in(range(5, 10), range(5, 10)) == 0
+
+
+async def test_tile_index(hass: HomeAssistant) -> None:
+    """Test the counts of visited, new and home tiles."""
+    hass.config.latitude = 0.0
+    hass.config.longitude = 0.0
+    index = TileIndex(hass, "entry")
+    unsubscribe = await index.async_load()
+    updates: list[int] = []
+    index.async_add_listener(lambda: updates.append(len(index.tiles)))
+    today = dt_util.as_local(dt_util.utc_from_timestamp(TIMESTAMP)).date()
+
+    index.async_add_point(0.0001, 0.0001, TIMESTAMP)
+    index.async_add_point(0.0002, 0.0002, TIMESTAMP + 1)
+    index.async_add_point(0.01, 0.01, TIMESTAMP - DAY)
+    index.async_add_point(50.0, 5.0, TIMESTAMP + 2)
+
+    assert len(index.tiles) == 3
+    assert updates == [1, 2, 3]
+    assert index.new_tiles_on(today) == 2
+    assert index.new_tiles_on(today.replace(year=2000)) == 0
+    assert index.home_tiles_visited == 2
+    # About 20 km across at the equator, in tiles of about 300 m
+    assert 60**2 < index.home_tiles < 75**2
+
+    index.async_add_point(0.0001, 0.0001, TIMESTAMP + DAY)
+    assert index.new_tiles_on(today) == 2
+
+    unsubscribe()
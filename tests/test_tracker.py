@@ -0,0 +1,105 @@
+"""Tests for the tracker sensor sending device tracker states to Dawarich."""
+
+import asyncio
+import logging
+from typing import Any
+
+import pytest
+from dawarich_api.response_model import AddOnePointResponse
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_component import EntityComponent
+
+from custom_components.dawarich import sensor
+from custom_components.dawarich.sensor import (
+    TRACKER_SENSOR_TYPES,
+    DawarichTrackerSensor,
+)
+
+ENTITY_ID = "sensor.phone_tracker"
+
+
+class FakeApi:
+    """Accept the batches of points sent by the tracker."""
+
+    def __init__(self) -> None:
+        """Initialize the API."""
+        self.points: list[dict[str, Any]] = []
+
+    async def add_points(
+        self, points: list[dict[str, Any]], name: str
+    ) -> AddOnePointResponse:
+        """Accept a batch."""
+        self.points.extend(points)
+        return AddOnePointResponse(response_code=201)
+
+
+class FakeHealth:
+    """Health coordinator whose probes are set by the test."""
+
+    healthy = True
+
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Ignore the listener."""
+        return lambda: None
+
+
+async def _async_until(condition: Any) -> None:
+    """Wait for the background uploads to reach a condition."""
+    async with asyncio.timeout(1):
+        while not condition():
+            await asyncio.sleep(0.001)
+
+
+async def test_tracker_publishes_state(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the state is written on changes and on a timer, not per event."""
+    monkeypatch.setattr(sensor, "TRACKER_STATE_WRITE_INTERVAL", 0.01)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    api = FakeApi()
+    health = FakeHealth()
+    tracker = DawarichTrackerSensor(
+        "entry",
+        "Phone",
+        "device_tracker.phone",
+        api,
+        hass,
+        {},
+        TRACKER_SENSOR_TYPES,
+        health=health,
+    )
+    tracker.entity_id = ENTITY_ID
+    component = EntityComponent(logging.getLogger(__name__), "sensor", hass)
+    await component.async_add_entities([tracker])
+
+    hass.states.async_set(
+        "device_tracker.phone", "home", {"latitude": 52.0, "longitude": 5.0}
+    )
+    # The state callback only queues the state
+    assert hass.states.get(ENTITY_ID).state == "unknown"
+
+    await _async_until(lambda: hass.states.get(ENTITY_ID).state == "success")
+    assert len(api.points) == 1
+
+    health.healthy = False
+    tracker._async_health_updated()
+    assert hass.states.get(ENTITY_ID).attributes["uploads_paused"] is True
+
+    hass.states.async_set(
+        "device_tracker.phone", "home", {"latitude": 52.1, "longitude": 5.0}
+    )
+    await _async_until(
+        lambda: hass.states.get(ENTITY_ID).attributes["queued_points"] == 1
+    )
+
+    health.healthy = True
+    tracker._async_health_updated()
+    await _async_until(
+        lambda: hass.states.get(ENTITY_ID).attributes["queued_points"] == 0
+    )
+    assert len(api.points) == 2
+
+    await tracker.async_remove()
@@ -0,0 +1,287 @@
+"""Tests for the background uploader of the tracker."""
+
+import asyncio
+from typing import Any
+
+import pytest
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers.storage import Store
+
+from custom_components.dawarich import uploader
+from custom_components.dawarich.uploader import (
+    DawarichPointSender,
+    DawarichUploader,
+    upload_queue_storage_key,
+)
+
+
+def _state(latitude: float) -> State:
+    """Return a device tracker state at a latitude."""
+    return State(
+        "device_tracker.phone", "home", {"latitude": latitude, "longitude": 5.0}
+    )
+
+
+class Recorder:
+    """Record the processed states, failing on some of them."""
+
+    def __init__(self, fail_on: float | None = None, delay: float = 0) -> None:
+        """Initialize the recorder."""
+        self.fail_on = fail_on
+        self.delay = delay
+        self.latitudes: list[float | None] = []
+
+    async def __call__(self, state: State | None) -> None:
+        """Process a state."""
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        latitude = None if state is None else state.attributes["latitude"]
+        if latitude is not None and latitude == self.fail_on:
+            raise ValueError("Bad state")
+        self.latitudes.append(latitude)
+
+
+async def test_processes_in_order(hass: HomeAssistant) -> None:
+    """Test that states are processed in order, in the background."""
+    recorder = Recorder()
+    upload = DawarichUploader(hass, "phone", recorder)
+    upload.async_start()
+
+    for latitude in range(3):
+        upload.async_enqueue(_state(latitude))
+    upload.async_enqueue(None)
+    assert upload.queued == 4
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert recorder.latitudes == [0, 1, 2, None]
+    assert upload.queued == 0
+    await upload.async_stop()
+
+
+async def test_error_does_not_stop_processing(hass: HomeAssistant) -> None:
+    """Test that a state failing to process does not stop the others."""
+    recorder = Recorder(fail_on=1)
+    upload = DawarichUploader(hass, "phone", recorder)
+    upload.async_start()
+
+    for latitude in range(3):
+        upload.async_enqueue(_state(latitude))
+    await upload.async_stop()
+
+    assert recorder.latitudes == [0, 2]
+
+
+async def test_full_queue_drops_oldest(hass: HomeAssistant) -> None:
+    """Test that the oldest state is dropped and counted when the queue is full."""
+    recorder = Recorder()
+    upload = DawarichUploader(hass, "phone", recorder, maxsize=2)
+
+    for latitude in range(3):
+        upload.async_enqueue(_state(latitude))
+    assert upload.dropped == 1
+    upload.async_start()
+    await upload.async_stop()
+
+    assert recorder.latitudes == [1, 2]
+
+
+async def test_pause_and_resume(hass: HomeAssistant) -> None:
+    """Test that states are only queued while paused."""
+    recorder = Recorder()
+    upload = DawarichUploader(hass, "phone", recorder)
+    upload.async_start()
+    upload.async_pause()
+
+    upload.async_enqueue(_state(0))
+    await asyncio.sleep(0)
+    assert upload.paused
+    assert recorder.latitudes == []
+
+    upload.async_resume()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert recorder.latitudes == [0]
+    await upload.async_stop()
+
+
+async def test_stop_finishes_the_queue(hass: HomeAssistant) -> None:
+    """Test that stopping processes the state in progress and the queue."""
+    recorder = Recorder(delay=0.01)
+    upload = DawarichUploader(hass, "phone", recorder)
+    upload.async_start()
+
+    for latitude in range(3):
+        upload.async_enqueue(_state(latitude))
+    await asyncio.sleep(0.005)
+    await upload.async_stop()
+
+    assert recorder.latitudes == [0, 1, 2]
+
+
+async def test_stop_times_out(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a stuck queue is dropped after the stop timeout."""
+    monkeypatch.setattr(uploader, "UPLOAD_STOP_TIMEOUT", 0.01)
+    recorder = Recorder(delay=1)
+    upload = DawarichUploader(hass, "phone", recorder)
+    upload.async_start()
+
+    for latitude in range(3):
+        upload.async_enqueue(_state(latitude))
+    await upload.async_stop()
+
+    assert recorder.latitudes == []
+    assert upload.queued == 0
+
+
+async def test_queue_kept_until_next_start(hass: HomeAssistant) -> None:
+    """Test that states queued on stop are processed after the next start."""
+    key = upload_queue_storage_key("entry")
+    upload = DawarichUploader(hass, "phone", Recorder(), store=Store(hass, 1, key))
+    await upload.async_load()
+    upload.async_start()
+    upload.async_pause()
+    upload.async_enqueue(_state(0))
+    upload.async_enqueue(None)
+    await upload.async_stop()
+    assert upload.queued == 0
+
+    recorder = Recorder()
+    upload = DawarichUploader(hass, "phone", recorder, store=Store(hass, 1, key))
+    await upload.async_load()
+    assert upload.queued == 2
+    upload.async_start()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert recorder.latitudes == [0, None]
+    await upload.async_stop()
+
+    upload = DawarichUploader(hass, "phone", Recorder(), store=Store(hass, 1, key))
+    await upload.async_load()
+    assert upload.queued == 0
+
+
+async def test_idle_after_queue_emptied(hass: HomeAssistant) -> None:
+    """Test that the idle callback runs once the queue is empty."""
+    recorder = Recorder()
+    idle_at: list[int] = []
+
+    async def idle() -> None:
+        idle_at.append(len(recorder.latitudes))
+
+    upload = DawarichUploader(hass, "phone", recorder, idle=idle)
+    upload.async_start()
+    for latitude in range(3):
+        upload.async_enqueue(_state(latitude))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert idle_at == [3]
+    await upload.async_stop()
+
+
+class BatchRecorder:
+    """Record the batches sent, counting how many are in flight."""
+
+    def __init__(self, fail: bool = False) -> None:
+        """Initialize the recorder."""
+        self.fail = fail
+        self.batches: list[list[float]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, batch: list[dict[str, Any]]) -> None:
+        """Send a batch."""
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        if self.fail:
+            raise ValueError("Bad batch")
+        self.batches.append([point["latitude"] for point in batch])
+
+
+async def test_sender_batches_points(hass: HomeAssistant) -> None:
+    """Test that points wait for a full batch until flushed."""
+    recorder = BatchRecorder()
+    sender = DawarichPointSender(hass, "phone", recorder, batch_size=2)
+
+    for latitude in range(3):
+        await sender.async_add({"latitude": latitude})
+    assert sender.pending == 1
+    assert sender.in_flight == 1
+
+    await sender.async_drain()
+
+    assert recorder.batches == [[0, 1], [2]]
+    assert sender.pending == 0
+    assert sender.in_flight == 0
+
+
+async def test_sender_limits_concurrency(hass: HomeAssistant) -> None:
+    """Test that adding a batch waits while too many are in flight."""
+    recorder = BatchRecorder()
+    sender = DawarichPointSender(hass, "phone", recorder, concurrency=2)
+
+    for latitude in range(5):
+        await sender.async_add({"latitude": latitude})
+        assert sender.in_flight <= 2
+    await sender.async_drain()
+
+    assert recorder.max_in_flight == 2
+    assert sorted(point for batch in recorder.batches for point in batch) == list(
+        range(5)
+    )
+
+
+async def test_sender_concurrent_flushes(hass: HomeAssistant) -> None:
+    """Test that flushes waiting for the same slot do not exceed the limit."""
+    release = asyncio.Event()
+    sent: list[list[float]] = []
+    in_flight = max_in_flight = 0
+
+    async def send(batch: list[dict[str, Any]]) -> None:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await release.wait()
+        in_flight -= 1
+        sent.append([point["latitude"] for point in batch])
+
+    sender = DawarichPointSender(hass, "phone", send, batch_size=10, concurrency=1)
+    await sender.async_add({"latitude": 0})
+    await sender.async_flush()
+    assert sender.in_flight == 1
+
+    # The uploader and the simplifier timer both flush while the slot is taken
+    await sender.async_add({"latitude": 1})
+    first = hass.async_create_task(sender.async_flush())
+    await asyncio.sleep(0)
+    await sender.async_add({"latitude": 2})
+    second = hass.async_create_task(sender.async_flush())
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, second)
+    await sender.async_drain()
+
+    assert max_in_flight == 1
+    assert sent == [[0], [1], [2]]
+
+
+async def test_sender_logs_errors(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test that a failed batch is logged and does not stop the sender."""
+    recorder = BatchRecorder(fail=True)
+    sender = DawarichPointSender(hass, "phone", recorder)
+
+    await sender.async_add({"latitude": 0})
+    await sender.async_add({"latitude": 1})
+    await sender.async_drain()
+
+    assert caplog.text.count("Error sending 1 locations for phone") == 2
+    assert sender.in_flight == 0
@@ -0,0 +1,65 @@
+"""Tests for the push updates webhook."""
+
+from json import JSONDecodeError
+from typing import Any
+
+import pytest
+from homeassistant.components import webhook
+from homeassistant.core import HomeAssistant
+
+from custom_components.dawarich.webhook import async_register_webhook
+
+WEBHOOK_ID = "dawarich_test"
+
+
+class FakeCoordinator:
+    """Count the refreshes requested from a coordinator."""
+
+    def __init__(self) -> None:
+        """Initialize the coordinator."""
+        self.refreshes = 0
+
+    async def async_request_refresh(self) -> None:
+        """Request a refresh."""
+        self.refreshes += 1
+
+
+class FakeRequest:
+    """Request with a JSON body, or an invalid one."""
+
+    def __init__(self, body: Any) -> None:
+        """Initialize the request."""
+        self._body = body
+
+    async def json(self) -> Any:
+        """Return the decoded body."""
+        if self._body is None:
+            raise JSONDecodeError("Expecting value", "", 0)
+        return self._body
+
+
+@pytest.mark.parametrize(
+    ("body", "stats_refreshes", "points_refreshes"),
+    [
+        ({"event": "points_created"}, 0, 1),
+        ({"event": "stats_updated"}, 1, 0),
+        ({"event": "import_finished"}, 1, 1),
+        ({"event": "something_else"}, 1, 1),
+        ([], 1, 1),
+        (None, 1, 1),
+    ],
+)
+async def test_webhook_refreshes(
+    hass: HomeAssistant, body: Any, stats_refreshes: int, points_refreshes: int
+) -> None:
+    """Test that every event refreshes the coordinators it concerns."""
+    stats = FakeCoordinator()
+    points = FakeCoordinator()
+    async_register_webhook(hass, WEBHOOK_ID, "Alice", stats, points)  # type: ignore[arg-type]
+    handler = hass.data[webhook.DOMAIN][WEBHOOK_ID]["handler"]
+
+    response = await handler(hass, WEBHOOK_ID, FakeRequest(body))
+
+    assert response.status == 204
+    assert stats.refreshes == stats_refreshes
+    assert points.refreshes == points_refreshes